@@ -1,7 +1,49 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.db.models import OuterRef, Subquery
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils import timezone
 
+from .deltas import materialize_version
+from .importers import (
+    CONTENT_TYPES,
+    CSV_FORMAT,
+    FORMATS,
+    NDJSON_FORMAT,
+    detect_format,
+    export_elements,
+    import_elements,
+)
 from .models import Refbook, RefbookVersion, RefbookElement
-from .utils import get_current_version
+
+ELEMENTS_PAGE_SIZE = 100
+
+
+def filter_code_prefix(queryset, prefix):
+    """
+    Функция отбора элементов, код которых начинается с prefix. Отбор
+    выполняется по диапазону кодов, поэтому использует индекс по коду
+    элемента при любом бэкенде БД, в отличие от LIKE
+    """
+    return queryset.filter(code__gte=prefix, code__lt=prefix + "\U0010ffff")
+
+
+class ElementImportForm(forms.Form):
+    """Форма загрузки элементов версии справочника из файла в Django Admin"""
+
+    file = forms.FileField(label="Файл CSV или NDJSON")
+    format = forms.ChoiceField(
+        label="Формат",
+        choices=[("", "по расширению файла"), *[(fmt, fmt) for fmt in FORMATS]],
+        required=False,
+    )
+    replace = forms.BooleanField(
+        label="Заменить имеющиеся элементы версии", required=False
+    )
 
 
 class RefbookTabularInline(admin.TabularInline):
@@ -21,15 +63,7 @@ class RefbookVersionInline(admin.StackedInline):
     """
 
     model = RefbookVersion
-
-
-class RefbookElementInline(admin.StackedInline):
-    """
-    Используется для возможности редактирования элементов справочника
-    данной версии при редактировании версии справочника в Django Admin
-    """
-
-    model = RefbookElement
+    raw_id_fields = ("base_version",)
 
 
 class RefbookAdmin(admin.ModelAdmin):
@@ -46,22 +80,42 @@ class RefbookAdmin(admin.ModelAdmin):
     )
     inlines = (RefbookVersionInline,)
 
+    def get_queryset(self, request):
+        """
+        Метод получения справочников с текущей версией и датой начала её
+        действия, вычисленными подзапросом, чтобы количество запросов
+        к БД не зависело от числа строк на странице
+        """
+        current_versions = RefbookVersion.objects.filter(
+            refbook=OuterRef("pk"), start_date__lte=timezone.now().date()
+        ).order_by("-start_date")
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                current_version_title=Subquery(current_versions.values("version")[:1]),
+                current_version_start_date=Subquery(
+                    current_versions.values("start_date")[:1]
+                ),
+            )
+        )
+
     def date_current_version(self, obj):
         """Метод получения даты начала действия текущей версии справочника"""
-        current_version = get_current_version(refbook_id=obj)
-        if current_version:
-            return current_version.start_date
+        if obj.current_version_start_date:
+            return obj.current_version_start_date
         return '-'
 
     def current_version(self, obj):
         """Метод получения текущей версии справочника"""
-        current_version = get_current_version(refbook_id=obj)
-        if current_version:
-            return current_version
+        if obj.current_version_title:
+            return f"{obj.name}: {obj.current_version_title}"
         return '-'
 
     date_current_version.short_description = "Дата начала действия версии"
     current_version.short_description = "Текущая версия"
+    date_current_version.admin_order_field = "current_version_start_date"
+    current_version.admin_order_field = "current_version_title"
 
 
 class RefbookVersionAdmin(admin.ModelAdmin):
@@ -75,8 +129,154 @@ class RefbookVersionAdmin(admin.ModelAdmin):
         "version",
         "start_date",
     )
-    inlines = (RefbookElementInline,)
     list_display_links = ("version",)
+    list_select_related = ("refbook",)
+    raw_id_fields = ("base_version",)
+    actions = ("materialize", "export_csv", "export_ndjson")
+
+    @admin.action(
+        description="Материализовать производные версии", permissions=["change"]
+    )
+    def materialize(self, request, queryset):
+        """Метод материализации выбранных производных версий справочников"""
+        materialized = sum(materialize_version(version) for version in queryset)
+        self.message_user(request, f"Материализовано версий: {materialized}")
+
+    def export_action(self, request, queryset, fmt):
+        if queryset.count() != 1:
+            self.message_user(
+                request, "Для выгрузки выберите одну версию.", messages.WARNING
+            )
+            return None
+        return self.export_response(queryset.get(), fmt)
+
+    @admin.action(description="Скачать элементы версии (CSV)")
+    def export_csv(self, request, queryset):
+        """Метод выгрузки элементов выбранной версии справочника в CSV"""
+        return self.export_action(request, queryset, CSV_FORMAT)
+
+    @admin.action(description="Скачать элементы версии (NDJSON)")
+    def export_ndjson(self, request, queryset):
+        """Метод выгрузки элементов выбранной версии справочника в NDJSON"""
+        return self.export_action(request, queryset, NDJSON_FORMAT)
+
+    def get_urls(self):
+        urls = [
+            path(
+                "<path:object_id>/import/",
+                self.admin_site.admin_view(self.import_elements_view),
+                name="app_refbooks_refbookversion_import",
+            ),
+            path(
+                "<path:object_id>/export/<str:fmt>/",
+                self.admin_site.admin_view(self.export_elements_view),
+                name="app_refbooks_refbookversion_export",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def export_response(self, version, fmt):
+        """
+        Метод получения потокового ответа с файлом действующих элементов
+        версии справочника, пригодным для повторной загрузки
+        """
+        response = StreamingHttpResponse(
+            export_elements(version.pk, fmt), content_type=CONTENT_TYPES[fmt]
+        )
+        filename = f"{version.refbook.code}-{version.version}.{fmt}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    def export_elements_view(self, request, object_id, fmt):
+        """Метод выгрузки элементов версии справочника в файл CSV или NDJSON"""
+        version = get_object_or_404(
+            RefbookVersion.objects.select_related("refbook"), pk=object_id
+        )
+        if fmt not in FORMATS or not self.has_view_permission(request, version):
+            raise PermissionDenied
+        return self.export_response(version, fmt)
+
+    def get_elements_page(self, request, object_id):
+        """
+        Метод получения страницы элементов версии справочника для страницы
+        версии. Элементы упорядочены по коду и отбираются по префиксу кода,
+        поэтому выборка использует индекс элементов версии. Общее количество
+        элементов не подсчитывается: выбирается на один элемент больше
+        размера страницы, чтобы определить наличие следующей страницы
+        """
+        query = request.GET.get("elements_q", "").strip()
+        try:
+            page = max(int(request.GET.get("elements_page", 1)), 1)
+        except ValueError:
+            page = 1
+        elements = RefbookElement.objects.filter(refbook_version_id=object_id)
+        if query:
+            elements = filter_code_prefix(elements, query)
+        offset = (page - 1) * ELEMENTS_PAGE_SIZE
+        rows = list(
+            elements.order_by("code").values("pk", "code", "value", "removed")[
+                offset : offset + ELEMENTS_PAGE_SIZE + 1
+            ]
+        )
+        return {
+            "elements": rows[:ELEMENTS_PAGE_SIZE],
+            "elements_query": query,
+            "elements_page": page,
+            "elements_has_next": len(rows) > ELEMENTS_PAGE_SIZE,
+        }
+
+    def change_view(self, request, object_id, form_url="", extra_context=None):
+        extra_context = extra_context or {}
+        if object_id.isdigit():
+            extra_context.update(self.get_elements_page(request, object_id))
+        return super().change_view(request, object_id, form_url, extra_context)
+
+    def import_elements_view(self, request, object_id):
+        """Метод загрузки элементов версии справочника из файла CSV или NDJSON"""
+        version = get_object_or_404(RefbookVersion, pk=object_id)
+        if not self.has_change_permission(request, version):
+            raise PermissionDenied
+        form = ElementImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            upload = form.cleaned_data["file"]
+            try:
+                result = import_elements(
+                    version,
+                    upload.file,
+                    fmt=form.cleaned_data["format"] or detect_format(upload.name),
+                    replace=form.cleaned_data["replace"],
+                )
+            except UnicodeDecodeError:
+                form.add_error("file", "Файл должен быть в кодировке UTF-8.")
+            else:
+                self.message_user(
+                    request,
+                    f"Загружено элементов: {result.created}, без изменений: "
+                    f"{result.unchanged}, удалено: {result.removed}, отклонено "
+                    f"строк: {result.rejected}, {result.rows_per_second:.1f} строк/с",
+                    messages.WARNING if result.rejected else messages.SUCCESS,
+                )
+                for error in result.errors[:10]:
+                    self.message_user(
+                        request,
+                        f"Строка {error['line']}: {error['error']}",
+                        messages.WARNING,
+                    )
+                return redirect(
+                    reverse(
+                        "admin:app_refbooks_refbookversion_change", args=(version.pk,)
+                    )
+                )
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "original": version,
+            "title": f"Загрузка элементов версии {version}",
+            "form": form,
+        }
+        return TemplateResponse(
+            request, "admin/app_refbooks/refbookversion/import_elements.html", context
+        )
 
     def refbook_code(self, obj):
         """Метод получения кода справочника"""
@@ -100,6 +300,18 @@ class RefbookElementAdmin(admin.ModelAdmin):
         "code",
         "value",
     )
+    list_select_related = ("refbook_version__refbook",)
+    raw_id_fields = ("refbook_version",)
+    search_fields = ("code",)
+    search_help_text = "Поиск по началу кода элемента"
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        """Метод поиска элементов по префиксу кода с использованием индекса"""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return filter_code_prefix(queryset, search_term), False
 
 
 admin.site.register(Refbook, RefbookAdmin)
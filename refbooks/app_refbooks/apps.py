@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AppRefbooksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_refbooks'
+
+    def ready(self):
+        from . import checks, database, metrics, signals  # noqa: F401
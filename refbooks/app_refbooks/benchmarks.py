@@ -0,0 +1,608 @@
+import asyncio
+import json
+import math
+import platform
+import threading
+import time
+import tracemalloc
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import django
+from django.conf import settings
+from asgiref.sync import async_to_sync
+from django.db import OperationalError, connection, transaction
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from .cache import get_shared_cache, response_cache
+from .database import SQLITE_DEFAULT_PRAGMAS, SQLITE_TUNED_PRAGMAS
+from .elementsets import ElementSet
+from .lookup import element_index
+from .models import Refbook, RefbookVersion, RefbookElement
+from .search import search_index
+from .versions import effective_elements, version_resolver
+
+FIRST_START_DATE = date(2000, 1, 1)
+
+
+def isolated_settings():
+    """
+    Функция получения настроек, изолирующих замер от рабочего окружения:
+    отдельный кэш процесса вместо общего кэша справочников (замер сбрасывает
+    его и сохраняет в него ответы по синтетическим данным, идентификаторы
+    которых пересекаются с рабочими), без снимков версий и реплик БД
+    """
+    alias = getattr(settings, "REFBOOKS_CACHE_ALIAS", "default")
+    return override_settings(
+        CACHES={
+            **settings.CACHES,
+            alias: {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "refbooks-benchmark",
+            },
+        },
+        REFBOOKS_SNAPSHOT_DIR=None,
+        REFBOOKS_READ_REPLICAS=[],
+    )
+
+
+def reset_caches():
+    """Функция сброса кэшей версий, элементов и ответов"""
+    version_resolver.clear()
+    element_index.clear()
+    search_index.clear()
+    response_cache.clear()
+    get_shared_cache().clear()
+
+
+def element_code(number):
+    """Функция получения кода синтетического элемента"""
+    return f"C{number:07d}"
+
+
+def element_value(number):
+    """Функция получения значения синтетического элемента"""
+    return f"value {number}"
+
+
+def generate_dataset(refbooks, versions, elements, batch_size=5000):
+    """
+    Функция генерации синтетических справочников: refbooks справочников по
+    versions версий, в каждой версии elements элементов. Данные вставляются
+    через bulk_create, поэтому после генерации кэши сбрасываются явно.
+    Возвращает список идентификаторов справочников
+    """
+    Refbook.objects.bulk_create(
+        Refbook(code=f"BENCH-{number}", name=f"Справочник {number}")
+        for number in range(refbooks)
+    )
+    refbook_ids = list(
+        Refbook.objects.filter(code__startswith="BENCH-")
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    RefbookVersion.objects.bulk_create(
+        (
+            RefbookVersion(
+                refbook_id=refbook_id,
+                version=f"{number + 1}.0",
+                start_date=FIRST_START_DATE + timedelta(days=30 * number),
+            )
+            for refbook_id in refbook_ids
+            for number in range(versions)
+        ),
+        batch_size=batch_size,
+    )
+    version_ids = list(
+        RefbookVersion.objects.filter(refbook_id__in=refbook_ids).values_list(
+            "id", flat=True
+        )
+    )
+    for version_id in version_ids:
+        RefbookElement.objects.bulk_create(
+            (
+                RefbookElement(
+                    refbook_version_id=version_id,
+                    code=element_code(number),
+                    value=element_value(number),
+                )
+                for number in range(elements)
+            ),
+            batch_size=batch_size,
+        )
+    reset_caches()
+    return refbook_ids
+
+
+def percentile(values, percent):
+    """Функция вычисления перцентиля методом ближайшего ранга"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def get_endpoint_cases(refbook_ids, versions, elements):
+    """
+    Функция получения проверяемых запросов: для каждого URL из
+    app_refbooks/urls.py - имя случая, HTTP-метод и функция, возвращающая
+    путь и тело запроса для i-го запроса. Загрузка элементов изменяет данные
+    и не замеряется, асинхронные URL замеряются отдельно (get_async_cases)
+    """
+    last_version = f"{versions}.0"
+    middle_date = (FIRST_START_DATE + timedelta(days=15 * versions)).isoformat()
+
+    def refbook(i):
+        return refbook_ids[i % len(refbook_ids)]
+
+    def code(i):
+        return element_code(i % max(elements, 1))
+
+    def value(i):
+        return element_value(i % max(elements, 1))
+
+    def batch(i):
+        size = min(max(elements, 1), 1000)
+        return {
+            "version": last_version,
+            "elements": [[code(i + n), value(i + n)] for n in range(size)],
+        }
+
+    def lookup(i):
+        size = min(max(elements, 1), 1000)
+        return {
+            "items": [
+                {"refbook": refbook(i + n), "code": code(i + n), "value": value(i + n)}
+                for n in range(size)
+            ]
+        }
+
+    return [
+        ("refbook_list", "get", lambda i: (reverse("refbooks:refbook_list"), None)),
+        (
+            "refbook_list_by_date",
+            "get",
+            lambda i: (reverse("refbooks:refbook_list") + f"?date={middle_date}", None),
+        ),
+        (
+            "refbook_element_list",
+            "get",
+            lambda i: (
+                reverse("refbooks:refbook_element_list", kwargs={"pk": refbook(i)}),
+                None,
+            ),
+        ),
+        (
+            "refbook_element_list_page",
+            "get",
+            lambda i: (
+                reverse("refbooks:refbook_element_list", kwargs={"pk": refbook(i)})
+                + "?limit=100",
+                None,
+            ),
+        ),
+        (
+            "refbook_element_check",
+            "get",
+            lambda i: (
+                reverse("refbooks:refbook_element_check", kwargs={"pk": refbook(i)})
+                + f"?code={code(i)}&value={value(i)}&version={last_version}",
+                None,
+            ),
+        ),
+        (
+            "refbook_element_search",
+            "get",
+            lambda i: (
+                reverse("refbooks:refbook_element_search", kwargs={"pk": refbook(i)})
+                + f"?q={code(i)[:5]}",
+                None,
+            ),
+        ),
+        (
+            "refbook_element_search_contains",
+            "get",
+            lambda i: (
+                reverse("refbooks:refbook_element_search", kwargs={"pk": refbook(i)})
+                + f"?q={i % 100}&mode=contains",
+                None,
+            ),
+        ),
+        (
+            "refbook_element_batch_check",
+            "post",
+            lambda i: (
+                reverse(
+                    "refbooks:refbook_element_batch_check", kwargs={"pk": refbook(i)}
+                ),
+                batch(i),
+            ),
+        ),
+        (
+            "refbook_element_lookup",
+            "post",
+            lambda i: (reverse("refbooks:refbook_element_lookup"), lookup(i)),
+        ),
+        (
+            "refbook_version_diff",
+            "get",
+            lambda i: (
+                reverse("refbooks:refbook_version_diff", kwargs={"pk": refbook(i)})
+                + f"?from=1.0&to={last_version}",
+                None,
+            ),
+        ),
+        ("metrics", "get", lambda i: (reverse("refbooks:metrics"), None)),
+    ]
+
+
+def send(client, method, path, body):
+    """Функция отправки запроса тестовым клиентом с чтением потокового ответа"""
+    if body is None:
+        response = getattr(client, method)(path)
+    else:
+        response = getattr(client, method)(
+            path, data=json.dumps(body), content_type="application/json"
+        )
+    if response.streaming:
+        b"".join(response.streaming_content)
+    return response
+
+
+def measure_peak_memory(client, method, path, body):
+    """Функция замера пикового объёма выделенной при обработке запроса памяти"""
+    tracemalloc.start()
+    try:
+        send(client, method, path, body)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak_memory
+
+
+def measure_endpoint(client, method, make_request, requests):
+    """
+    Функция замера запросов к URL: перцентили времени ответа, количество
+    запросов к БД на HTTP-запрос и пиковый объём памяти при обработке
+    первого запроса с пустыми кэшами (замеряется отдельно, чтобы трассировка
+    памяти не искажала время ответа)
+    """
+    reset_caches()
+    peak_memory = measure_peak_memory(client, method, *make_request(0))
+    reset_caches()
+    timings = []
+    queries = 0
+    statuses = set()
+    for i in range(requests):
+        path, body = make_request(i)
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = send(client, method, path, body)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries += len(captured)
+        statuses.add(response.status_code)
+    return {
+        "requests": requests,
+        "statuses": sorted(statuses),
+        "mean_ms": round(sum(timings) / len(timings), 3),
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "queries_per_request": round(queries / requests, 2),
+        "peak_memory_kb": round(peak_memory / 1024, 1),
+    }
+
+
+def get_async_cases(refbook_ids, versions, elements):
+    """
+    Функция получения пар запросов к синхронному (WSGI) и асинхронному (ASGI)
+    представлениям: для i-го запроса возвращаются пути к обоим представлениям
+    """
+    last_version = f"{versions}.0"
+
+    def refbook(i):
+        return refbook_ids[i % len(refbook_ids)]
+
+    def check_query(i):
+        number = i % max(elements, 1)
+        return (
+            f"?code={element_code(number)}&value={element_value(number)}"
+            f"&version={last_version}"
+        )
+
+    def case(name, kwargs=lambda i: None, query=lambda i: ""):
+        def make_paths(i):
+            return tuple(
+                reverse(f"refbooks:{prefix}{name}", kwargs=kwargs(i)) + query(i)
+                for prefix in ("", "async_")
+            )
+
+        return name, make_paths
+
+    return [
+        case("refbook_list"),
+        case(
+            "refbook_element_list",
+            lambda i: {"pk": refbook(i)},
+            lambda i: f"?version={last_version}",
+        ),
+        case("refbook_element_check", lambda i: {"pk": refbook(i)}, check_query),
+    ]
+
+
+async def asend_concurrently(paths, concurrency):
+    """
+    Асинхронная функция отправки GET-запросов к ASGI-приложению, не более
+    concurrency запросов одновременно. Возвращает коды ответов
+    """
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send_one(path):
+        async with semaphore:
+            response = await client.get(path)
+            return response.status_code
+
+    return await asyncio.gather(*(send_one(path) for path in paths))
+
+
+def measure_async_endpoint(make_paths, requests, concurrency):
+    """
+    Функция сравнения пропускной способности синхронного представления,
+    вызываемого последовательно (как в одном потоке WSGI-сервера), и
+    асинхронного представления при concurrency одновременных запросах
+    в одном цикле событий (как в одном ASGI-воркере)
+    """
+    reset_caches()
+    client = Client()
+    started = time.perf_counter()
+    wsgi_statuses = {client.get(make_paths(i)[0]).status_code for i in range(requests)}
+    wsgi_seconds = time.perf_counter() - started
+    reset_caches()
+    started = time.perf_counter()
+    asgi_statuses = set(
+        async_to_sync(asend_concurrently)(
+            [make_paths(i)[1] for i in range(requests)], concurrency
+        )
+    )
+    asgi_seconds = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "statuses": sorted(wsgi_statuses | asgi_statuses),
+        "wsgi_requests_per_second": round(requests / wsgi_seconds, 1),
+        "asgi_requests_per_second": round(requests / asgi_seconds, 1),
+    }
+
+
+def get_element_containers():
+    """
+    Функция получения способов хранения элементов версии в памяти процесса:
+    экземпляры модели, словарь строк и компактный набор
+    """
+    return {
+        "model_instances": lambda rows: [
+            RefbookElement(code=code, value=value) for code, value in rows
+        ],
+        "dict": dict,
+        "element_set": ElementSet,
+    }
+
+
+def measure_element_memory(versions, elements, lookups=10000):
+    """
+    Функция замера памяти, занимаемой элементами versions версий по
+    elements элементов с общими кодами, при разных способах хранения.
+    Строки каждой версии создаются заново, как при выборке из БД, поэтому
+    общими могут быть только интернированные коды. Возвращает объём памяти
+    на элемент и время поиска значения по коду
+    """
+    codes = [element_code(number) for number in range(elements)]
+
+    def rows():
+        return [
+            (element_code(number), element_value(number)) for number in range(elements)
+        ]
+
+    report = {}
+    for name, build in get_element_containers().items():
+        tracemalloc.start()
+        try:
+            containers = [build(rows()) for _ in range(versions)]
+            memory, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        lookup_ns = None
+        if isinstance(containers[0], Mapping) and codes:
+            started = time.perf_counter()
+            for i in range(lookups):
+                containers[0].get(codes[i % elements])
+            lookup_ns = round((time.perf_counter() - started) / lookups * 10**9, 1)
+        report[name] = {
+            "bytes_per_element": round(memory / max(versions * elements, 1), 1),
+            "lookup_ns": lookup_ns,
+        }
+        del containers
+    return report
+
+
+def run_benchmark(refbooks, versions, elements, requests, concurrency=50):
+    """
+    Функция замера всех URL приложения на синтетических данных. Возвращает
+    отчёт, пригодный для сериализации в JSON и сравнения между релизами
+    """
+    with isolated_settings():
+        started = time.perf_counter()
+        refbook_ids = generate_dataset(refbooks, versions, elements)
+        generation_seconds = time.perf_counter() - started
+        client = Client()
+        endpoints = {}
+        for name, method, make_request in get_endpoint_cases(
+            refbook_ids, versions, elements
+        ):
+            endpoints[name] = measure_endpoint(client, method, make_request, requests)
+        async_endpoints = {
+            name: measure_async_endpoint(make_paths, requests, concurrency)
+            for name, make_paths in get_async_cases(refbook_ids, versions, elements)
+        }
+        return {
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+            },
+            "dataset": {
+                "refbooks": refbooks,
+                "versions_per_refbook": versions,
+                "elements_per_version": elements,
+                "generation_seconds": round(generation_seconds, 3),
+            },
+            "endpoints": endpoints,
+            "async_endpoints": async_endpoints,
+            "element_memory": measure_element_memory(versions, elements),
+        }
+
+
+def read_elements(version_id, code, size=100):
+    """
+    Функция запроса читателя в замере БД: выборка страницы действующих
+    элементов версии справочника начиная с кода (без кэшей приложения)
+    """
+    return list(
+        effective_elements(version_id)
+        .filter(code__gte=code)
+        .order_by("code")
+        .values_list("code", "value")[:size]
+    )
+
+
+def write_elements(version_id, size=100):
+    """
+    Функция транзакции писателя в замере БД: замена элементов версии
+    справочника пачкой из size элементов
+    """
+    with transaction.atomic():
+        elements = RefbookElement.objects.filter(refbook_version_id=version_id)
+        elements._raw_delete(elements.db)
+        RefbookElement.objects.bulk_create(
+            RefbookElement(
+                refbook_version_id=version_id,
+                code=element_code(number),
+                value=element_value(number),
+            )
+            for number in range(size)
+        )
+
+
+def measure_concurrent_readers(
+    version_ids, write_version_id, elements, readers, requests
+):
+    """
+    Функция замера БД при readers одновременных читателях (отдельные потоки
+    со своими соединениями, по requests запросов) и одном писателе, который
+    непрерывно изменяет элементы отдельной версии справочника. Возвращает
+    пропускную способность и перцентили времени чтения, количество
+    транзакций писателя и ошибок блокировки БД
+    """
+    stop = threading.Event()
+    lock = threading.Lock()
+    timings = []
+    counters = {"writes": 0, "errors": 0}
+
+    def reader(number):
+        try:
+            for i in range(requests):
+                version_id = version_ids[(number + i) % len(version_ids)]
+                code = element_code((number * requests + i) % max(elements, 1))
+                started = time.perf_counter()
+                try:
+                    read_elements(version_id, code)
+                except OperationalError:
+                    with lock:
+                        counters["errors"] += 1
+                    continue
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    timings.append(elapsed)
+        finally:
+            connection.close()
+
+    def writer():
+        try:
+            while not stop.is_set():
+                try:
+                    write_elements(write_version_id)
+                except OperationalError:
+                    with lock:
+                        counters["errors"] += 1
+                    continue
+                counters["writes"] += 1
+        finally:
+            connection.close()
+
+    writer_thread = threading.Thread(target=writer)
+    started = time.perf_counter()
+    writer_thread.start()
+    try:
+        with ThreadPoolExecutor(max_workers=readers) as executor:
+            list(executor.map(reader, range(readers)))
+    finally:
+        stop.set()
+        writer_thread.join()
+    seconds = time.perf_counter() - started
+    return {
+        "readers": readers,
+        "reads": len(timings),
+        "reads_per_second": round(len(timings) / seconds, 1),
+        "read_p50_ms": round(percentile(timings, 50) or 0, 3),
+        "read_p99_ms": round(percentile(timings, 99) or 0, 3),
+        "writes_per_second": round(counters["writes"] / seconds, 1),
+        "lock_errors": counters["errors"],
+    }
+
+
+def get_database_modes():
+    """
+    Функция получения сравниваемых режимов БД: для SQLite - настройки по
+    умолчанию и режим для одного узла, для других БД - текущие настройки
+    """
+    if connection.vendor == "sqlite":
+        return {"default": SQLITE_DEFAULT_PRAGMAS, "tuned": SQLITE_TUNED_PRAGMAS}
+    return {"configured": None}
+
+
+def run_database_benchmark(versions, elements, readers, requests):
+    """
+    Функция сравнения режимов БД при одновременных читателях и писателе на
+    синтетических данных. Соединения закрываются перед замером каждого
+    режима, чтобы новые соединения открывались с его настройками
+    """
+    with isolated_settings():
+        (refbook_id,) = generate_dataset(1, versions + 1, elements)
+        version_ids = list(
+            RefbookVersion.objects.filter(refbook_id=refbook_id)
+            .order_by("start_date")
+            .values_list("id", flat=True)
+        )
+        write_version_id = version_ids.pop()
+        modes = {}
+        for mode, pragmas in get_database_modes().items():
+            with override_settings(REFBOOKS_SQLITE_PRAGMAS=pragmas):
+                connection.close()
+                connection.ensure_connection()
+                modes[mode] = measure_concurrent_readers(
+                    version_ids, write_version_id, elements, readers, requests
+                )
+        connection.close()
+        return {
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+            },
+            "dataset": {"versions": versions, "elements_per_version": elements},
+            "modes": modes,
+        }
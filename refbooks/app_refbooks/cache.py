@@ -0,0 +1,166 @@
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+GENERATION_KEY_PREFIX = "refbooks:generation:"
+RESPONSE_KEY_PREFIX = "refbooks:response:"
+
+VERSIONS_SCOPE = "versions"
+
+# Поколения, прочитанные из общего кэша при обработке текущего запроса
+# (см. remember_generations), None - вне обработки запроса
+request_generations = ContextVar("refbooks_request_generations", default=None)
+
+
+def elements_scope(version_id):
+    """Функция получения области инвалидации элементов версии справочника"""
+    return f"elements:{version_id}"
+
+
+def get_shared_cache():
+    """Функция получения общего для всех процессов кэша"""
+    return caches[getattr(settings, "REFBOOKS_CACHE_ALIAS", "default")]
+
+
+def get_generations(*scopes):
+    """
+    Функция получения поколений областей инвалидации. Поколение - случайный
+    токен в общем кэше, который меняется при каждом изменении данных области,
+    поэтому кэши процессов, запомнившие старый токен, считаются устаревшими.
+    При отсутствии токена в общем кэше создаётся новый. При обработке
+    запроса поколение каждой области читается из общего кэша один раз
+    """
+    keys = [GENERATION_KEY_PREFIX + scope for scope in scopes]
+    memo = request_generations.get()
+    generations = {} if memo is None else memo
+    wanted = [key for key in keys if key not in generations]
+    if wanted:
+        cache = get_shared_cache()
+        found = cache.get_many(wanted)
+        missing = {key: uuid.uuid4().hex for key in wanted if key not in found}
+        if missing:
+            for key, generation in missing.items():
+                cache.add(key, generation, timeout=None)
+            found.update(cache.get_many(list(missing)))
+        generations.update(found)
+    return tuple(generations.get(key) for key in keys)
+
+
+def bump_generations(*scopes):
+    """Функция смены поколений областей инвалидации"""
+    generations = {GENERATION_KEY_PREFIX + scope: uuid.uuid4().hex for scope in scopes}
+    get_shared_cache().set_many(generations, timeout=None)
+    memo = request_generations.get()
+    if memo is not None:
+        memo.update(generations)
+
+
+@contextmanager
+def remember_generations():
+    """
+    Контекстный менеджер обработки запроса, в котором поколения областей
+    инвалидации читаются из общего кэша один раз: кэш версий, индекс
+    элементов, снимки и кэш ответов используют уже прочитанные поколения
+    """
+    token = request_generations.set({})
+    try:
+        yield
+    finally:
+        request_generations.reset(token)
+
+
+class ResponseCache:
+    """
+    Двухуровневый кэш отрендеренных ответов представлений.
+
+    Первый уровень - LRU-кэш в памяти процесса, второй - общий для всех
+    процессов кэш Django (настройка REFBOOKS_CACHE_ALIAS). Ключ записи
+    включает поколения областей инвалидации, от данных которых зависит
+    ответ, поэтому смена поколения сигналами моделей делает записи
+    недоступными во всех процессах. Включается настройкой
+    REFBOOKS_RESPONSE_CACHE_ENABLED.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = OrderedDict()
+
+    @property
+    def enabled(self):
+        return getattr(settings, "REFBOOKS_RESPONSE_CACHE_ENABLED", False)
+
+    @property
+    def local_size(self):
+        return getattr(settings, "REFBOOKS_RESPONSE_CACHE_LOCAL_SIZE", 256)
+
+    @property
+    def timeout(self):
+        return getattr(settings, "REFBOOKS_RESPONSE_CACHE_TIMEOUT", 3600)
+
+    def clear(self):
+        """Метод сброса кэша процесса"""
+        with self._lock:
+            self._local.clear()
+
+    def make_key(self, key, scopes):
+        parts = (key, get_generations(*scopes))
+        return (
+            RESPONSE_KEY_PREFIX + hashlib.md5(repr(parts).encode("utf-8")).hexdigest()
+        )
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None:
+                self._local.move_to_end(key)
+            return entry
+
+    def _set_local(self, key, entry):
+        with self._lock:
+            self._local[key] = entry
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    def get(self, key, scopes):
+        """Метод получения ответа из кэша"""
+        if not self.enabled:
+            return None
+        cache_key = self.make_key(key, scopes)
+        entry = self._get_local(cache_key)
+        if entry is None:
+            entry = get_shared_cache().get(cache_key)
+            if entry is None:
+                return None
+            self._set_local(cache_key, entry)
+        content, content_type = entry
+        return HttpResponse(content, content_type=content_type)
+
+    def set(self, key, scopes, response):
+        """
+        Метод сохранения ответа в кэш после его рендеринга. Кэшируются
+        только успешные ответы
+        """
+        if not self.enabled:
+            return response
+        cache_key = self.make_key(key, scopes)
+
+        def store(rendered):
+            if rendered.status_code != 200:
+                return
+            entry = (rendered.content, rendered["Content-Type"])
+            self._set_local(cache_key, entry)
+            get_shared_cache().set(cache_key, entry, timeout=self.timeout)
+
+        response.add_post_render_callback(store)
+        return response
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+# Бэкенды кэша, данные которых не видны другим процессам
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Проверка кэша refbooks при нескольких процессах приложения: через него
+    процессы узнают об изменении справочников, поэтому кэш в памяти процесса
+    оставил бы кэши версий, элементов и ответов других процессов устаревшими
+    """
+    if getattr(settings, "REFBOOKS_PROCESSES", 1) <= 1:
+        return []
+    alias = getattr(settings, "REFBOOKS_CACHE_ALIAS", "default")
+    backend = settings.CACHES.get(alias, {}).get("BACKEND")
+    if backend not in PROCESS_LOCAL_CACHE_BACKENDS:
+        return []
+    return [
+        Error(
+            f"Кэш {alias} ({backend}) не общий для "
+            f"{settings.REFBOOKS_PROCESSES} процессов приложения.",
+            hint="Задайте общий кэш (файловый кэш, Redis) переменными "
+            "REFBOOKS_CACHE_BACKEND и REFBOOKS_CACHE_LOCATION.",
+            id="app_refbooks.E001",
+        )
+    ]
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Значения SQLite по умолчанию, используются для сравнения режимов в замерах
+SQLITE_DEFAULT_PRAGMAS = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "mmap_size": 0,
+    "busy_timeout": 5000,
+}
+
+# Режим для развёртывания на одном узле: читатели не блокируются писателем
+# (WAL), fsync только при контрольных точках журнала, чтение файла БД через
+# отображение в память и ожидание блокировки вместо ошибки "database is locked"
+SQLITE_TUNED_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "busy_timeout": 5000,
+}
+
+
+def get_sqlite_pragmas():
+    """
+    Функция получения PRAGMA, применяемых к новым соединениям с SQLite:
+    заданных настройкой REFBOOKS_SQLITE_PRAGMAS или, при включённой
+    настройке REFBOOKS_SQLITE_TUNED, режима для одного узла
+    """
+    pragmas = getattr(settings, "REFBOOKS_SQLITE_PRAGMAS", None)
+    if pragmas is not None:
+        return pragmas
+    if getattr(settings, "REFBOOKS_SQLITE_TUNED", False):
+        return SQLITE_TUNED_PRAGMAS
+    return {}
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Применение PRAGMA к новому соединению с SQLite"""
+    if connection.vendor != "sqlite":
+        return
+    pragmas = get_sqlite_pragmas()
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,106 @@
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import RefbookElement
+from .signals import bulk_element_changes, elements_changed
+from .versions import effective_elements, version_resolver
+
+DEFAULT_MAX_DEPTH = 8
+
+# Размер пачки элементов при записи и чтении версий справочников
+BATCH_SIZE = 5000
+# Размер пачки удаляемых элементов (ограничение числа параметров запроса SQLite)
+DELETE_BATCH_SIZE = 500
+
+
+def get_max_depth():
+    """Функция получения допустимой глубины цепочки базовых версий"""
+    return getattr(settings, "REFBOOKS_DELTA_MAX_DEPTH", DEFAULT_MAX_DEPTH)
+
+
+def get_depth(version_id):
+    """Функция получения глубины цепочки базовых версий версии справочника"""
+    return len(version_resolver.chain(version_id)) - 1
+
+
+def create_elements(elements, batch_size=BATCH_SIZE):
+    """
+    Функция записи элементов из итератора пачками по batch_size (bulk_create
+    сам собирает все объекты в список). Возвращает количество элементов
+    """
+    elements = iter(elements)
+    created = 0
+    while True:
+        batch = list(islice(elements, batch_size))
+        if not batch:
+            return created
+        RefbookElement.objects.bulk_create(batch)
+        created += len(batch)
+
+
+def delete_elements(elements, batch_size=DELETE_BATCH_SIZE):
+    """
+    Функция удаления элементов QuerySet пачками по batch_size. Вызывается
+    внутри bulk_element_changes, чтобы сигналы удаления отдельных элементов
+    не увеличивали ревизии версии. Возвращает количество элементов
+    """
+    deleted = 0
+    while True:
+        ids = list(elements.values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += RefbookElement.objects.filter(pk__in=ids).delete()[0]
+
+
+def materialize_version(version, batch_size=BATCH_SIZE):
+    """
+    Функция материализации производной версии справочника: в версию
+    дописываются действующие элементы базовых версий, которые она
+    не изменяет и не удаляет, отметки об удалении удаляются, а ссылка
+    на базовую версию убирается. Элементы базовых версий читаются и
+    записываются пачками по batch_size, поэтому объём памяти не зависит
+    от размера версии. Состав элементов версии и производных от неё версий
+    не меняется
+    """
+    if version.base_version_id is None:
+        return False
+    with transaction.atomic(), bulk_element_changes(version.pk):
+        own = RefbookElement.objects.filter(refbook_version=version)
+        inherited = (
+            effective_elements(version.base_version_id)
+            .exclude(code__in=own.values("code"))
+            .values_list("code", "value")
+            .iterator(chunk_size=batch_size)
+        )
+        create_elements(
+            (
+                RefbookElement(refbook_version=version, code=code, value=value)
+                for code, value in inherited
+            ),
+            batch_size,
+        )
+        delete_elements(own.filter(removed=True))
+        version.base_version = None
+        version.save(update_fields=["base_version"])
+        elements_changed(version.pk)
+    return True
+
+
+def materialize_deep_versions(max_depth=None):
+    """
+    Функция материализации версий справочников, цепочка базовых версий
+    которых длиннее max_depth (по умолчанию настройка REFBOOKS_DELTA_MAX_DEPTH).
+    Версии обрабатываются от самых ранних, поэтому материализация базовой
+    версии укорачивает цепочки производных. Возвращает материализованные версии
+    """
+    if max_depth is None:
+        max_depth = get_max_depth()
+    materialized = []
+    for timeline in version_resolver.timelines().values():
+        for version in timeline.versions:
+            if get_depth(version.pk) > max_depth:
+                materialize_version(version)
+                materialized.append(version)
+    return materialized
@@ -0,0 +1,68 @@
+from django.db import connection
+from django.db.models.functions import Collate
+
+from .versions import effective_elements
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+DIFF_FIELDS = ("change", "code", "value", "old_value")
+
+BINARY_COLLATIONS = {
+    "postgresql": "C",
+    "mysql": "utf8mb4_bin",
+}
+
+
+def order_by_code(queryset):
+    """
+    Функция упорядочивания элементов по коду в порядке кодовых точек, в
+    котором строки сравнивает Python. SQLite по умолчанию сравнивает строки
+    побайтово, для других СУБД используется двоичная сортировка
+    """
+    collation = BINARY_COLLATIONS.get(connection.vendor)
+    if collation is None:
+        return queryset.order_by("code")
+    return queryset.order_by(Collate("code", collation))
+
+
+def iter_sorted_elements(version_id, chunk_size):
+    """Генератор действующих элементов версии справочника в порядке кодов"""
+    queryset = order_by_code(effective_elements(version_id))
+    return queryset.values_list("code", "value").iterator(chunk_size=chunk_size)
+
+
+def iter_diff(old_rows, new_rows):
+    """
+    Генератор отличий двух упорядоченных по коду последовательностей пар
+    (код, значение) в виде кортежей (изменение, код, значение, старое значение).
+    Последовательности сливаются за один проход, поэтому в памяти находится
+    не больше одной строки каждой из них
+    """
+    old_rows = iter(old_rows)
+    new_rows = iter(new_rows)
+    old = next(old_rows, None)
+    new = next(new_rows, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[0] < new[0]):
+            yield REMOVED, old[0], old[1], None
+            old = next(old_rows, None)
+        elif old is None or new[0] < old[0]:
+            yield ADDED, new[0], new[1], None
+            new = next(new_rows, None)
+        else:
+            if old[1] != new[1]:
+                yield CHANGED, new[0], new[1], old[1]
+            old = next(old_rows, None)
+            new = next(new_rows, None)
+
+
+def iter_version_diff(from_version_id, to_version_id, chunk_size=2000):
+    """Генератор отличий действующих элементов двух версий справочника"""
+    if from_version_id == to_version_id:
+        return iter(())
+    return iter_diff(
+        iter_sorted_elements(from_version_id, chunk_size),
+        iter_sorted_elements(to_version_id, chunk_size),
+    )
@@ -0,0 +1,87 @@
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from itertools import accumulate
+
+MAX_UINT32 = 2**32 - 1
+
+
+class ElementSet(Mapping):
+    """
+    Компактный неизменяемый набор элементов версии справочника
+    "код элемента -> значение элемента".
+
+    Коды хранятся упорядоченным кортежем интернированных строк, поэтому
+    одинаковые коды разных версий (и разных наборов одной версии) занимают
+    память один раз, а поиск кода выполняется бинарным поиском. Значения
+    склеены в один блок UTF-8 с массивом смещений (count + 1 чисел), как
+    в снимках версий, и декодируются только при обращении. По сравнению
+    со словарём строк набор не хранит объекты значений и хэш-таблицу.
+    """
+
+    __slots__ = ("_codes", "_offsets", "_values")
+
+    def __init__(self, rows=()):
+        rows = sorted(rows)
+        self._codes = tuple(sys.intern(code) for code, _ in rows)
+        encoded = [value.encode("utf-8") for _, value in rows]
+        self._values = b"".join(encoded)
+        typecode = "I" if len(self._values) <= MAX_UINT32 else "Q"
+        self._offsets = array(typecode, [0])
+        self._offsets.extend(accumulate(map(len, encoded)))
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __iter__(self):
+        return iter(self._codes)
+
+    def __getitem__(self, code):
+        index = self.find(code)
+        if index < 0:
+            raise KeyError(code)
+        return self.value(index)
+
+    def __contains__(self, code):
+        return self.find(code) >= 0
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {len(self)} elements>"
+
+    def code(self, index):
+        """Метод получения кода элемента по его номеру"""
+        return self._codes[index]
+
+    def value(self, index):
+        """Метод получения значения элемента по его номеру"""
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._values[start:end].decode("utf-8")
+
+    def find(self, code):
+        """Метод бинарного поиска номера элемента по коду, -1 при его отсутствии"""
+        if not isinstance(code, str):
+            return -1
+        index = bisect_left(self._codes, code)
+        if index < len(self._codes) and self._codes[index] == code:
+            return index
+        return -1
+
+    def get(self, code, default=None):
+        """Метод получения значения элемента по коду"""
+        # Поиск и декодирование встроены в метод: он вызывается на каждую
+        # проверку элемента, и лишние вызовы методов заметно его замедляют
+        if not isinstance(code, str):
+            return default
+        codes = self._codes
+        index = bisect_left(codes, code)
+        if index < len(codes) and codes[index] == code:
+            offsets = self._offsets
+            return self._values[offsets[index] : offsets[index + 1]].decode("utf-8")
+        return default
+
+    def contains(self, code, value):
+        """Метод проверки наличия элемента с данными кодом и значением"""
+        if code is None or value is None:
+            return False
+        return self.get(code) == value
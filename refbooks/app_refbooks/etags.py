@@ -0,0 +1,50 @@
+import hashlib
+
+from .revisions import get_chain_revisions
+from .utils import get_refbooks, get_version, parse_version_date
+
+
+def make_etag(*parts):
+    """Функция формирования ETag из составных частей"""
+    return hashlib.md5(repr(parts).encode("utf-8")).hexdigest()
+
+
+def representation(request):
+    """
+    Функция получения признаков представления ответа: формата ответа и
+    параметров запроса (версия, страница и т.п.)
+    """
+    return (
+        getattr(request, "accepted_media_type", None),
+        sorted(request.GET.lists()),
+    )
+
+
+def refbook_list_etag(request):
+    """
+    Функция получения ETag списка справочников по ревизиям справочников,
+    попадающих в выдачу
+    """
+    queryset = get_refbooks(date=request.GET.get("date"))
+    revisions = list(queryset.order_by("id").values_list("id", "revision"))
+    return make_etag("refbooks", revisions, representation(request))
+
+
+def element_list_etag(request, pk):
+    """
+    Функция получения ETag списка элементов версии справочника по ревизиям
+    версии и её базовых версий, без обращения к таблице элементов
+    """
+    try:
+        date = parse_version_date(request.GET.get("date"))
+    except ValueError:
+        return None
+    version = get_version(
+        refbook_id=pk, version_title=request.GET.get("version"), date=date
+    )
+    if version is None:
+        return None
+    revisions = get_chain_revisions(version.pk)
+    if not revisions:
+        return None
+    return make_etag("elements", version.pk, revisions, representation(request))
@@ -0,0 +1,318 @@
+import csv
+import io
+import json
+import time
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from .deltas import (
+    create_elements,
+    delete_elements,
+    get_depth,
+    get_max_depth,
+    materialize_version,
+)
+from .diffs import iter_sorted_elements
+from .models import RefbookVersion, RefbookElement
+from .renderers import iter_ndjson as iter_ndjson_lines
+from .signals import bulk_element_changes, elements_changed
+from .versions import effective_elements, version_resolver
+
+CSV_FORMAT = "csv"
+NDJSON_FORMAT = "ndjson"
+FORMATS = (CSV_FORMAT, NDJSON_FORMAT)
+
+MAX_REPORTED_ERRORS = 1000
+
+# Количество кодов в одном запросе элементов базовой версии
+BASE_LOOKUP_CHUNK_SIZE = 500
+
+CONTENT_TYPES = {
+    CSV_FORMAT: "text/csv; charset=utf-8",
+    NDJSON_FORMAT: "application/x-ndjson; charset=utf-8",
+}
+
+
+def detect_format(filename, default=CSV_FORMAT):
+    """Функция определения формата файла элементов по его расширению"""
+    filename = (filename or "").lower()
+    if filename.endswith((".ndjson", ".jsonl")):
+        return NDJSON_FORMAT
+    if filename.endswith(".csv"):
+        return CSV_FORMAT
+    return default
+
+
+@dataclass
+class ImportResult:
+    """Результат загрузки элементов версии справочника"""
+
+    created: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    rejected: int = 0
+    errors: list = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        if not self.seconds:
+            return float(self.created)
+        return self.created / self.seconds
+
+    def reject(self, line, reason):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": reason})
+
+    def as_dict(self):
+        return {
+            "created": self.created,
+            "unchanged": self.unchanged,
+            "removed": self.removed,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+def as_text(stream):
+    """Функция получения текстового потока из бинарного или текстового файла"""
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+
+def iter_csv(stream, delimiter=","):
+    """
+    Генератор строк CSV-файла в виде (номер строки, код, значение, ошибка).
+    Строка заголовка code,value пропускается
+    """
+    for number, row in enumerate(csv.reader(as_text(stream), delimiter=delimiter), 1):
+        if not row or row == [""]:
+            continue
+        if number == 1 and [cell.strip().lower() for cell in row] == ["code", "value"]:
+            continue
+        if len(row) != 2:
+            yield number, None, None, "ожидается два столбца: код и значение"
+            continue
+        yield number, row[0], row[1], None
+
+
+def iter_ndjson(stream):
+    """
+    Генератор строк NDJSON-файла в виде (номер строки, код, значение, ошибка).
+    Элемент задаётся объектом с полями code и value либо массивом [code, value]
+    """
+    for number, line in enumerate(as_text(stream), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            yield number, None, None, "некорректный JSON"
+            continue
+        if isinstance(item, dict):
+            item = [item.get("code"), item.get("value")]
+        if not isinstance(item, list) or len(item) != 2:
+            yield number, None, None, "ожидается объект с полями code и value"
+            continue
+        yield number, item[0], item[1], None
+
+
+def iter_rows(stream, fmt=CSV_FORMAT, delimiter=","):
+    """Генератор строк файла элементов в указанном формате"""
+    if fmt == NDJSON_FORMAT:
+        return iter_ndjson(stream)
+    if fmt == CSV_FORMAT:
+        return iter_csv(stream, delimiter=delimiter)
+    raise ValueError(f"Неизвестный формат файла элементов: {fmt}")
+
+
+def get_import_version(refbook_id, title, start_date=None, base_version=None):
+    """
+    Функция получения версии справочника для загрузки элементов. Если версии
+    нет и указана дата начала её действия, версия создаётся (производной от
+    base_version, если она указана), иначе возвращается None
+    """
+    version = RefbookVersion.objects.filter(
+        refbook_id=refbook_id, version=title
+    ).first()
+    if version is None and start_date is not None:
+        version = RefbookVersion.objects.create(
+            refbook_id=refbook_id,
+            version=title,
+            start_date=start_date,
+            base_version=base_version,
+        )
+    return version
+
+
+def get_base_values(version_id, codes):
+    """
+    Функция получения значений действующих элементов версии справочника
+    с данными кодами, одним запросом на каждые BASE_LOOKUP_CHUNK_SIZE кодов
+    """
+    values = {}
+    for start in range(0, len(codes), BASE_LOOKUP_CHUNK_SIZE):
+        values.update(
+            effective_elements(version_id)
+            .filter(code__in=codes[start : start + BASE_LOOKUP_CHUNK_SIZE])
+            .values_list("code", "value")
+        )
+    return values
+
+
+def import_elements(
+    version, stream, fmt=CSV_FORMAT, replace=False, batch_size=5000, delimiter=","
+):
+    """
+    Функция потоковой загрузки элементов версии справочника из файла CSV
+    или NDJSON. Файл читается построчно, строки проверяются на лету
+    (заполненность и длина кода и значения, уникальность кода в версии) и
+    вставляются пачками по batch_size через bulk_create в одной транзакции,
+    поэтому объём памяти не зависит от размера файла, кроме множества уже
+    загруженных кодов. Некорректные строки пропускаются и попадают в отчёт.
+    При replace=True имеющиеся элементы версии предварительно удаляются
+    пачками. Сигналы отдельных элементов при массовых операциях не
+    обрабатываются, поэтому кэши и ревизии версии обновляются явно.
+
+    Для производной версии (с базовой версией) файл содержит полный состав
+    версии, а сохраняется только разница с базовой версией: добавленные и
+    изменённые элементы и отметки об удалении отсутствующих в файле кодов.
+    Элементы базовой версии выбираются для каждой пачки строк по их кодам,
+    а коды для отметок об удалении читаются потоком. Если цепочка базовых
+    версий длиннее REFBOOKS_DELTA_MAX_DEPTH, версия после загрузки
+    материализуется
+    """
+    code_length = RefbookElement._meta.get_field("code").max_length
+    value_length = RefbookElement._meta.get_field("value").max_length
+    delta = version.base_version_id is not None
+    result = ImportResult()
+    started = time.perf_counter()
+
+    def save(batch):
+        if delta:
+            base = get_base_values(
+                version.base_version_id, [element.code for element in batch]
+            )
+            changed = [
+                element for element in batch if base.get(element.code) != element.value
+            ]
+            result.unchanged += len(batch) - len(changed)
+            batch = changed
+        RefbookElement.objects.bulk_create(batch)
+        result.created += len(batch)
+
+    with transaction.atomic(), bulk_element_changes(version.pk):
+        elements = RefbookElement.objects.filter(refbook_version=version)
+        if replace or delta:
+            delete_elements(elements)
+            codes = set()
+        else:
+            codes = set(elements.values_list("code", flat=True))
+        batch = []
+        for number, code, value, error in iter_rows(stream, fmt, delimiter):
+            if error:
+                result.reject(number, error)
+            elif not isinstance(code, str) or not code:
+                result.reject(number, "не указан код элемента")
+            elif not isinstance(value, str) or not value:
+                result.reject(number, "не указано значение элемента")
+            elif len(code) > code_length:
+                result.reject(number, f"код длиннее {code_length} символов")
+            elif len(value) > value_length:
+                result.reject(number, f"значение длиннее {value_length} символов")
+            elif code in codes:
+                result.reject(number, f"код {code} уже есть в версии")
+            else:
+                codes.add(code)
+                batch.append(
+                    RefbookElement(refbook_version=version, code=code, value=value)
+                )
+                if len(batch) >= batch_size:
+                    save(batch)
+                    batch = []
+        if batch:
+            save(batch)
+        if delta:
+            base_codes = (
+                effective_elements(version.base_version_id)
+                .values_list("code", flat=True)
+                .iterator(chunk_size=batch_size)
+            )
+            result.removed = create_elements(
+                (
+                    RefbookElement(
+                        refbook_version=version, code=code, value="", removed=True
+                    )
+                    for code in base_codes
+                    if code not in codes
+                ),
+                batch_size,
+            )
+        if result.created or replace or delta:
+            elements_changed(version.pk)
+        if delta and get_depth(version.pk) > get_max_depth():
+            materialize_version(version)
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def import_version_elements(
+    refbook_id, title, stream, start_date=None, base_version=None, **options
+):
+    """
+    Функция загрузки элементов версии справочника с созданием версии при
+    необходимости (см. get_import_version) в одной транзакции: при ошибке
+    загрузки созданная версия не остаётся пустой версией справочника.
+    Параметры options передаются в import_elements. Возвращает версию и
+    результат загрузки или (None, None), если версия не найдена
+    """
+    try:
+        with transaction.atomic():
+            version = get_import_version(refbook_id, title, start_date, base_version)
+            if version is None:
+                return None, None
+            return version, import_elements(version, stream, **options)
+    except BaseException:
+        # Кэш версий мог быть загружен внутри отменённой транзакции вместе
+        # с созданной версией, а сброс по on_commit при откате не выполняется
+        version_resolver.clear()
+        raise
+
+
+def iter_csv_lines(rows, chunk_size):
+    """
+    Генератор CSV-представления строк (код, значение) со строкой заголовка
+    code,value. Строки группируются в пачки по chunk_size
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(("code", "value"))
+    for number, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if number % chunk_size == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def export_elements(version_id, fmt=CSV_FORMAT, chunk_size=2000):
+    """
+    Функция выгрузки действующих элементов версии справочника в формате CSV
+    или NDJSON, пригодном для повторной загрузки через import_elements.
+    Возвращает генератор байтовых фрагментов файла: элементы читаются из БД
+    в порядке кодов пачками по chunk_size, поэтому объём памяти не зависит
+    от размера версии
+    """
+    rows = iter_sorted_elements(version_id, chunk_size)
+    if fmt == NDJSON_FORMAT:
+        return iter_ndjson_lines(rows, ("code", "value"), chunk_size)
+    if fmt == CSV_FORMAT:
+        return iter_csv_lines(rows, chunk_size)
+    raise ValueError(f"Неизвестный формат файла элементов: {fmt}")
@@ -0,0 +1,225 @@
+import threading
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q
+
+from .cache import get_generations
+from .elementsets import ElementSet
+from .models import Refbook
+from .snapshots import snapshot_store
+from .utils import get_version
+from .versions import effective_elements, elements_scopes
+
+DEFAULT_MAX_ELEMENTS = 1_000_000
+LOOKUP_CHUNK_SIZE = 500
+
+
+class ElementIndex:
+    """
+    Индекс элементов версий справочников в памяти процесса.
+
+    Для каждой версии справочника при первом обращении загружается
+    компактный набор "код элемента -> значение элемента" (ElementSet),
+    после чего валидация элемента выполняется без обращения к БД. Общее
+    количество элементов в индексе ограничено настройкой
+    REFBOOKS_ELEMENT_INDEX_MAX_ELEMENTS, при её превышении вытесняются давно
+    не использовавшиеся версии. Версия, которая больше ограничения, в индекс
+    не загружается: она запоминается как не помещающаяся (до смены поколения
+    её элементов), а элементы проверяются запросами по индексу
+    (refbook_version, code). Индекс версии сбрасывается сигналами при
+    изменении её элементов, а в других процессах - при смене поколения
+    элементов версии или её базовых версий в общем кэше.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = OrderedDict()
+        self._oversized = {}
+        self._size = 0
+        self._generation = 0
+
+    @property
+    def max_elements(self):
+        return getattr(
+            settings, "REFBOOKS_ELEMENT_INDEX_MAX_ELEMENTS", DEFAULT_MAX_ELEMENTS
+        )
+
+    def clear(self):
+        """Метод сброса индекса"""
+        with self._lock:
+            self._versions.clear()
+            self._oversized.clear()
+            self._size = 0
+            self._generation += 1
+
+    def invalidate(self, version_id):
+        """Метод сброса индекса версии справочника"""
+        with self._lock:
+            self._discard(version_id)
+            self._oversized.pop(version_id, None)
+            self._generation += 1
+
+    def _discard(self, version_id):
+        entry = self._versions.pop(version_id, None)
+        if entry is not None:
+            self._size -= len(entry[1])
+
+    def _load(self, version_id, limit):
+        return ElementSet(
+            effective_elements(version_id)
+            .using(DEFAULT_DB_ALIAS)
+            .values_list("code", "value")[:limit]
+        )
+
+    def _store(self, version_id, elements, generation, shared_generation):
+        max_elements = self.max_elements
+        with self._lock:
+            if generation != self._generation:
+                return
+            if len(elements) > max_elements:
+                self._oversized[version_id] = shared_generation
+                return
+            self._discard(version_id)
+            while self._versions and self._size + len(elements) > max_elements:
+                _, (_, evicted) = self._versions.popitem(last=False)
+                self._size -= len(evicted)
+            self._versions[version_id] = (shared_generation, elements)
+            self._size += len(elements)
+
+    def peek(self, version_id):
+        """
+        Метод получения набора элементов версии справочника, только если он
+        уже загружен в индекс и не устарел, иначе возвращается None
+        """
+        shared_generation = get_generations(*elements_scopes(version_id))
+        with self._lock:
+            entry = self._versions.get(version_id)
+            if entry is not None and entry[0] == shared_generation:
+                self._versions.move_to_end(version_id)
+                return entry[1]
+        return None
+
+    def get(self, version_id):
+        """
+        Метод получения набора элементов версии справочника. Если версия
+        не помещается в индекс, возвращается None
+        """
+        shared_generation = get_generations(*elements_scopes(version_id))
+        with self._lock:
+            entry = self._versions.get(version_id)
+            if entry is not None and entry[0] == shared_generation:
+                self._versions.move_to_end(version_id)
+                return entry[1]
+            if self._oversized.get(version_id) == shared_generation:
+                return None
+            generation = self._generation
+        # Загружается не больше max_elements + 1 элементов: этого достаточно,
+        # чтобы узнать, что версия не помещается в индекс
+        max_elements = self.max_elements
+        elements = self._load(version_id, max_elements + 1)
+        self._store(version_id, elements, generation, shared_generation)
+        if len(elements) > max_elements:
+            return None
+        return elements
+
+    def contains(self, version_id, code, value):
+        """
+        Метод проверки наличия элемента с данными кодом и значением в версии
+        справочника. Если версия не помещается в индекс, элемент проверяется
+        одним запросом к БД
+        """
+        if code is None or value is None:
+            return False
+        elements = self.get(version_id)
+        if elements is None:
+            return (
+                effective_elements(version_id).filter(code=code, value=value).exists()
+            )
+        return elements.get(code) == value
+
+    def __len__(self):
+        return self._size
+
+
+element_index = ElementIndex()
+
+
+def resolve_refbooks(references):
+    """
+    Функция получения идентификаторов справочников по ссылкам на них
+    (идентификаторам или кодам) одним запросом. Возвращает словарь
+    "ссылка -> идентификатор справочника" для найденных справочников
+    """
+    ids = {reference for reference in references if isinstance(reference, int)}
+    codes = {reference for reference in references if isinstance(reference, str)}
+    if not ids and not codes:
+        return {}
+    resolved = {}
+    for pk, code in Refbook.objects.filter(
+        Q(pk__in=ids) | Q(code__in=codes)
+    ).values_list("pk", "code"):
+        if pk in ids:
+            resolved[pk] = pk
+        if code in codes:
+            resolved[code] = pk
+    return resolved
+
+
+def get_elements_by_codes(version_id, codes):
+    """
+    Функция получения словаря "код -> значение" элементов версии справочника
+    с указанными кодами. Используется снимок версии или уже загруженный
+    индекс элементов, иначе (в том числе для версий, не помещающихся
+    в индекс) элементы выбираются одним запросом на каждые
+    LOOKUP_CHUNK_SIZE кодов
+    """
+    source = snapshot_store.get(version_id)
+    if source is None:
+        source = element_index.peek(version_id)
+    if source is not None:
+        return {code: source.get(code) for code in codes}
+    codes = sorted(codes)
+    elements = {}
+    for start in range(0, len(codes), LOOKUP_CHUNK_SIZE):
+        elements.update(
+            effective_elements(version_id)
+            .filter(code__in=codes[start : start + LOOKUP_CHUNK_SIZE])
+            .values_list("code", "value")
+        )
+    return elements
+
+
+def lookup_elements(items):
+    """
+    Функция проверки элементов нескольких справочников. Элементы
+    группируются по версиям справочников: справочники находятся одним
+    запросом, версии - по кэшу версий, а элементы каждой версии проверяются
+    одним запросом, поэтому число запросов зависит от количества версий,
+    а не элементов. Возвращает результаты в порядке элементов запроса
+    """
+    refbook_ids = resolve_refbooks({item["refbook"] for item in items})
+    versions = []
+    groups = defaultdict(list)
+    for index, item in enumerate(items):
+        version = None
+        refbook_id = refbook_ids.get(item["refbook"])
+        if refbook_id is not None:
+            version = get_version(
+                refbook_id, version_title=item.get("version"), date=item.get("date")
+            )
+        versions.append(version)
+        if version is not None:
+            groups[version.pk].append(index)
+    results = [False] * len(items)
+    for version_id, indexes in groups.items():
+        elements = get_elements_by_codes(
+            version_id, {items[index]["code"] for index in indexes}
+        )
+        for index in indexes:
+            results[index] = elements.get(items[index]["code"]) == items[index]["value"]
+    return [
+        {"result": result, "version": version.version if version else None}
+        for result, version in zip(results, versions)
+    ]
@@ -0,0 +1,60 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from app_refbooks.benchmarks import run_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Замер времени ответа, количества запросов к БД и пикового объёма памяти "
+        "для всех URL приложения на синтетических справочниках. Данные "
+        "генерируются в отдельной тестовой БД, отчёт выводится в формате JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--refbooks", type=int, default=100)
+        parser.add_argument("--versions", type=int, default=10)
+        parser.add_argument("--elements", type=int, default=1000)
+        parser.add_argument(
+            "--requests", type=int, default=200, help="запросов на каждый URL"
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=50,
+            help="одновременных запросов к асинхронным представлениям",
+        )
+        parser.add_argument("--output", help="файл для сохранения отчёта")
+
+    def handle(self, *args, **options):
+        for option in ("refbooks", "versions", "requests", "concurrency"):
+            if options[option] < 1:
+                raise CommandError(f"--{option} должен быть положительным.")
+        if options["elements"] < 0:
+            raise CommandError("--elements не может быть отрицательным.")
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+            ):
+                report = run_benchmark(
+                    refbooks=options["refbooks"],
+                    versions=options["versions"],
+                    elements=options["elements"],
+                    requests=options["requests"],
+                    concurrency=options["concurrency"],
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        content = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.write(content + "\n")
+        else:
+            self.stdout.write(content)
@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from app_refbooks.benchmarks import run_database_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнение режимов БД при одновременных читателях и писателе: для "
+        "SQLite - настроек по умолчанию и режима для одного узла (WAL), для "
+        "других БД - текущих настроек. Данные генерируются в отдельной "
+        "тестовой БД (для SQLite - во временном файле), отчёт выводится в "
+        "формате JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--versions", type=int, default=10)
+        parser.add_argument("--elements", type=int, default=10000)
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument(
+            "--requests", type=int, default=200, help="запросов каждого читателя"
+        )
+        parser.add_argument("--output", help="файл для сохранения отчёта")
+
+    def handle(self, *args, **options):
+        for option in ("versions", "elements", "readers", "requests"):
+            if options[option] < 1:
+                raise CommandError(f"--{option} должен быть положительным.")
+        with tempfile.TemporaryDirectory() as directory:
+            if connection.vendor == "sqlite":
+                connection.settings_dict["TEST"]["NAME"] = os.path.join(
+                    directory, "bench.sqlite3"
+                )
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            try:
+                report = run_database_benchmark(
+                    versions=options["versions"],
+                    elements=options["elements"],
+                    readers=options["readers"],
+                    requests=options["requests"],
+                )
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+        content = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.write(content + "\n")
+        else:
+            self.stdout.write(content)
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app_refbooks.models import RefbookVersion
+from app_refbooks.snapshots import build_snapshot, get_snapshot_dir
+
+
+class Command(BaseCommand):
+    help = (
+        "Сборка снимков версий справочников: файлов для бинарного поиска "
+        "элементов в отображённой в память копии и файлов готовых JSON-ответов "
+        "списка элементов. Снимок версии используется, пока не изменятся "
+        "элементы версии или её базовых версий"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--refbook", action="append", help="код справочника (можно несколько)"
+        )
+        parser.add_argument(
+            "--directory", help="каталог снимков, по умолчанию REFBOOKS_SNAPSHOT_DIR"
+        )
+
+    def handle(self, *args, **options):
+        directory = options["directory"] or get_snapshot_dir()
+        if not directory:
+            raise CommandError(
+                "Не задан каталог снимков: укажите --directory или REFBOOKS_SNAPSHOT_DIR."
+            )
+        versions = RefbookVersion.objects.select_related("refbook").order_by("pk")
+        if options["refbook"]:
+            versions = versions.filter(refbook__code__in=options["refbook"])
+        for version in versions:
+            path = build_snapshot(version.pk, directory=directory)
+            self.stdout.write(f"{version.refbook.code} {version.version}: {path}")
+        self.stdout.write(self.style.SUCCESS(f"Собрано снимков: {len(versions)}"))
@@ -0,0 +1,100 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app_refbooks.importers import (
+    FORMATS,
+    detect_format,
+    import_version_elements,
+)
+from app_refbooks.models import Refbook, RefbookVersion
+
+
+class Command(BaseCommand):
+    help = (
+        "Потоковая загрузка элементов версии справочника из файла CSV "
+        "(код,значение) или NDJSON (объект с полями code и value в строке). "
+        "Строки вставляются пачками в одной транзакции, некорректные строки "
+        "пропускаются и выводятся в отчёте"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("refbook", help="код или идентификатор справочника")
+        parser.add_argument("version", help="версия справочника")
+        parser.add_argument("path", help="файл элементов")
+        parser.add_argument(
+            "--start-date",
+            type=date.fromisoformat,
+            help="дата начала действия версии (ГГГГ-ММ-ДД), если версию нужно создать",
+        )
+        parser.add_argument(
+            "--base",
+            help="базовая версия: создаваемая версия хранит только отличия от неё",
+        )
+        parser.add_argument(
+            "--format", choices=FORMATS, help="формат файла, по умолчанию по расширению"
+        )
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help="заменить имеющиеся элементы версии",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--delimiter", default=",", help="разделитель CSV")
+
+    def get_refbook(self, value):
+        refbook = Refbook.objects.filter(code=value).first()
+        if refbook is None and value.isdigit():
+            refbook = Refbook.objects.filter(pk=value).first()
+        if refbook is None:
+            raise CommandError(f"Справочник {value} не найден.")
+        return refbook
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size должен быть положительным.")
+        refbook = self.get_refbook(options["refbook"])
+        base_version = None
+        if options["base"]:
+            base_version = RefbookVersion.objects.filter(
+                refbook=refbook, version=options["base"]
+            ).first()
+            if base_version is None:
+                raise CommandError(f"Базовая версия {options['base']} не найдена.")
+        fmt = options["format"] or detect_format(options["path"])
+        try:
+            with open(options["path"], "rb") as stream:
+                version, result = import_version_elements(
+                    refbook.pk,
+                    options["version"],
+                    stream,
+                    start_date=options["start_date"],
+                    base_version=base_version,
+                    fmt=fmt,
+                    replace=options["replace"],
+                    batch_size=options["batch_size"],
+                    delimiter=options["delimiter"],
+                )
+        except OSError as error:
+            raise CommandError(f"Не удалось прочитать файл: {error}")
+        except UnicodeDecodeError:
+            raise CommandError("Файл должен быть в кодировке UTF-8.")
+        if version is None:
+            raise CommandError(
+                f"Версия {options['version']} справочника {refbook.code} не найдена, "
+                "для её создания укажите --start-date."
+            )
+        for error in result.errors:
+            self.stderr.write(f"Строка {error['line']}: {error['error']}")
+        if result.rejected > len(result.errors):
+            self.stderr.write(
+                f"... и ещё {result.rejected - len(result.errors)} отклонённых строк"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Загружено элементов: {result.created}, без изменений: "
+                f"{result.unchanged}, удалено: {result.removed}, отклонено строк: "
+                f"{result.rejected}, время: {result.seconds:.3f} с, "
+                f"{result.rows_per_second:.1f} строк/с"
+            )
+        )
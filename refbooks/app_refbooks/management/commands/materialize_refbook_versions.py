@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app_refbooks.deltas import get_max_depth, materialize_deep_versions
+
+
+class Command(BaseCommand):
+    help = (
+        "Материализация производных версий справочников, цепочка базовых версий "
+        "которых длиннее допустимой: действующие элементы записываются в саму "
+        "версию, и чтение её элементов больше не зависит от базовых версий"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-depth",
+            type=int,
+            help="допустимая глубина цепочки, по умолчанию REFBOOKS_DELTA_MAX_DEPTH",
+        )
+
+    def handle(self, *args, **options):
+        max_depth = options["max_depth"]
+        if max_depth is None:
+            max_depth = get_max_depth()
+        if max_depth < 0:
+            raise CommandError("--max-depth не может быть отрицательным.")
+        versions = materialize_deep_versions(max_depth)
+        for version in versions:
+            self.stdout.write(
+                f"Материализована версия {version.version} ({version.pk})"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Материализовано версий: {len(versions)}")
+        )
@@ -0,0 +1,84 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app_refbooks.warmup import format_memory, warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        "Прогрев кэшей: загрузка кэша версий и индекса элементов текущих "
+        "версий справочников с ограниченным числом потоков и ограничением "
+        "времени. Заполняет общий кэш поколений и страничный кэш ОС (файлы "
+        "снимков, БД) и выводит время прогрева и прирост памяти процесса. "
+        "Кэши процессов приложения прогреваются при их запуске настройкой "
+        "REFBOOKS_WARMUP_ON_STARTUP"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--refbook", action="append", help="код справочника (можно несколько)"
+        )
+        parser.add_argument(
+            "--workers", type=int, help="потоков, по умолчанию REFBOOKS_WARMUP_WORKERS"
+        )
+        parser.add_argument(
+            "--budget",
+            type=float,
+            help="ограничение времени в секундах, "
+            "по умолчанию REFBOOKS_WARMUP_BUDGET_SECONDS",
+        )
+        parser.add_argument(
+            "--search", action="store_true", help="загрузить также индекс поиска"
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="вывести отчёт в формате JSON"
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] is not None and options["workers"] < 1:
+            raise CommandError("--workers должен быть положительным.")
+        if options["budget"] is not None and options["budget"] <= 0:
+            raise CommandError("--budget должен быть положительным.")
+        report = warm_up(
+            workers=options["workers"],
+            budget=options["budget"],
+            search=options["search"],
+            refbook_codes=options["refbook"],
+        )
+        if options["json"]:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+            return
+        for item in report["versions"]:
+            if item["elements"] is None:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"{item['refbook']} {item['version']}: не помещается "
+                        "в индекс, элементы проверяются запросами к БД"
+                    )
+                )
+                continue
+            self.stdout.write(
+                f"{item['refbook']} {item['version']}: {item['elements']} "
+                f"элементов ({item['source']}), {item['seconds']:.3f} с"
+            )
+        for item in report["skipped"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{item['refbook']} {item['version']}: "
+                    "пропущена по ограничению времени"
+                )
+            )
+        for item in report["errors"]:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"{item['refbook']} {item['version']}: {item['error']}"
+                )
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Прогрето версий: {len(report['versions'])} за "
+                f"{report['seconds']:.3f} с, память процесса: "
+                f"{format_memory(report['memory_bytes'])}"
+            )
+        )
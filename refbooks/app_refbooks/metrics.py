@@ -0,0 +1,219 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Границы корзин гистограмм длительности (секунды) и количества запросов к БД
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+SLOWEST_QUERIES = 5
+
+# Показатели обрабатываемого запроса. Значение переменной контекста
+# копируется sync_to_async в поток выполнения синхронного кода, поэтому
+# запросы к БД одновременно обрабатываемых асинхронных запросов, которые
+# выполняются в одном потоке и через одно соединение, учитываются раздельно
+request_timings = ContextVar("refbooks_request_timings", default=None)
+
+
+def get_slow_request_threshold():
+    """Функция получения порога медленного запроса в миллисекундах"""
+    return getattr(settings, "REFBOOKS_SLOW_REQUEST_MS", 500)
+
+
+class Histogram:
+    """
+    Гистограмма в памяти процесса с разбиением по метке представления,
+    совместимая с типом histogram формата Prometheus
+    """
+
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, label, value):
+        """Метод учёта значения"""
+        with self._lock:
+            series = self._series.get(label)
+            if series is None:
+                series = self._series[label] = [[0] * len(self.buckets), 0, 0.0]
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        """Метод получения гистограммы в текстовом формате Prometheus"""
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted(
+                (label, counts[:], count, total)
+                for label, (counts, count, total) in self._series.items()
+            )
+        for label, counts, count, total in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{self.name}_bucket{{view="{label}",le="{bound}"}} {cumulative}'
+                )
+            lines.append(f'{self.name}_bucket{{view="{label}",le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{view="{label}"}} {total:.6f}')
+            lines.append(f'{self.name}_count{{view="{label}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+class MetricsRegistry:
+    """Гистограммы показателей обработки запросов к представлениям приложения"""
+
+    def __init__(self):
+        self.request_duration = Histogram(
+            "refbooks_request_duration_seconds",
+            "Total request processing time.",
+            DURATION_BUCKETS,
+        )
+        self.db_duration = Histogram(
+            "refbooks_db_duration_seconds",
+            "Time spent in database queries per request.",
+            DURATION_BUCKETS,
+        )
+        self.db_queries = Histogram(
+            "refbooks_db_queries",
+            "Number of database queries per request.",
+            QUERY_BUCKETS,
+        )
+        self.serialization_duration = Histogram(
+            "refbooks_serialization_duration_seconds",
+            "Time spent rendering the response body.",
+            DURATION_BUCKETS,
+        )
+
+    @property
+    def histograms(self):
+        return (
+            self.request_duration,
+            self.db_duration,
+            self.db_queries,
+            self.serialization_duration,
+        )
+
+    def observe(self, view, timings):
+        """Метод учёта показателей обработанного запроса"""
+        self.request_duration.observe(view, timings.total)
+        self.db_duration.observe(view, timings.db_time)
+        self.db_queries.observe(view, timings.queries)
+        self.serialization_duration.observe(view, timings.serialization)
+
+    def clear(self):
+        for histogram in self.histograms:
+            histogram.clear()
+
+    def render(self):
+        """Метод получения всех показателей в текстовом формате Prometheus"""
+        return "".join(histogram.render() for histogram in self.histograms)
+
+
+metrics_registry = MetricsRegistry()
+
+
+class RequestTimings:
+    """
+    Показатели обработки запроса: количество и время запросов к БД (с SQL
+    самых медленных запросов), время формирования тела ответа и общее время
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialization = 0.0
+        self._render_started = None
+        self._slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += duration
+            item = (duration, self.queries, sql)
+            if len(self._slowest) < SLOWEST_QUERIES:
+                heapq.heappush(self._slowest, item)
+            else:
+                heapq.heappushpop(self._slowest, item)
+
+    @contextmanager
+    def track_queries(self):
+        """
+        Метод подключения учёта запросов к БД, выполняемых в текущем
+        контексте (и в потоках sync_to_async, вызванных из него)
+        """
+        token = request_timings.set(self)
+        try:
+            yield self
+        finally:
+            request_timings.reset(token)
+
+    def render_started(self):
+        self._render_started = time.perf_counter()
+
+    def render_finished(self, response=None):
+        if self._render_started is not None:
+            self.serialization += time.perf_counter() - self._render_started
+            self._render_started = None
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    @property
+    def slowest_queries(self):
+        """Самые медленные запросы к БД: (длительность в секундах, SQL)"""
+        return [(duration, sql) for duration, _, sql in sorted(self._slowest)[::-1]]
+
+    def server_timing(self):
+        """Метод получения значения заголовка Server-Timing"""
+        return ", ".join(
+            (
+                f'db;dur={self.db_time * 1000:.3f};desc="{self.queries} queries"',
+                f"serialize;dur={self.serialization * 1000:.3f}",
+                f"total;dur={self.total * 1000:.3f}",
+            )
+        )
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Обёртка выполнения запросов к БД, учитывающая запрос в показателях
+    обрабатываемого в текущем контексте запроса
+    """
+    timings = request_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    return timings(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    """Подключение учёта запросов к соединению с БД (один раз на соединение)"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
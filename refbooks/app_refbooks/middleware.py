@@ -0,0 +1,146 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from rest_framework.permissions import SAFE_METHODS
+
+from .cache import remember_generations
+from .metrics import RequestTimings, get_slow_request_threshold, metrics_registry
+from .routers import mark_primary_reads
+
+logger = logging.getLogger("app_refbooks.performance")
+
+APP_NAMESPACE = "refbooks"
+
+
+class SharedGenerationsMiddleware:
+    """
+    Промежуточный слой чтения поколений областей инвалидации из общего кэша
+    не больше одного раза за запрос (при многократной проверке актуальности
+    кэшей процесса в ходе его обработки)
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with remember_generations():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with remember_generations():
+            return await self.get_response(request)
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Промежуточный слой закрепления чтений за основной БД: после успешного
+    изменяющего запроса сотрудника (административная панель, загрузка
+    элементов) чтения его сессии в течение REFBOOKS_REPLICA_STICKY_SECONDS
+    выполняются из основной БД, а не из реплик
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS:
+            self.mark(request, response)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if request.method not in SAFE_METHODS:
+            await sync_to_async(self.mark)(request, response)
+        return response
+
+    def mark(self, request, response):
+        user = getattr(request, "user", None)
+        if (
+            response.status_code < 400
+            and user is not None
+            and user.is_staff
+            and hasattr(request, "session")
+        ):
+            mark_primary_reads(request.session)
+
+
+class PerformanceMiddleware:
+    """
+    Промежуточный слой замера обработки запросов к представлениям
+    приложения: количество и время запросов к БД (через обёртку выполнения
+    запросов, подключаемую к каждому соединению, и переменную контекста
+    с показателями запроса), время формирования тела ответа (от начала рендеринга
+    до post-render callback) и общее время. Показатели возвращаются
+    в заголовке Server-Timing и учитываются в гистограммах, выдаваемых
+    по адресу /metrics. Запросы дольше REFBOOKS_SLOW_REQUEST_MS миллисекунд
+    записываются в лог app_refbooks.performance вместе с SQL самых медленных
+    запросов к БД. Для потоковых ответов учитывается время до начала выдачи
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = request.refbooks_timings = RequestTimings()
+        with timings.track_queries():
+            response = self.get_response(request)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = request.refbooks_timings = RequestTimings()
+        with timings.track_queries():
+            response = await self.get_response(request)
+        return self.finish(request, response, timings)
+
+    def process_template_response(self, request, response):
+        timings = getattr(request, "refbooks_timings", None)
+        if timings is not None:
+            timings.render_started()
+            response.add_post_render_callback(timings.render_finished)
+        return response
+
+    def finish(self, request, response, timings):
+        timings.finish()
+        match = getattr(request, "resolver_match", None)
+        if match is None or match.namespace != APP_NAMESPACE:
+            return response
+        response["Server-Timing"] = timings.server_timing()
+        metrics_registry.observe(match.url_name, timings)
+        if timings.total * 1000 >= get_slow_request_threshold():
+            logger.warning(
+                "Медленный запрос %s %s: %.1f мс, запросов к БД %d (%.1f мс), "
+                "формирование ответа %.1f мс. Самые медленные запросы к БД:\n%s",
+                request.method,
+                request.get_full_path(),
+                timings.total * 1000,
+                timings.queries,
+                timings.db_time * 1000,
+                timings.serialization * 1000,
+                "\n".join(
+                    f"{duration * 1000:.1f} мс: {sql}"
+                    for duration, sql in timings.slowest_queries
+                ),
+            )
+        return response
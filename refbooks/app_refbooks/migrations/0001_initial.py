@@ -0,0 +1,187 @@
+# Generated by Django 4.2.3 on 2026-10-18 09:47
+
+import app_refbooks.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Refbook",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "code",
+                    models.CharField(
+                        max_length=100, unique=True, verbose_name="код справочника"
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=300, verbose_name="наименование справочника"
+                    ),
+                ),
+                (
+                    "description",
+                    models.TextField(
+                        blank=True, null=True, verbose_name="описание справочника"
+                    ),
+                ),
+                (
+                    "revision",
+                    models.PositiveIntegerField(
+                        default=1, editable=False, verbose_name="ревизия справочника"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "справочник",
+                "verbose_name_plural": "справочники",
+            },
+            bases=(app_refbooks.models.RevisionMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name="RefbookVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "version",
+                    models.CharField(max_length=50, verbose_name="версия справочника"),
+                ),
+                (
+                    "start_date",
+                    models.DateField(verbose_name="дата начала действия версии"),
+                ),
+                (
+                    "revision",
+                    models.PositiveIntegerField(
+                        default=1,
+                        editable=False,
+                        verbose_name="ревизия версии справочника",
+                    ),
+                ),
+                (
+                    "base_version",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="если указана, версия хранит только отличия элементов от базовой версии",
+                        null=True,
+                        on_delete=django.db.models.deletion.RESTRICT,
+                        related_name="derived_versions",
+                        to="app_refbooks.refbookversion",
+                        verbose_name="базовая версия",
+                    ),
+                ),
+                (
+                    "refbook",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="refbook_versions",
+                        to="app_refbooks.refbook",
+                        verbose_name="справочник",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "версия справочника",
+                "verbose_name_plural": "версии справочников",
+            },
+            bases=(app_refbooks.models.RevisionMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name="RefbookElement",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("code", models.CharField(max_length=100, verbose_name="код элемента")),
+                (
+                    "value",
+                    models.CharField(max_length=300, verbose_name="значение элемента"),
+                ),
+                (
+                    "removed",
+                    models.BooleanField(
+                        default=False,
+                        help_text="отметка об удалении элемента базовой версии в производной версии",
+                        verbose_name="элемент удалён",
+                    ),
+                ),
+                (
+                    "refbook_version",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="refbook_elements",
+                        to="app_refbooks.refbookversion",
+                        verbose_name="версия справочника",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "элемент справочника",
+                "verbose_name_plural": "элементы справочников",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="refbookversion",
+            index=models.Index(
+                fields=["refbook", "start_date", "version"],
+                name="refbook_version_date_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="refbookversion",
+            constraint=models.UniqueConstraint(
+                fields=("refbook", "version"), name="unique refbook version"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="refbookversion",
+            constraint=models.UniqueConstraint(
+                fields=("refbook", "start_date"),
+                name="unique refbook version start_date",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="refbookelement",
+            index=models.Index(
+                fields=["refbook_version", "code", "value", "removed"],
+                name="refbook_element_code_value_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="refbookelement",
+            constraint=models.UniqueConstraint(
+                fields=("refbook_version", "code"),
+                name="unique element code of refbook version",
+            ),
+        ),
+    ]
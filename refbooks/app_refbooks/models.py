@@ -1,7 +1,34 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 
 
-class Refbook(models.Model):
+class RevisionMixin:
+    """
+    Примесь моделей со счётчиком ревизий. Ревизия увеличивается только
+    запросом UPDATE с F() (см. revisions.py), поэтому при сохранении
+    существующего объекта она не записывается: иначе save() экземпляра,
+    загруженного до изменения элементов, вернул бы ревизию назад
+    """
+
+    def save(self, *args, **kwargs):
+        if (
+            not args
+            and not self._state.adding
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.attname
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname != "revision"
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+
+class Refbook(RevisionMixin, models.Model):
     """Модель справочника"""
 
     code = models.CharField(max_length=100, verbose_name="код справочника", unique=True)
@@ -9,6 +36,9 @@ class Refbook(models.Model):
     description = models.TextField(
         null=True, blank=True, verbose_name="описание справочника"
     )
+    revision = models.PositiveIntegerField(
+        default=1, editable=False, verbose_name="ревизия справочника"
+    )
 
     class Meta:
         verbose_name = "справочник"
@@ -18,7 +48,7 @@ class Refbook(models.Model):
         return self.name
 
 
-class RefbookVersion(models.Model):
+class RefbookVersion(RevisionMixin, models.Model):
     """Модель версии справочника"""
 
     refbook = models.ForeignKey(
@@ -29,6 +59,18 @@ class RefbookVersion(models.Model):
     )
     version = models.CharField(max_length=50, verbose_name="версия справочника")
     start_date = models.DateField(verbose_name="дата начала действия версии")
+    base_version = models.ForeignKey(
+        "self",
+        on_delete=models.RESTRICT,
+        null=True,
+        blank=True,
+        related_name="derived_versions",
+        verbose_name="базовая версия",
+        help_text="если указана, версия хранит только отличия элементов от базовой версии",
+    )
+    revision = models.PositiveIntegerField(
+        default=1, editable=False, verbose_name="ревизия версии справочника"
+    )
 
     class Meta:
         verbose_name = "версия справочника"
@@ -42,10 +84,39 @@ class RefbookVersion(models.Model):
                 name="unique refbook version start_date",
             ),
         )
+        indexes = (
+            models.Index(
+                fields=["refbook", "start_date", "version"],
+                name="refbook_version_date_idx",
+            ),
+        )
 
     def __str__(self):
         return f"{self.refbook.name}: {self.version}"
 
+    def clean(self):
+        """
+        Метод проверки базовой версии: она должна относиться к тому же
+        справочнику, а цепочка базовых версий не должна содержать циклов
+        """
+        base = self.base_version
+        if base is None:
+            return
+        if base.refbook_id != self.refbook_id:
+            raise ValidationError(
+                {
+                    "base_version": "Базовая версия должна относиться к тому же справочнику."
+                }
+            )
+        while base is not None:
+            if self.pk is not None and base.pk == self.pk:
+                raise ValidationError(
+                    {
+                        "base_version": "Цепочка базовых версий не должна содержать циклов."
+                    }
+                )
+            base = base.base_version
+
 
 class RefbookElement(models.Model):
     """Модель элемента справочника"""
@@ -58,6 +129,11 @@ class RefbookElement(models.Model):
     )
     code = models.CharField(max_length=100, verbose_name="код элемента")
     value = models.CharField(max_length=300, verbose_name="значение элемента")
+    removed = models.BooleanField(
+        default=False,
+        verbose_name="элемент удалён",
+        help_text="отметка об удалении элемента базовой версии в производной версии",
+    )
 
     class Meta:
         verbose_name = "элемент справочника"
@@ -68,3 +144,9 @@ class RefbookElement(models.Model):
                 name="unique element code of refbook version",
             ),
         )
+        indexes = (
+            models.Index(
+                fields=["refbook_version", "code", "value", "removed"],
+                name="refbook_element_code_value_idx",
+            ),
+        )
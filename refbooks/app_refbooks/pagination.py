@@ -0,0 +1,92 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.conf import settings
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничная выдача по ключу (keyset pagination).
+
+    Включается параметром запроса limit, продолжение выдачи запрашивается
+    параметром cursor со значением поля next предыдущего ответа. Следующая
+    страница выбирается условием "ключ больше последнего выданного", поэтому
+    стоимость запроса не зависит от номера страницы. Без параметров limit и
+    cursor выдача не разбивается на страницы.
+    """
+
+    limit_query_param = "limit"
+    cursor_query_param = "cursor"
+
+    def __init__(self, key_field):
+        self.key_field = key_field
+        self.next_cursor = None
+
+    @property
+    def max_limit(self):
+        return getattr(settings, "REFBOOKS_PAGE_MAX_LIMIT", 1000)
+
+    def is_requested(self, request):
+        """Метод проверки запроса постраничной выдачи"""
+        return (
+            self.limit_query_param in request.query_params
+            or self.cursor_query_param in request.query_params
+        )
+
+    def get_limit(self, request):
+        limit = request.query_params.get(self.limit_query_param)
+        if limit is None:
+            return self.max_limit
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= self.max_limit:
+            raise ValidationError(
+                {
+                    self.limit_query_param: (
+                        f"Ожидается целое число от 1 до {self.max_limit}."
+                    )
+                }
+            )
+        return limit
+
+    def encode_cursor(self, key):
+        return urlsafe_b64encode(json.dumps([key]).encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            (key,) = json.loads(urlsafe_b64decode(cursor.encode("ascii")))
+        except (TypeError, ValueError):
+            raise NotFound("Некорректный курсор.")
+        return key
+
+    def paginate_queryset(self, queryset, request, view=None):
+        limit = self.get_limit(request)
+        key = self.decode_cursor(request)
+        queryset = queryset.order_by(self.key_field)
+        if key is not None:
+            try:
+                queryset = queryset.filter(**{f"{self.key_field}__gt": key})
+            except (TypeError, ValueError):
+                raise NotFound("Некорректный курсор.")
+        page = list(queryset[: limit + 1])
+        self.next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            last = page[-1]
+            if isinstance(last, dict):
+                key = last[self.key_field]
+            else:
+                key = getattr(last, self.key_field)
+            self.next_cursor = self.encode_cursor(key)
+        return page
+
+    def get_paginated_data(self, data):
+        """Метод дополнения данных ответа курсором следующей страницы"""
+        return {**data, "next": self.next_cursor}
@@ -0,0 +1,92 @@
+import json
+
+from django.conf import settings
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def encode_ndjson_line(item):
+    """Функция кодирования объекта в строку NDJSON"""
+    return json.dumps(item, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def iter_ndjson(rows, fields, chunk_size):
+    """
+    Генератор NDJSON-представления строк выборки. Строки (кортежи значений
+    полей fields) группируются в пачки по chunk_size, чтобы не отдавать
+    серверу приложений каждую строку отдельно
+    """
+    lines = []
+    for row in rows:
+        lines.append(encode_ndjson_line(dict(zip(fields, row))))
+        if len(lines) >= chunk_size:
+            yield "".join(lines).encode("utf-8")
+            lines = []
+    if lines:
+        yield "".join(lines).encode("utf-8")
+
+
+async def aiter_ndjson(rows, fields, chunk_size):
+    """Асинхронный генератор NDJSON-представления строк выборки (см. iter_ndjson)"""
+    lines = []
+    async for row in rows:
+        lines.append(encode_ndjson_line(dict(zip(fields, row))))
+        if len(lines) >= chunk_size:
+            yield "".join(lines).encode("utf-8")
+            lines = []
+    if lines:
+        yield "".join(lines).encode("utf-8")
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Рендерер ответа в формате NDJSON. Списки отдаются построчно, прочие
+    ответы (например, ошибки) одной строкой
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        items = data if isinstance(data, list) else [data]
+        return "".join(encode_ndjson_line(item) for item in items).encode("utf-8")
+
+
+def fast_rendering_enabled():
+    """Функция проверки включения быстрого формирования ответов списков"""
+    return getattr(settings, "REFBOOKS_FAST_RENDERING", False)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Рендерер JSON, использующий orjson при включённой настройке
+    REFBOOKS_FAST_RENDERING и установленном пакете orjson. Результат
+    побайтово совпадает с результатом JSONRenderer, в остальных случаях
+    (отступы, некомпактный вывод, неподдерживаемые orjson типы) рендеринг
+    выполняется JSONRenderer
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or not fast_rendering_enabled()
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace("\u2028".encode(), b"\\u2028").replace(
+            "\u2029".encode(), b"\\u2029"
+        )
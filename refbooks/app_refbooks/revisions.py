@@ -0,0 +1,45 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F
+
+from .models import Refbook, RefbookVersion
+from .versions import version_resolver
+
+
+def bump_refbook_revision(refbook_id, using=None):
+    """Функция увеличения ревизии справочника"""
+    Refbook.objects.using(using).filter(pk=refbook_id).update(
+        revision=F("revision") + 1
+    )
+
+
+def bump_version_revision(version_id, using=None):
+    """Функция увеличения ревизии версии справочника и самого справочника"""
+    RefbookVersion.objects.using(using).filter(pk=version_id).update(
+        revision=F("revision") + 1
+    )
+    Refbook.objects.using(using).filter(refbook_versions__pk=version_id).update(
+        revision=F("revision") + 1
+    )
+
+
+def get_chain_revisions(version_id):
+    """
+    Функция получения ревизий версии справочника и её базовых версий
+    в виде списка пар (идентификатор версии, ревизия)
+    """
+    return list(
+        RefbookVersion.objects.using(DEFAULT_DB_ALIAS)
+        .filter(pk__in=version_resolver.chain(version_id))
+        .order_by("pk")
+        .values_list("pk", "revision")
+    )
+
+
+def is_cascade_delete(origin, model):
+    """
+    Функция проверки удаления объекта каскадом при удалении
+    объекта другой модели (например, элементов при удалении версии)
+    """
+    if origin is None:
+        return False
+    return not (isinstance(origin, model) or getattr(origin, "model", None) is model)
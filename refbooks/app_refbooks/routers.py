@@ -0,0 +1,147 @@
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+ROUND_ROBIN = "round_robin"
+LEAST_LOADED = "least_loaded"
+
+PRIMARY_UNTIL_SESSION_KEY = "refbooks_primary_until"
+
+read_database = ContextVar("refbooks_read_database", default=None)
+
+
+def get_replicas():
+    """Функция получения алиасов реплик БД для чтения"""
+    return list(getattr(settings, "REFBOOKS_READ_REPLICAS", []))
+
+
+def get_sticky_seconds():
+    """
+    Функция получения времени, в течение которого после изменения данных
+    сессией её чтения выполняются из основной БД
+    """
+    return getattr(settings, "REFBOOKS_REPLICA_STICKY_SECONDS", 10)
+
+
+class ReplicaSelector:
+    """
+    Выбор реплики БД для чтения.
+
+    Стратегия задаётся настройкой REFBOOKS_REPLICA_STRATEGY: round_robin
+    (по очереди) или least_loaded (реплика с наименьшим числом выполняемых
+    процессом запросов, при равенстве - по очереди).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._in_flight = {}
+
+    @property
+    def strategy(self):
+        return getattr(settings, "REFBOOKS_REPLICA_STRATEGY", ROUND_ROBIN)
+
+    def select(self, replicas):
+        """Метод выбора реплики из списка алиасов"""
+        with self._lock:
+            start = next(self._counter) % len(replicas)
+            ordered = replicas[start:] + replicas[:start]
+            if self.strategy == LEAST_LOADED:
+                return min(ordered, key=lambda alias: self._in_flight.get(alias, 0))
+            return ordered[0]
+
+    @contextmanager
+    def acquire(self, alias):
+        """Контекстный менеджер учёта выполняемого на реплике запроса"""
+        with self._lock:
+            self._in_flight[alias] = self._in_flight.get(alias, 0) + 1
+        try:
+            yield alias
+        finally:
+            with self._lock:
+                self._in_flight[alias] -= 1
+
+    def in_flight(self, alias):
+        with self._lock:
+            return self._in_flight.get(alias, 0)
+
+
+replica_selector = ReplicaSelector()
+
+
+def mark_primary_reads(session):
+    """
+    Функция закрепления чтений сессии за основной БД после изменения данных,
+    чтобы пользователь видел свои изменения до их репликации
+    """
+    session[PRIMARY_UNTIL_SESSION_KEY] = time.time() + get_sticky_seconds()
+
+
+def reads_primary(request):
+    """Функция проверки закрепления чтений сессии запроса за основной БД"""
+    session = getattr(request, "session", None)
+    if session is None:
+        return False
+    return session.get(PRIMARY_UNTIL_SESSION_KEY, 0) > time.time()
+
+
+@contextmanager
+def use_read_replica(request):
+    """
+    Контекстный менеджер направления чтений запроса на реплику БД. Если
+    реплики не настроены или сессия недавно изменяла данные, чтения
+    выполняются из основной БД
+    """
+    replicas = get_replicas()
+    if not replicas or reads_primary(request):
+        yield None
+        return
+    with replica_selector.acquire(replica_selector.select(replicas)) as alias:
+        token = read_database.set(alias)
+        try:
+            yield alias
+        finally:
+            read_database.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """
+    Контекстный менеджер направления чтений на основную БД внутри
+    use_read_replica. Используется при заполнении кэшей процесса и общего
+    кэша: данные отстающей реплики, сохранённые под новым поколением, не
+    обновились бы до следующего изменения
+    """
+    token = read_database.set(None)
+    try:
+        yield
+    finally:
+        read_database.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Маршрутизатор БД: чтения представлений, выполняемые в контексте
+    use_read_replica, направляются на выбранную реплику, все остальные
+    чтения и все записи - в основную БД
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
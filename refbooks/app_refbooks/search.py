@@ -0,0 +1,177 @@
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q
+
+from .lookup import ElementIndex
+from .versions import effective_elements
+
+PREFIX_MODE = "prefix"
+CONTAINS_MODE = "contains"
+MODES = (PREFIX_MODE, CONTAINS_MODE)
+
+DEFAULT_LIMIT = 20
+MAX_CONTAINS_MATCHES = 2000
+
+KEY_SEPARATOR = "\t"
+LINE_SEPARATOR = "\n"
+
+
+def normalize(text):
+    """Функция приведения текста к виду для поиска без учёта регистра"""
+    return text.casefold()
+
+
+class ElementSearchTable:
+    """
+    Поисковая таблица элементов версии справочника.
+
+    Элементы упорядочены по коду без учёта регистра: поиск по началу кода
+    выполняется бинарным поиском по отсортированному списку ключей. Для
+    поиска по вхождению строки ключи и значения элементов склеены в одну
+    строку ("код<TAB>значение" на строку) в нижнем регистре, которая
+    просматривается методом str.find, а позиция совпадения переводится
+    в номер элемента бинарным поиском по массиву начал строк.
+    """
+
+    def __init__(self, rows):
+        rows = sorted(rows, key=lambda row: (normalize(row[0]), row[0]))
+        self.codes = [code for code, _ in rows]
+        self.values = [value for _, value in rows]
+        self.keys = [normalize(code) for code in self.codes]
+        self.starts = []
+        lines = []
+        position = 0
+        for key, value in zip(self.keys, self.values):
+            line = key + KEY_SEPARATOR + normalize(value) + LINE_SEPARATOR
+            self.starts.append(position)
+            lines.append(line)
+            position += len(line)
+        self.text = "".join(lines)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def element(self, index):
+        return {"code": self.codes[index], "value": self.values[index]}
+
+    def prefix_range(self, query, limit):
+        """Метод получения номеров элементов, код которых начинается с query"""
+        start = bisect_left(self.keys, query)
+        end = min(start + limit, len(self.keys))
+        return [
+            index for index in range(start, end) if self.keys[index].startswith(query)
+        ]
+
+    def search_prefix(self, query, limit):
+        """
+        Метод поиска элементов, код которых начинается с query. Элементы
+        возвращаются в порядке кодов, поэтому точное совпадение кода идёт первым
+        """
+        return [
+            self.element(index) for index in self.prefix_range(normalize(query), limit)
+        ]
+
+    def rank(self, index, query):
+        """
+        Метод получения ранга совпадения, не начинающегося с начала кода:
+        значение начинается с query, query входит в код, query входит в значение
+        """
+        key = self.keys[index]
+        value_start = self.starts[index] + len(key) + len(KEY_SEPARATOR)
+        if self.text.startswith(query, value_start):
+            return 1
+        if query in key:
+            return 2
+        return 3
+
+    def search_contains(self, query, limit):
+        """
+        Метод поиска элементов, код или значение которых содержит query.
+        Результаты упорядочиваются по рангу совпадения (начало кода, начало
+        значения, вхождение в код, вхождение в значение) и коду. Совпадения
+        с началом кода находятся бинарным поиском, остальные - просмотром
+        склеенной строки, который прекращается, когда результаты лучшего
+        из оставшихся рангов заполняют выдачу, или после
+        MAX_CONTAINS_MATCHES совпадений
+        """
+        query = normalize(query)
+        if KEY_SEPARATOR in query or LINE_SEPARATOR in query:
+            return []
+        found = self.prefix_range(query, limit)
+        prefixed = set(found)
+        ranked = {1: [], 2: [], 3: []}
+        matches = 0
+        position = self.text.find(query)
+        while (
+            position >= 0
+            and len(found) + len(ranked[1]) < limit
+            and matches < MAX_CONTAINS_MATCHES
+        ):
+            index = bisect_right(self.starts, position) - 1
+            if index not in prefixed and not self.keys[index].startswith(query):
+                ranked[self.rank(index, query)].append(index)
+                matches += 1
+            if index + 1 >= len(self.starts):
+                break
+            position = self.text.find(query, self.starts[index + 1])
+        for rank in sorted(ranked):
+            found.extend(ranked[rank])
+        return [self.element(index) for index in found[:limit]]
+
+    def search(self, query, mode=PREFIX_MODE, limit=DEFAULT_LIMIT):
+        """Метод поиска элементов версии справочника"""
+        if mode == CONTAINS_MODE:
+            return self.search_contains(query, limit)
+        return self.search_prefix(query, limit)
+
+
+def search_database(version_id, query, mode=PREFIX_MODE, limit=DEFAULT_LIMIT):
+    """
+    Функция поиска элементов версии справочника запросом к БД для версий,
+    не помещающихся в индекс поиска. Совпадения упорядочиваются по коду без
+    ранжирования, регистр не учитывается средствами БД (в SQLite - только
+    для латиницы)
+    """
+    elements = effective_elements(version_id)
+    if mode == CONTAINS_MODE:
+        elements = elements.filter(Q(code__icontains=query) | Q(value__icontains=query))
+    else:
+        elements = elements.filter(code__istartswith=query)
+    return list(elements.order_by("code").values("code", "value")[:limit])
+
+
+class ElementSearchIndex(ElementIndex):
+    """
+    Поисковые таблицы элементов версий справочников в памяти процесса.
+
+    Таблица версии строится при первом поиске по ней и вытесняется и
+    сбрасывается так же, как наборы индекса элементов. Общее количество
+    элементов в таблицах ограничено настройкой
+    REFBOOKS_SEARCH_INDEX_MAX_ELEMENTS, по версиям больше ограничения поиск
+    выполняется запросом к БД.
+    """
+
+    @property
+    def max_elements(self):
+        return getattr(
+            settings, "REFBOOKS_SEARCH_INDEX_MAX_ELEMENTS", super().max_elements
+        )
+
+    def _load(self, version_id, limit):
+        return ElementSearchTable(
+            effective_elements(version_id)
+            .using(DEFAULT_DB_ALIAS)
+            .values_list("code", "value")[:limit]
+        )
+
+    def search(self, version_id, query, mode=PREFIX_MODE, limit=DEFAULT_LIMIT):
+        """Метод поиска элементов версии справочника"""
+        table = self.get(version_id)
+        if table is None:
+            return search_database(version_id, query, mode, limit)
+        return table.search(query, mode, limit)
+
+
+search_index = ElementSearchIndex()
@@ -1,6 +1,9 @@
+from django.conf import settings
 from rest_framework import serializers
 
+from .importers import FORMATS
 from .models import Refbook, RefbookElement
+from .search import DEFAULT_LIMIT, MODES, PREFIX_MODE
 
 
 class RefbookSerializer(serializers.ModelSerializer):
@@ -36,3 +39,118 @@ class ElementListSerializer(serializers.Serializer):
     """Сериалайзер для вывода элементов версии справочника"""
 
     elements = RefbookElementSerializer(many=True)
+
+
+class ElementPairField(serializers.Field):
+    """
+    Поле пары "код элемента, значение элемента", принимает объект
+    с полями code и value либо массив [code, value]
+    """
+
+    default_error_messages = {
+        "invalid": "Ожидается объект с полями code и value или массив [code, value].",
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict):
+            data = (data.get("code"), data.get("value"))
+        if not isinstance(data, (list, tuple)) or len(data) != 2:
+            self.fail("invalid")
+        code, value = data
+        if not isinstance(code, str) or not isinstance(value, str):
+            self.fail("invalid")
+        return code, value
+
+    def to_representation(self, value):
+        code, element_value = value
+        return {"code": code, "value": element_value}
+
+
+class ElementCheckBatchSerializer(serializers.Serializer):
+    """Сериалайзер для пакетной валидации элементов версии справочника"""
+
+    version = serializers.CharField(required=False)
+    elements = serializers.ListField(child=ElementPairField(), allow_empty=True)
+
+    def validate_elements(self, value):
+        max_size = getattr(settings, "REFBOOKS_CHECK_BATCH_MAX_SIZE", 10000)
+        if len(value) > max_size:
+            raise serializers.ValidationError(
+                f"Количество элементов в запросе не должно превышать {max_size}."
+            )
+        return value
+
+
+class RefbookReferenceField(serializers.Field):
+    """
+    Поле ссылки на справочник: целое число - идентификатор справочника,
+    строка - код справочника
+    """
+
+    default_error_messages = {
+        "invalid": "Ожидается идентификатор или код справочника.",
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool) or not isinstance(data, (int, str)) or data == "":
+            self.fail("invalid")
+        return data
+
+    def to_representation(self, value):
+        return value
+
+
+class ElementLookupItemSerializer(serializers.Serializer):
+    """Сериалайзер элемента запроса проверки элементов нескольких справочников"""
+
+    refbook = RefbookReferenceField()
+    code = serializers.CharField(trim_whitespace=False)
+    value = serializers.CharField(trim_whitespace=False)
+    version = serializers.CharField(required=False)
+    date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if "version" in attrs and "date" in attrs:
+            raise serializers.ValidationError("Укажите либо версию, либо дату.")
+        return attrs
+
+
+class ElementLookupSerializer(serializers.Serializer):
+    """Сериалайзер для проверки элементов нескольких справочников"""
+
+    items = ElementLookupItemSerializer(many=True, allow_empty=True)
+
+    def validate_items(self, value):
+        max_size = getattr(settings, "REFBOOKS_CHECK_BATCH_MAX_SIZE", 10000)
+        if len(value) > max_size:
+            raise serializers.ValidationError(
+                f"Количество элементов в запросе не должно превышать {max_size}."
+            )
+        return value
+
+
+class ElementSearchSerializer(serializers.Serializer):
+    """Сериалайзер параметров поиска элементов версии справочника"""
+
+    q = serializers.CharField(trim_whitespace=False)
+    mode = serializers.ChoiceField(choices=MODES, default=PREFIX_MODE)
+    limit = serializers.IntegerField(min_value=1, default=DEFAULT_LIMIT)
+
+    def validate_limit(self, value):
+        max_limit = getattr(settings, "REFBOOKS_SEARCH_MAX_LIMIT", 100)
+        if value > max_limit:
+            raise serializers.ValidationError(
+                f"Количество результатов не должно превышать {max_limit}."
+            )
+        return value
+
+
+class ElementImportSerializer(serializers.Serializer):
+    """Сериалайзер для загрузки элементов версии справочника из файла"""
+
+    file = serializers.FileField()
+    version = serializers.CharField(max_length=50)
+    start_date = serializers.DateField(required=False)
+    base_version = serializers.CharField(max_length=50, required=False)
+    format = serializers.ChoiceField(choices=FORMATS, required=False)
+    replace = serializers.BooleanField(default=False)
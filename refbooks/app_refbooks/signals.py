@@ -0,0 +1,123 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import VERSIONS_SCOPE, bump_generations, elements_scope
+from .lookup import element_index
+from .models import Refbook, RefbookVersion, RefbookElement
+from .search import search_index
+from .revisions import bump_refbook_revision, bump_version_revision, is_cascade_delete
+from .versions import version_resolver
+
+# Версии справочников, элементы которых изменяются массово (см. bulk_element_changes)
+bulk_changed_versions = ContextVar(
+    "refbooks_bulk_changed_versions", default=frozenset()
+)
+
+
+@receiver(post_save, sender=Refbook)
+@receiver(post_delete, sender=Refbook)
+@receiver(post_save, sender=RefbookVersion)
+@receiver(post_delete, sender=RefbookVersion)
+def invalidate_version_timelines(sender, using=None, **kwargs):
+    """Сброс кэша версий справочников при изменении справочников и их версий"""
+
+    def invalidate():
+        version_resolver.clear()
+        bump_generations(VERSIONS_SCOPE)
+
+    invalidate()
+    transaction.on_commit(invalidate, using=using)
+
+
+def invalidate_elements(version_id, using=None):
+    """Сброс индекса и кэшей элементов версии справочника"""
+
+    def invalidate():
+        element_index.invalidate(version_id)
+        search_index.invalidate(version_id)
+        bump_generations(elements_scope(version_id))
+
+    invalidate()
+    transaction.on_commit(invalidate, using=using)
+
+
+def elements_changed(version_id, using=None):
+    """
+    Функция обновления кэшей и ревизий после массового изменения элементов
+    версии справочника (bulk_create, update, delete у QuerySet), при котором
+    сигналы моделей не отправляются
+    """
+    invalidate_elements(version_id, using=using)
+    bump_version_revision(version_id, using=using)
+
+
+@contextmanager
+def bulk_element_changes(version_id):
+    """
+    Контекстный менеджер массового изменения элементов версии справочника
+    методами, отправляющими сигналы моделей (delete у QuerySet): сигналы
+    отдельных элементов версии не сбрасывают кэши и не увеличивают ревизии,
+    вместо этого вызывающий код один раз вызывает elements_changed
+    """
+    token = bulk_changed_versions.set(bulk_changed_versions.get() | {version_id})
+    try:
+        yield
+    finally:
+        bulk_changed_versions.reset(token)
+
+
+def is_bulk_change(instance):
+    """Функция проверки изменения элемента в ходе массового изменения его версии"""
+    return instance.refbook_version_id in bulk_changed_versions.get()
+
+
+@receiver(post_save, sender=RefbookElement)
+@receiver(post_delete, sender=RefbookElement)
+def invalidate_element_index(sender, instance, using=None, **kwargs):
+    """Сброс индекса элементов версии справочника при изменении её элементов"""
+    if is_bulk_change(instance):
+        return
+    invalidate_elements(instance.refbook_version_id, using=using)
+
+
+@receiver(post_save, sender=Refbook)
+def bump_revision_on_refbook_save(sender, instance, raw=False, using=None, **kwargs):
+    """Увеличение ревизии справочника при его изменении"""
+    if not raw:
+        bump_refbook_revision(instance.pk, using=using)
+
+
+@receiver(post_save, sender=RefbookVersion)
+def bump_revision_on_version_save(sender, instance, raw=False, using=None, **kwargs):
+    """Увеличение ревизий версии справочника и справочника при изменении версии"""
+    if not raw:
+        bump_version_revision(instance.pk, using=using)
+
+
+@receiver(post_delete, sender=RefbookVersion)
+def bump_revision_on_version_delete(
+    sender, instance, using=None, origin=None, **kwargs
+):
+    """Увеличение ревизии справочника при удалении его версии"""
+    if not is_cascade_delete(origin, RefbookVersion):
+        bump_refbook_revision(instance.refbook_id, using=using)
+
+
+@receiver(post_save, sender=RefbookElement)
+def bump_revision_on_element_save(sender, instance, raw=False, using=None, **kwargs):
+    """Увеличение ревизий версии справочника и справочника при изменении элемента"""
+    if not raw and not is_bulk_change(instance):
+        bump_version_revision(instance.refbook_version_id, using=using)
+
+
+@receiver(post_delete, sender=RefbookElement)
+def bump_revision_on_element_delete(
+    sender, instance, using=None, origin=None, **kwargs
+):
+    """Увеличение ревизий версии справочника и справочника при удалении элемента"""
+    if not is_cascade_delete(origin, RefbookElement) and not is_bulk_change(instance):
+        bump_version_revision(instance.refbook_version_id, using=using)
@@ -0,0 +1,261 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+
+from django.conf import settings
+
+from .cache import get_generations
+from .diffs import iter_sorted_elements
+from .renderers import encode_ndjson_line
+from .revisions import get_chain_revisions
+from .versions import elements_scopes
+
+MAGIC = b"RBSNAP01"
+HEADER = struct.Struct("<8sI")
+OFFSET = struct.Struct("<I")
+MAX_BLOB_SIZE = 2**32 - 1
+
+JSON_SUFFIX = ".json"
+INDEX_SUFFIX = ".idx"
+
+
+def get_snapshot_dir():
+    """Функция получения каталога снимков версий справочников"""
+    return getattr(settings, "REFBOOKS_SNAPSHOT_DIR", None)
+
+
+def get_snapshot_name(version_id, revisions):
+    """
+    Функция получения имени снимка версии справочника. Имя включает ревизии
+    версии и её базовых версий, поэтому после изменения элементов старый
+    снимок перестаёт использоваться
+    """
+    digest = hashlib.md5(repr(revisions).encode("utf-8")).hexdigest()[:16]
+    return f"{version_id}-{digest}"
+
+
+class Snapshot:
+    """
+    Отображённый в память снимок версии справочника.
+
+    Файл индекса содержит заголовок (сигнатура и количество элементов),
+    массивы смещений кодов и значений (count + 1 чисел uint32) и блоки
+    кодов и значений в UTF-8, упорядоченные по байтам кодов. Поиск
+    элемента выполняется бинарным поиском по отображённому файлу, поэтому
+    все процессы приложения используют одну копию файла в страничном кэше ОС.
+    Рядом лежит файл с готовым JSON-ответом списка элементов версии.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.json_path = path + JSON_SUFFIX
+        with open(path + INDEX_SUFFIX, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"Некорректный файл снимка: {path}")
+        self._code_offsets = HEADER.size
+        self._value_offsets = self._code_offsets + OFFSET.size * (self._count + 1)
+        self._codes = self._value_offsets + OFFSET.size * (self._count + 1)
+        self._values = self._codes + self._offset(self._code_offsets, self._count)
+
+    def close(self):
+        self._map.close()
+
+    def __len__(self):
+        return self._count
+
+    def _offset(self, table, index):
+        return OFFSET.unpack_from(self._map, table + OFFSET.size * index)[0]
+
+    def _slice(self, table, blob, index):
+        start = self._offset(table, index)
+        end = self._offset(table, index + 1)
+        return self._map[blob + start : blob + end]
+
+    def code(self, index):
+        """Метод получения кода элемента по его номеру"""
+        return self._slice(self._code_offsets, self._codes, index).decode("utf-8")
+
+    def value(self, index):
+        """Метод получения значения элемента по его номеру"""
+        return self._slice(self._value_offsets, self._values, index).decode("utf-8")
+
+    def find(self, code):
+        """Метод бинарного поиска номера элемента по коду, -1 при его отсутствии"""
+        key = code.encode("utf-8")
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._slice(self._code_offsets, self._codes, middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if (
+            low < self._count
+            and self._slice(self._code_offsets, self._codes, low) == key
+        ):
+            return low
+        return -1
+
+    def get(self, code, default=None):
+        """Метод получения значения элемента по коду"""
+        index = self.find(code)
+        if index < 0:
+            return default
+        return self.value(index)
+
+    def contains(self, code, value):
+        """Метод проверки наличия элемента с данными кодом и значением"""
+        if code is None or value is None:
+            return False
+        return self.get(code) == value
+
+
+def write_atomic(path, chunks):
+    """Функция записи файла через временный файл с атомарной заменой"""
+    directory = os.path.dirname(path)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            for chunk in chunks:
+                file.write(chunk)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def iter_json_chunks(rows, chunk_size):
+    """
+    Генератор JSON-ответа списка элементов по строкам (код, значение),
+    совпадающего с ответом представления списка элементов
+    """
+    yield b'{"elements":['
+    lines = []
+    for number, (code, value) in enumerate(rows):
+        line = encode_ndjson_line({"code": code, "value": value})[:-1]
+        lines.append(("," if number else "") + line)
+        if len(lines) >= chunk_size:
+            yield "".join(lines).encode("utf-8")
+            lines = []
+    lines.append("]}")
+    text = "".join(lines).replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
+    yield text.encode("utf-8")
+
+
+def build_snapshot(version_id, directory=None, chunk_size=2000):
+    """
+    Функция сборки снимка действующих элементов версии справочника: файла
+    индекса для поиска и файла готового JSON-ответа. Прежние снимки версии
+    удаляются. Возвращает путь к снимку без расширения
+    """
+    directory = directory or get_snapshot_dir()
+    os.makedirs(directory, exist_ok=True)
+    name = get_snapshot_name(version_id, get_chain_revisions(version_id))
+    path = os.path.join(directory, name)
+    codes, values = bytearray(), bytearray()
+    code_offsets, value_offsets = array("I", [0]), array("I", [0])
+    for code, value in iter_sorted_elements(version_id, chunk_size):
+        codes += code.encode("utf-8")
+        values += value.encode("utf-8")
+        if len(codes) > MAX_BLOB_SIZE or len(values) > MAX_BLOB_SIZE:
+            raise ValueError("Размер элементов версии превышает 4 ГБ.")
+        code_offsets.append(len(codes))
+        value_offsets.append(len(values))
+    count = len(code_offsets) - 1
+    rows = (
+        (
+            codes[code_offsets[index] : code_offsets[index + 1]].decode("utf-8"),
+            values[value_offsets[index] : value_offsets[index + 1]].decode("utf-8"),
+        )
+        for index in range(count)
+    )
+    write_atomic(path + JSON_SUFFIX, iter_json_chunks(rows, chunk_size))
+    if sys.byteorder != "little":
+        code_offsets.byteswap()
+        value_offsets.byteswap()
+    write_atomic(
+        path + INDEX_SUFFIX,
+        [
+            HEADER.pack(MAGIC, count),
+            code_offsets.tobytes(),
+            value_offsets.tobytes(),
+            bytes(codes),
+            bytes(values),
+        ],
+    )
+    for file_name in os.listdir(directory):
+        if file_name.startswith(f"{version_id}-") and not file_name.startswith(name):
+            os.unlink(os.path.join(directory, file_name))
+    return path
+
+
+class SnapshotStore:
+    """
+    Снимки версий справочников, открытые в процессе.
+
+    Включается настройкой REFBOOKS_SNAPSHOT_DIR (каталог снимков). Имя
+    актуального снимка версии вычисляется по ревизиям версии и её базовых
+    версий и запоминается до смены поколения элементов версии в общем кэше,
+    поэтому при неизменных данных поиск снимка не обращается к БД. Если
+    снимка нет (не собран или устарел), возвращается None и данные
+    читаются из БД.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    @property
+    def enabled(self):
+        return bool(get_snapshot_dir())
+
+    def clear(self):
+        """
+        Метод сброса снимков процесса. Отображения файлов закрываются при
+        удалении объектов снимков, когда ими перестают пользоваться запросы
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def _open(self, path):
+        if not os.path.exists(path + INDEX_SUFFIX):
+            return None
+        try:
+            return Snapshot(path)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, version_id):
+        """Метод получения актуального снимка версии справочника"""
+        if not self.enabled:
+            return None
+        generations = get_generations(*elements_scopes(version_id))
+        with self._lock:
+            entry = self._entries.get(version_id)
+        if entry is not None and entry[0] == generations:
+            path, snapshot = entry[1], entry[2]
+            if snapshot is not None:
+                return snapshot
+        else:
+            revisions = get_chain_revisions(version_id)
+            path = os.path.join(
+                get_snapshot_dir(), get_snapshot_name(version_id, revisions)
+            )
+        if entry is not None and entry[1] == path and entry[2] is not None:
+            snapshot = entry[2]
+        else:
+            snapshot = self._open(path)
+        with self._lock:
+            self._entries[version_id] = (generations, path, snapshot)
+        return snapshot
+
+
+snapshot_store = SnapshotStore()
@@ -0,0 +1,184 @@
+from datetime import date, timedelta
+
+from app_refbooks.admin import ELEMENTS_PAGE_SIZE
+from app_refbooks.models import Refbook, RefbookVersion, RefbookElement
+from django.contrib.auth.models import Permission, User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+class AdminChangelistQueriesTest(TestCase):
+    """Тестирование количества запросов к БД на страницах списков Django Admin"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser("admin", password="admin")
+        self.client.force_login(self.admin)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(captured)
+
+    def add_rows(self, number):
+        refbooks = Refbook.objects.bulk_create(
+            Refbook(code=f"ADMIN-{i}", name=f"Справочник {i}") for i in range(number)
+        )
+        versions = RefbookVersion.objects.bulk_create(
+            RefbookVersion(
+                refbook=refbook,
+                version="1.0",
+                start_date=date(2020, 1, 1) + timedelta(days=i),
+            )
+            for i, refbook in enumerate(refbooks)
+        )
+        RefbookElement.objects.bulk_create(
+            RefbookElement(refbook_version=version, code=f"E{i}", value=f"value {i}")
+            for i, version in enumerate(versions)
+        )
+
+    def test_number_of_queries_does_not_depend_on_rows(self):
+        """Тестирование постоянного количества запросов при росте числа строк"""
+        urls = [
+            reverse(f"admin:app_refbooks_{model}_changelist")
+            for model in ("refbook", "refbookversion", "refbookelement")
+        ]
+        expected = {url: self.count_queries(url) for url in urls}
+        self.add_rows(30)
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), expected[url])
+
+    def test_number_of_queries_on_change_pages_does_not_depend_on_versions(self):
+        """Тестирование постоянного количества запросов на страницах изменения"""
+        urls = [
+            reverse("admin:app_refbooks_refbook_change", args=(1,)),
+            reverse("admin:app_refbooks_refbookversion_change", args=(1,)),
+        ]
+        for url in urls:
+            self.count_queries(url)
+        expected = {url: self.count_queries(url) for url in urls}
+        self.add_rows(30)
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), expected[url])
+
+    def test_current_version_is_displayed(self):
+        """Тестирование отображения текущей версии справочника и даты начала её действия"""
+        RefbookVersion.objects.create(
+            refbook_id=2, version="9.0", start_date=date.today() + timedelta(days=1)
+        )
+        response = self.client.get(reverse("admin:app_refbooks_refbook_changelist"))
+        refbooks = {
+            refbook.pk: refbook for refbook in response.context["cl"].result_list
+        }
+        self.assertEqual(refbooks[2].current_version_title, "3.0")
+        self.assertEqual(refbooks[2].current_version_start_date, date(2023, 7, 20))
+        self.assertContains(response, f"{refbooks[2].name}: 3.0")
+
+
+class RefbookVersionAdminElementsTest(TestCase):
+    """Тестирование работы с элементами версии справочника в Django Admin"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser("admin", password="admin")
+        self.client.force_login(self.admin)
+        self.url = reverse("admin:app_refbooks_refbookversion_change", args=(2,))
+
+    def add_elements(self, number):
+        RefbookElement.objects.bulk_create(
+            RefbookElement(refbook_version_id=2, code=f"X{i:04d}", value=f"value {i}")
+            for i in range(number)
+        )
+
+    def test_elements_are_paginated(self):
+        """Тестирование постраничного вывода элементов на странице версии"""
+        self.add_elements(ELEMENTS_PAGE_SIZE * 2)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context["elements"]), ELEMENTS_PAGE_SIZE)
+        self.assertTrue(response.context["elements_has_next"])
+        self.assertNotIn("refbook_elements-TOTAL_FORMS", response.content.decode())
+        response = self.client.get(self.url + "?elements_page=3")
+        self.assertEqual(len(response.context["elements"]), 3)
+        self.assertFalse(response.context["elements_has_next"])
+
+    def test_number_of_queries_does_not_depend_on_elements(self):
+        """Тестирование постоянного количества запросов при росте числа элементов"""
+        with CaptureQueriesContext(connection) as expected:
+            self.client.get(self.url)
+        self.add_elements(ELEMENTS_PAGE_SIZE * 3)
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(self.url)
+        self.assertEqual(len(captured), len(expected))
+
+    def test_elements_are_searched_by_code_prefix(self):
+        """Тестирование поиска элементов версии по началу кода"""
+        response = self.client.get(self.url + "?elements_q=A0")
+        codes = [element["code"] for element in response.context["elements"]]
+        self.assertEqual(codes, ["A00", "A01"])
+
+    def test_element_changelist_is_searched_by_code_prefix(self):
+        """Тестирование поиска в списке элементов по началу кода"""
+        url = reverse("admin:app_refbooks_refbookelement_changelist")
+        response = self.client.get(url + "?refbook_version__id__exact=2&q=A0")
+        codes = {element.code for element in response.context["cl"].result_list}
+        self.assertEqual(codes, {"A00", "A01"})
+
+    def test_elements_are_exported(self):
+        """Тестирование выгрузки элементов версии в CSV и NDJSON"""
+        cases = {
+            "csv": "code,value\nA00,test_value A00\nA01,test_value A01\n"
+            "C001,test_value C001\n",
+            "ndjson": '{"code":"A00","value":"test_value A00"}\n'
+            '{"code":"A01","value":"test_value A01"}\n'
+            '{"code":"C001","value":"test_value C001"}\n',
+        }
+        for fmt, expected in cases.items():
+            with self.subTest(fmt=fmt):
+                url = reverse("admin:app_refbooks_refbookversion_export", args=(2, fmt))
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                content = b"".join(response.streaming_content).decode("utf-8")
+                self.assertEqual(content, expected)
+
+    def test_export_action_requires_single_version(self):
+        """Тестирование действия выгрузки элементов выбранной версии"""
+        url = reverse("admin:app_refbooks_refbookversion_changelist")
+        response = self.client.post(
+            url, {"action": "export_csv", "_selected_action": [2]}
+        )
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        response = self.client.post(
+            url, {"action": "export_csv", "_selected_action": [1, 2]}
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_materialize_action_requires_change_permission(self):
+        """Тестирование запрета материализации версии без права на изменение"""
+        RefbookVersion.objects.filter(pk=2).update(base_version_id=1)
+        viewer = User.objects.create_user("viewer", password="viewer", is_staff=True)
+        viewer.user_permissions.add(
+            Permission.objects.get(codename="view_refbookversion")
+        )
+        url = reverse("admin:app_refbooks_refbookversion_changelist")
+        data = {"action": "materialize", "_selected_action": [2]}
+        self.client.force_login(viewer)
+        self.client.post(url, data)
+        self.assertEqual(RefbookVersion.objects.get(pk=2).base_version_id, 1)
+        self.client.force_login(self.admin)
+        self.client.post(url, data)
+        self.assertIsNone(RefbookVersion.objects.get(pk=2).base_version_id)
@@ -0,0 +1,90 @@
+import json
+
+from app_refbooks.models import RefbookVersion
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+
+class AsyncViewsTest(APITestCase):
+    """Тестирование асинхронных представлений справочников"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    async def assertSameAsSync(self, name, sync_name, params=None, **kwargs):
+        expected = await self.async_client.get(
+            reverse(f"refbooks:{sync_name}", kwargs=kwargs), params or {}
+        )
+        response = await self.async_client.get(
+            reverse(f"refbooks:{name}", kwargs=kwargs), params or {}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], expected["Content-Type"])
+        self.assertEqual(json.loads(response.content), json.loads(expected.content))
+
+    async def test_refbook_list(self):
+        """Тестирование асинхронного списка справочников"""
+        await self.assertSameAsSync("async_refbook_list", "refbook_list")
+        await self.assertSameAsSync(
+            "async_refbook_list", "refbook_list", {"date": "2022-12-12"}
+        )
+
+    async def test_element_list(self):
+        """Тестирование асинхронного списка элементов версии справочника"""
+        for params in ({"version": "2.0"}, {"version": "9.0"}, {}):
+            with self.subTest(params=params):
+                await self.assertSameAsSync(
+                    "async_refbook_element_list", "refbook_element_list", params, pk=2
+                )
+
+    async def test_element_list_stream(self):
+        """Тестирование асинхронной потоковой выдачи элементов в формате NDJSON"""
+        url = reverse("refbooks:async_refbook_element_list", kwargs={"pk": 1})
+        response = await self.async_client.get(
+            url, {"version": "2.0", "format": "ndjson"}
+        )
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(
+            sorted(json.loads(line)["code"] for line in content.splitlines()),
+            ["A00", "A01", "C001"],
+        )
+
+    async def test_element_check(self):
+        """Тестирование асинхронной валидации элемента версии справочника"""
+        cases = [
+            ({"version": "2.0", "code": "A00", "value": "test_value A00"}, True),
+            ({"version": "2.0", "code": "A00", "value": "test_value A01"}, False),
+            ({"version": "9.0", "code": "A00", "value": "test_value A00"}, False),
+            ({"version": "2.0", "code": "A00"}, False),
+        ]
+        url = reverse("refbooks:async_refbook_element_check", kwargs={"pk": 1})
+        for params, expected in cases:
+            with self.subTest(params=params):
+                response = await self.async_client.get(url, params)
+                self.assertEqual(json.loads(response.content), {"result": expected})
+
+    async def test_element_check_in_delta_version(self):
+        """Тестирование асинхронной валидации элемента производной версии"""
+        await RefbookVersion.objects.acreate(
+            refbook_id=1, version="3.1", start_date="2023-07-01", base_version_id=3
+        )
+        url = reverse("refbooks:async_refbook_element_check", kwargs={"pk": 1})
+        response = await self.async_client.get(
+            url, {"version": "3.1", "code": "C002", "value": "test_value C002"}
+        )
+        self.assertEqual(json.loads(response.content), {"result": True})
+
+    async def test_version_at_date(self):
+        """Тестирование асинхронного выбора версии справочника по дате"""
+        url = reverse("refbooks:async_refbook_element_check", kwargs={"pk": 1})
+        params = {"code": "J00", "value": "test_value J00"}
+        response = await self.async_client.get(url, {**params, "date": "2022-12-31"})
+        self.assertEqual(json.loads(response.content), {"result": True})
+        self.assertEqual(response["X-Refbook-Version"], "1.0")
+        response = await self.async_client.get(url, {**params, "date": "2022-13-31"})
+        self.assertEqual(response.status_code, 400)
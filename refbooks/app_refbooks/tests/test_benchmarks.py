@@ -0,0 +1,90 @@
+import json
+from io import StringIO
+
+from app_refbooks.benchmarks import generate_dataset, percentile, run_benchmark
+from app_refbooks.cache import get_shared_cache
+from app_refbooks.models import RefbookVersion, RefbookElement
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+
+class PercentileTest(TestCase):
+    """Тестирование вычисления перцентилей"""
+
+    def test_percentile_is_correct(self):
+        """Тестирование перцентилей методом ближайшего ранга"""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([5], 99), 5)
+        self.assertIsNone(percentile([], 50))
+
+
+class RunBenchmarkTest(TestCase):
+    """Тестирование замера производительности API на синтетических данных"""
+
+    def test_report_covers_all_endpoints(self):
+        """Тестирование формирования отчёта по всем URL приложения"""
+        report = run_benchmark(refbooks=2, versions=2, elements=5, requests=3)
+        json.dumps(report)
+        self.assertEqual(report["dataset"]["elements_per_version"], 5)
+        self.assertEqual(
+            set(report["endpoints"]),
+            {
+                "refbook_list",
+                "refbook_list_by_date",
+                "refbook_element_list",
+                "refbook_element_list_page",
+                "refbook_element_check",
+                "refbook_element_search",
+                "refbook_element_search_contains",
+                "refbook_element_batch_check",
+                "refbook_element_lookup",
+                "refbook_version_diff",
+                "metrics",
+            },
+        )
+        for name, result in report["endpoints"].items():
+            with self.subTest(endpoint=name):
+                self.assertEqual(result["statuses"], [200])
+                self.assertEqual(result["requests"], 3)
+                self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+        self.assertEqual(
+            set(report["async_endpoints"]),
+            {"refbook_list", "refbook_element_list", "refbook_element_check"},
+        )
+        for name, result in report["async_endpoints"].items():
+            with self.subTest(endpoint=name):
+                self.assertEqual(result["statuses"], [200])
+                self.assertGreater(result["asgi_requests_per_second"], 0)
+        self.assertEqual(
+            set(report["element_memory"]), {"model_instances", "dict", "element_set"}
+        )
+
+    def test_shared_cache_is_not_used(self):
+        """Тестирование изоляции замера от общего кэша справочников"""
+        cache = get_shared_cache()
+        cache.set("refbooks:test", "value")
+        with override_settings(REFBOOKS_RESPONSE_CACHE_ENABLED=True):
+            run_benchmark(refbooks=1, versions=1, elements=2, requests=2)
+        self.assertEqual(cache.get("refbooks:test"), "value")
+        self.assertFalse(
+            any("refbooks:response:" in key for key in cache._cache.keys())
+        )
+
+    def test_synthetic_dataset_is_correct(self):
+        """Тестирование генерации синтетических справочников"""
+        generate_dataset(refbooks=3, versions=2, elements=4)
+        self.assertEqual(RefbookVersion.objects.count(), 6)
+        self.assertEqual(RefbookElement.objects.count(), 24)
+
+
+class BenchRefbooksCommandTest(TestCase):
+    """Тестирование команды замера производительности API"""
+
+    def test_invalid_arguments_are_rejected(self):
+        """Тестирование проверки аргументов команды"""
+        for option in ("refbooks", "versions", "requests", "concurrency"):
+            with self.subTest(option=option):
+                with self.assertRaises(CommandError):
+                    call_command("bench_refbooks", **{option: 0}, stdout=StringIO())
@@ -0,0 +1,197 @@
+import tempfile
+from unittest import mock
+
+from app_refbooks.cache import (
+    GENERATION_KEY_PREFIX,
+    VERSIONS_SCOPE,
+    bump_generations,
+    elements_scope,
+    get_generations,
+    get_shared_cache,
+    remember_generations,
+    response_cache,
+)
+from app_refbooks.checks import check_shared_cache
+from app_refbooks.lookup import element_index
+from app_refbooks.models import RefbookVersion, RefbookElement
+from app_refbooks.versions import version_resolver
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+
+class SharedGenerationTest(APITestCase):
+    """Тестирование инвалидации кэшей процессов через поколения в общем кэше"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def test_generation_changes_on_bump(self):
+        """Тестирование смены поколения области инвалидации"""
+        (generation,) = get_generations(VERSIONS_SCOPE)
+        self.assertEqual(get_generations(VERSIONS_SCOPE), (generation,))
+        bump_generations(VERSIONS_SCOPE)
+        self.assertNotEqual(get_generations(VERSIONS_SCOPE), (generation,))
+
+    def test_version_resolver_reloads_on_foreign_change(self):
+        """Тестирование перезагрузки версий после их изменения в другом процессе"""
+        version_resolver.get_current_version(1)
+        with self.assertNumQueries(0):
+            version_resolver.get_current_version(1)
+        bump_generations(VERSIONS_SCOPE)
+        with self.assertNumQueries(1):
+            version_resolver.get_current_version(1)
+
+    def test_element_index_reloads_on_foreign_change(self):
+        """Тестирование перезагрузки индекса элементов после их изменения в другом процессе"""
+        element_index.get(1)
+        with self.assertNumQueries(0):
+            element_index.get(1)
+        bump_generations(elements_scope(1))
+        with self.assertNumQueries(1):
+            element_index.get(1)
+
+    def test_generations_are_read_once_per_request(self):
+        """Тестирование чтения поколений из общего кэша один раз за запрос"""
+        cache = get_shared_cache()
+        requests = [
+            (
+                reverse("refbooks:refbook_element_check", kwargs={"pk": 2}),
+                {"code": "D01", "value": "test_value D01"},
+            ),
+            (reverse("refbooks:refbook_element_list", kwargs={"pk": 2}), {}),
+        ]
+        for url, params in requests:
+            version_resolver.clear()
+            element_index.clear()
+            with self.subTest(url=url), mock.patch.object(
+                cache, "get_many", wraps=cache.get_many
+            ) as get_many:
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 200)
+                keys = [key for call in get_many.call_args_list for key in call.args[0]]
+                self.assertTrue(keys)
+                self.assertEqual(len(keys), len(set(keys)))
+
+    def test_bump_is_visible_in_request(self):
+        """Тестирование смены поколения, запомненного при обработке запроса"""
+        with remember_generations():
+            (generation,) = get_generations(VERSIONS_SCOPE)
+            bump_generations(VERSIONS_SCOPE)
+            self.assertNotEqual(get_generations(VERSIONS_SCOPE), (generation,))
+
+
+@override_settings(REFBOOKS_RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTest(APITestCase):
+    """Тестирование кэша отрендеренных ответов представлений"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        response_cache.clear()
+        get_shared_cache().clear()
+        self.refbook_list_url = reverse("refbooks:refbook_list")
+        self.element_list_url = (
+            reverse("refbooks:refbook_element_list", kwargs={"pk": 1}) + "?version=1.0"
+        )
+
+    def assertServedFromCache(self, url):
+        expected = self.client.get(url)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response["Content-Type"], expected["Content-Type"])
+        self.assertEqual(response["ETag"], expected["ETag"])
+
+    def test_element_list_is_served_from_cache(self):
+        """Тестирование выдачи элементов версии справочника из кэша"""
+        self.assertServedFromCache(self.element_list_url)
+
+    def test_refbook_list_is_served_from_cache(self):
+        """Тестирование выдачи списка справочников из кэша"""
+        self.assertServedFromCache(self.refbook_list_url + "?date=2022-12-12")
+
+    def test_shared_cache_is_used_by_other_processes(self):
+        """Тестирование выдачи ответа из общего кэша при пустом кэше процесса"""
+        expected = self.client.get(self.element_list_url)
+        response_cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(self.element_list_url)
+        self.assertEqual(response.content, expected.content)
+
+    def test_cache_is_invalidated_on_element_write(self):
+        """Тестирование сброса кэша при изменении элементов версии справочника"""
+        self.client.get(self.element_list_url)
+        RefbookElement.objects.create(
+            refbook_version_id=1, code="J02", value="test_value J02"
+        )
+        response = self.client.get(self.element_list_url)
+        self.assertEqual(len(response.json()["elements"]), 3)
+
+    def test_cache_is_invalidated_on_version_write(self):
+        """Тестирование сброса кэша списка справочников при добавлении версии"""
+        url = self.refbook_list_url + "?date=2022-12-12"
+        self.assertEqual(len(self.client.get(url).json()["refbooks"]), 1)
+        RefbookVersion.objects.create(
+            refbook_id=2, version="0.1", start_date="2022-01-01"
+        )
+        self.assertEqual(len(self.client.get(url).json()["refbooks"]), 2)
+
+    def test_representations_are_cached_separately(self):
+        """Тестирование раздельного кэширования разных представлений ответа"""
+        full = self.client.get(self.element_list_url).json()
+        page = self.client.get(self.element_list_url + "&limit=1").json()
+        self.assertEqual(len(full["elements"]), 2)
+        self.assertEqual(len(page["elements"]), 1)
+
+    def test_file_based_shared_cache(self):
+        """Тестирование работы с файловым кэшем в качестве общего кэша"""
+        with tempfile.TemporaryDirectory() as location:
+            caches = {
+                "default": {
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                },
+                "refbooks": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": location,
+                },
+            }
+            with override_settings(CACHES=caches):
+                expected = self.client.get(self.element_list_url)
+                response_cache.clear()
+                with self.assertNumQueries(1):
+                    response = self.client.get(self.element_list_url)
+                self.assertEqual(response.content, expected.content)
+
+
+class SharedCacheCheckTest(SimpleTestCase):
+    """Тестирование проверки общего кэша при нескольких процессах приложения"""
+
+    def test_process_local_cache(self):
+        """Тестирование ошибки при кэше в памяти процесса"""
+        with override_settings(REFBOOKS_PROCESSES=1):
+            self.assertEqual(check_shared_cache(None), [])
+        with override_settings(REFBOOKS_PROCESSES=4):
+            errors = check_shared_cache(None)
+        self.assertEqual([error.id for error in errors], ["app_refbooks.E001"])
+
+    @override_settings(REFBOOKS_PROCESSES=4)
+    def test_shared_cache(self):
+        """Тестирование отсутствия ошибки при общем кэше"""
+        with tempfile.TemporaryDirectory() as directory:
+            caches = {
+                "refbooks": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": directory,
+                }
+            }
+            with override_settings(CACHES=caches):
+                self.assertEqual(check_shared_cache(None), [])
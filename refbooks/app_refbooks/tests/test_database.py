@@ -0,0 +1,70 @@
+import os
+import tempfile
+from io import StringIO
+
+from app_refbooks.database import SQLITE_TUNED_PRAGMAS, get_sqlite_pragmas
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, override_settings
+
+
+class SqlitePragmasTest(SimpleTestCase):
+    """Тестирование применения PRAGMA к новым соединениям с SQLite"""
+
+    def get_pragmas(self, path, names):
+        wrapper = DatabaseWrapper({**connection.settings_dict, "NAME": path})
+        try:
+            with wrapper.cursor() as cursor:
+                values = {}
+                for name in names:
+                    cursor.execute(f"PRAGMA {name}")
+                    values[name] = cursor.fetchone()[0]
+                return values
+        finally:
+            wrapper.close()
+
+    def test_tuned_pragmas_are_applied(self):
+        """Тестирование режима SQLite для развёртывания на одном узле"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "db.sqlite3")
+            with override_settings(REFBOOKS_SQLITE_TUNED=True):
+                pragmas = self.get_pragmas(path, SQLITE_TUNED_PRAGMAS)
+        self.assertEqual(
+            pragmas,
+            {
+                "journal_mode": "wal",
+                "synchronous": 1,
+                "mmap_size": 268435456,
+                "busy_timeout": 5000,
+            },
+        )
+
+    def test_pragmas_are_not_applied_by_default(self):
+        """Тестирование соединения с SQLite без настроек режима"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "db.sqlite3")
+            with override_settings(REFBOOKS_SQLITE_TUNED=False):
+                self.assertEqual(get_sqlite_pragmas(), {})
+                pragmas = self.get_pragmas(path, ["journal_mode"])
+        self.assertEqual(pragmas, {"journal_mode": "delete"})
+
+    def test_explicit_pragmas_take_precedence(self):
+        """Тестирование приоритета PRAGMA, заданных настройкой"""
+        with override_settings(
+            REFBOOKS_SQLITE_TUNED=True, REFBOOKS_SQLITE_PRAGMAS={"cache_size": -2000}
+        ):
+            self.assertEqual(get_sqlite_pragmas(), {"cache_size": -2000})
+
+
+class BenchRefbooksDatabaseCommandTest(SimpleTestCase):
+    """Тестирование команды сравнения режимов БД"""
+
+    def test_invalid_arguments_are_rejected(self):
+        """Тестирование проверки аргументов команды"""
+        for option in ("versions", "elements", "readers", "requests"):
+            with self.subTest(option=option):
+                with self.assertRaises(CommandError):
+                    call_command(
+                        "bench_refbooks_database", **{option: 0}, stdout=StringIO()
+                    )
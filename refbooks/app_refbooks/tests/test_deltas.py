@@ -0,0 +1,211 @@
+import io
+from io import StringIO
+
+from app_refbooks.cache import get_shared_cache, response_cache
+from app_refbooks.deltas import (
+    get_depth,
+    materialize_deep_versions,
+    materialize_version,
+)
+from app_refbooks.importers import import_elements
+from app_refbooks.lookup import element_index
+from app_refbooks.models import Refbook, RefbookVersion, RefbookElement
+from app_refbooks.versions import effective_elements, version_resolver
+from django.core.exceptions import ValidationError
+from django.db.models import RestrictedError
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+
+class DeltaVersionTest(APITestCase):
+    """Тестирование производных версий справочников, хранящих отличия от базовой версии"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        element_index.clear()
+        response_cache.clear()
+        get_shared_cache().clear()
+        self.base = RefbookVersion.objects.get(refbook_id=1, version="2.0")
+        self.delta = RefbookVersion.objects.create(
+            refbook_id=1,
+            version="2.1",
+            start_date="2023-02-01",
+            base_version=self.base,
+        )
+        import_elements(
+            self.delta,
+            io.BytesIO(b"A00,test_value A00\nC001,changed C001\nD01,test_value D01\n"),
+        )
+
+    def effective(self, version):
+        return dict(effective_elements(version.pk).values_list("code", "value"))
+
+    def test_only_differences_are_stored(self):
+        """Тестирование хранения в производной версии только отличий"""
+        stored = set(
+            RefbookElement.objects.filter(refbook_version=self.delta).values_list(
+                "code", "value", "removed"
+            )
+        )
+        self.assertEqual(
+            stored,
+            {
+                ("C001", "changed C001", False),
+                ("D01", "test_value D01", False),
+                ("A01", "", True),
+            },
+        )
+
+    def test_effective_elements_are_resolved(self):
+        """Тестирование получения действующих элементов производной версии"""
+        expected = {
+            "A00": "test_value A00",
+            "C001": "changed C001",
+            "D01": "test_value D01",
+        }
+        self.assertEqual(self.effective(self.delta), expected)
+        self.assertTrue(element_index.contains(self.delta.pk, "A00", "test_value A00"))
+        self.assertFalse(element_index.contains(self.delta.pk, "A01", "test_value A01"))
+        url = reverse("refbooks:refbook_element_list", kwargs={"pk": 1})
+        response = self.client.get(url, {"version": "2.1", "limit": 2})
+        self.assertEqual(
+            [element["code"] for element in response.json()["elements"]],
+            ["A00", "C001"],
+        )
+
+    def test_removed_elements_of_version_without_base(self):
+        """Тестирование скрытия отметок об удалении в версии без базовой версии"""
+        RefbookVersion.objects.filter(pk=self.delta.pk).update(base_version=None)
+        version_resolver.clear()
+        element_index.clear()
+        self.assertEqual(
+            self.effective(self.delta),
+            {"C001": "changed C001", "D01": "test_value D01"},
+        )
+        self.assertFalse(element_index.contains(self.delta.pk, "A01", ""))
+
+    def test_base_changes_are_visible_in_delta(self):
+        """Тестирование видимости изменений базовой версии в производной версии"""
+        url = reverse("refbooks:refbook_element_list", kwargs={"pk": 1})
+        first = self.client.get(url, {"version": "2.1"})
+        self.assertTrue(element_index.contains(self.delta.pk, "A00", "test_value A00"))
+        RefbookElement.objects.filter(refbook_version=self.base, code="A00").update(
+            value="updated A00"
+        )
+        RefbookElement.objects.get(refbook_version=self.base, code="A00").save()
+        self.assertTrue(element_index.contains(self.delta.pk, "A00", "updated A00"))
+        second = self.client.get(
+            url, {"version": "2.1"}, HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        self.assertEqual(second.status_code, 200)
+        self.assertIn("updated A00", second.content.decode())
+
+    def test_materialization_keeps_effective_elements(self):
+        """Тестирование материализации производной версии"""
+        derived = RefbookVersion.objects.create(
+            refbook_id=1,
+            version="2.2",
+            start_date="2023-03-01",
+            base_version=self.delta,
+        )
+        import_elements(derived, io.BytesIO(b"A00,test_value A00\n"))
+        expected = self.effective(derived)
+        self.assertEqual(get_depth(derived.pk), 2)
+        materialized = materialize_deep_versions(max_depth=1)
+        self.assertEqual([version.pk for version in materialized], [derived.pk])
+        self.assertEqual(get_depth(derived.pk), 0)
+        self.assertEqual(self.effective(derived), expected)
+        self.assertFalse(
+            RefbookElement.objects.filter(
+                refbook_version=derived, removed=True
+            ).exists()
+        )
+
+    def test_versions_are_processed_in_batches(self):
+        """Тестирование загрузки и материализации версии пачками элементов"""
+        self.delta.refresh_from_db()
+        revision = self.delta.revision
+        result = import_elements(
+            self.delta,
+            io.BytesIO(b"A00,test_value A00\nC001,changed C001\nD01,test_value D01\n"),
+            batch_size=1,
+        )
+        self.assertEqual((result.created, result.unchanged, result.removed), (2, 1, 1))
+        expected = self.effective(self.delta)
+        self.delta.refresh_from_db()
+        self.assertEqual(self.delta.revision, revision + 1)
+        self.assertTrue(materialize_version(self.delta, batch_size=1))
+        self.assertEqual(self.effective(self.delta), expected)
+        self.assertEqual(
+            RefbookElement.objects.filter(refbook_version=self.delta).count(), 3
+        )
+        self.delta.refresh_from_db()
+        self.assertEqual(self.delta.revision, revision + 3)
+
+    @override_settings(REFBOOKS_DELTA_MAX_DEPTH=1)
+    def test_deep_import_is_materialized(self):
+        """Тестирование материализации версии при превышении глубины цепочки"""
+        derived = RefbookVersion.objects.create(
+            refbook_id=1,
+            version="2.2",
+            start_date="2023-03-01",
+            base_version=self.delta,
+        )
+        import_elements(derived, io.BytesIO(b"A00,test_value A00\n"))
+        derived.refresh_from_db()
+        self.assertIsNone(derived.base_version)
+        self.assertEqual(self.effective(derived), {"A00": "test_value A00"})
+
+    def test_materialize_command(self):
+        """Тестирование команды материализации версий"""
+        stdout = StringIO()
+        call_command("materialize_refbook_versions", "--max-depth=0", stdout=stdout)
+        self.delta.refresh_from_db()
+        self.assertIsNone(self.delta.base_version)
+        self.assertIn("Материализовано версий: 1", stdout.getvalue())
+
+    def test_base_version_is_validated(self):
+        """Тестирование проверки базовой версии"""
+        self.base.base_version = self.delta
+        with self.assertRaises(ValidationError):
+            self.base.clean()
+        other = RefbookVersion.objects.get(refbook_id=2, version="1.0")
+        self.delta.base_version = other
+        with self.assertRaises(ValidationError):
+            self.delta.clean()
+
+    def test_base_version_in_use_is_not_deleted(self):
+        """Тестирование запрета удаления базовой версии производной версии"""
+        with self.assertRaises(RestrictedError):
+            self.base.delete()
+        self.assertTrue(RefbookVersion.objects.filter(pk=self.base.pk).exists())
+
+    def test_refbook_with_delta_chain_is_deleted(self):
+        """Тестирование удаления справочника вместе с цепочкой производных версий"""
+        RefbookVersion.objects.create(
+            refbook_id=1,
+            version="2.2",
+            start_date="2023-03-01",
+            base_version=self.delta,
+        )
+        Refbook.objects.get(pk=1).delete()
+        self.assertFalse(RefbookVersion.objects.filter(refbook_id=1).exists())
+        self.assertFalse(
+            RefbookElement.objects.filter(refbook_version__refbook_id=1).exists()
+        )
+
+    def test_version_chain_is_cached(self):
+        """Тестирование получения цепочки базовых версий без запросов к БД"""
+        version_resolver.chain(self.delta.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                version_resolver.chain(self.delta.pk), [self.delta.pk, self.base.pk]
+            )
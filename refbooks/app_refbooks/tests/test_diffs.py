@@ -0,0 +1,100 @@
+import json
+
+from app_refbooks.diffs import iter_diff
+from app_refbooks.models import RefbookElement
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+
+class IterDiffTest(APITestCase):
+    """Тестирование слияния упорядоченных последовательностей элементов"""
+
+    def test_diff_is_correct(self):
+        """Тестирование определения добавленных, удалённых и изменённых элементов"""
+        old = [("A", "1"), ("B", "2"), ("D", "4"), ("E", "5")]
+        new = [("B", "2"), ("C", "3"), ("D", "40"), ("F", "6")]
+        self.assertEqual(
+            list(iter_diff(old, new)),
+            [
+                ("removed", "A", "1", None),
+                ("added", "C", "3", None),
+                ("changed", "D", "40", "4"),
+                ("removed", "E", "5", None),
+                ("added", "F", "6", None),
+            ],
+        )
+
+    def test_diff_of_empty_sequences(self):
+        """Тестирование отличий с пустой последовательностью"""
+        self.assertEqual(list(iter_diff([], [])), [])
+        self.assertEqual(
+            list(iter_diff([("A", "1")], [])), [("removed", "A", "1", None)]
+        )
+        self.assertEqual(list(iter_diff([], [("A", "1")])), [("added", "A", "1", None)])
+
+
+class RefbookVersionDiffAPIViewTest(APITestCase):
+    """Тестирование представления отличий элементов двух версий справочника"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("refbooks:refbook_version_diff", kwargs={"pk": 1})
+
+    def get_changes(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        content = b"".join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_diff_is_correct(self):
+        """Тестирование отличий версий 2.0 и 3.0 справочника"""
+        RefbookElement.objects.filter(refbook_version_id=3, code="C001").update(
+            value="changed C001"
+        )
+        self.assertEqual(
+            self.get_changes(**{"from": "2.0", "to": "3.0"}),
+            [
+                {
+                    "change": "removed",
+                    "code": "A00",
+                    "value": "test_value A00",
+                    "old_value": None,
+                },
+                {
+                    "change": "removed",
+                    "code": "A01",
+                    "value": "test_value A01",
+                    "old_value": None,
+                },
+                {
+                    "change": "changed",
+                    "code": "C001",
+                    "value": "changed C001",
+                    "old_value": "test_value C001",
+                },
+                {
+                    "change": "added",
+                    "code": "C002",
+                    "value": "test_value C002",
+                    "old_value": None,
+                },
+            ],
+        )
+
+    def test_diff_of_same_version_is_empty(self):
+        """Тестирование отсутствия отличий версии от самой себя"""
+        self.assertEqual(self.get_changes(**{"from": "2.0", "to": "2.0"}), [])
+
+    def test_diff_requires_existing_versions(self):
+        """Тестирование ошибок при отсутствии параметров и версий"""
+        self.assertEqual(self.client.get(self.url, {"from": "2.0"}).status_code, 400)
+        response = self.client.get(self.url, {"from": "2.0", "to": "9.0"})
+        self.assertEqual(response.status_code, 404)
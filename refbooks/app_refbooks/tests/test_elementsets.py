@@ -0,0 +1,100 @@
+from app_refbooks.benchmarks import measure_element_memory
+from app_refbooks.elementsets import ElementSet
+from app_refbooks.lookup import element_index
+from django.test import SimpleTestCase, TestCase
+
+ROWS = [
+    ("B02", "Вирусный гепатит"),
+    ("A00", "Холера"),
+    ("A01", "Брюшной тиф 🦠"),
+    ("C", ""),
+]
+
+
+class ElementSetTest(SimpleTestCase):
+    """Тестирование компактного набора элементов версии справочника"""
+
+    def setUp(self):
+        self.elements = ElementSet(ROWS)
+
+    def test_mapping(self):
+        """Тестирование доступа к элементам набора по коду"""
+        self.assertEqual(len(self.elements), 4)
+        self.assertEqual(list(self.elements), ["A00", "A01", "B02", "C"])
+        self.assertEqual(self.elements, dict(ROWS))
+        self.assertEqual(self.elements["A01"], "Брюшной тиф 🦠")
+        self.assertEqual(self.elements.get("C"), "")
+        self.assertIn("B02", self.elements)
+        self.assertNotIn("B0", self.elements)
+        with self.assertRaises(KeyError):
+            self.elements["D00"]
+
+    def test_missing_codes(self):
+        """Тестирование поиска отсутствующих и некорректных кодов"""
+        for code in ("", "0", "A", "A000", "Z", None, 1):
+            with self.subTest(code=code):
+                self.assertIsNone(self.elements.get(code))
+                self.assertEqual(self.elements.get(code, "default"), "default")
+                self.assertEqual(self.elements.find(code), -1)
+
+    def test_contains(self):
+        """Тестирование проверки наличия элемента с данными кодом и значением"""
+        self.assertTrue(self.elements.contains("A00", "Холера"))
+        self.assertFalse(self.elements.contains("A00", "холера"))
+        self.assertFalse(self.elements.contains("A00", None))
+        self.assertFalse(self.elements.contains(None, "Холера"))
+
+    def test_empty_set(self):
+        """Тестирование пустого набора"""
+        elements = ElementSet()
+        self.assertEqual(len(elements), 0)
+        self.assertIsNone(elements.get("A00"))
+        self.assertEqual(elements, {})
+
+    def test_codes_are_shared_between_sets(self):
+        """Тестирование хранения одинаковых кодов разных наборов в одном экземпляре"""
+        other = ElementSet([("".join(["A", "00"]), "Холера")])
+        self.assertIs(other.code(0), self.elements.code(0))
+
+
+class ElementIndexSetTest(TestCase):
+    """Тестирование хранения элементов версий в индексе компактными наборами"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        element_index.clear()
+        self.addCleanup(element_index.clear)
+
+    def test_index_holds_element_sets(self):
+        """Тестирование загрузки элементов версии в компактный набор"""
+        elements = element_index.get(2)
+        self.assertIsInstance(elements, ElementSet)
+        self.assertEqual(
+            elements,
+            {
+                "A00": "test_value A00",
+                "A01": "test_value A01",
+                "C001": "test_value C001",
+            },
+        )
+        self.assertTrue(element_index.contains(2, "C001", "test_value C001"))
+
+
+class ElementMemoryBenchmarkTest(SimpleTestCase):
+    """Тестирование замера памяти, занимаемой элементами версий"""
+
+    def test_report(self):
+        """Тестирование отчёта о памяти на элемент при разных способах хранения"""
+        report = measure_element_memory(versions=3, elements=200, lookups=10)
+        self.assertEqual(set(report), {"model_instances", "dict", "element_set"})
+        self.assertIsNone(report["model_instances"]["lookup_ns"])
+        self.assertGreater(report["element_set"]["lookup_ns"], 0)
+        self.assertLess(
+            report["element_set"]["bytes_per_element"],
+            report["dict"]["bytes_per_element"],
+        )
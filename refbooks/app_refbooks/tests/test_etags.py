@@ -0,0 +1,143 @@
+from app_refbooks.models import Refbook, RefbookVersion, RefbookElement
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+
+class RevisionTest(APITestCase):
+    """Тестирование ревизий справочников и версий справочников"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        self.refbook = Refbook.objects.get(pk=1)
+        self.version = RefbookVersion.objects.get(pk=1)
+
+    def assertRevisionsIncreased(self, version=True):
+        refbook_revision = self.refbook.revision
+        version_revision = self.version.revision
+        self.refbook.refresh_from_db()
+        self.version.refresh_from_db()
+        self.assertGreater(self.refbook.revision, refbook_revision)
+        if version:
+            self.assertGreater(self.version.revision, version_revision)
+
+    def test_element_write_increases_revisions(self):
+        """Тестирование увеличения ревизий при изменении элементов версии справочника"""
+        element = RefbookElement.objects.create(
+            refbook_version=self.version, code="J02", value="test_value J02"
+        )
+        self.assertRevisionsIncreased()
+        element.value = "new value"
+        element.save()
+        self.assertRevisionsIncreased()
+        element.delete()
+        self.assertRevisionsIncreased()
+
+    def test_version_write_increases_revisions(self):
+        """Тестирование увеличения ревизий при изменении версии справочника"""
+        self.version.start_date = "2022-05-08"
+        self.version.save()
+        self.assertRevisionsIncreased()
+        RefbookVersion.objects.get(pk=2).delete()
+        self.assertRevisionsIncreased(version=False)
+
+    def test_save_does_not_restore_revisions(self):
+        """Тестирование сохранения загруженных ранее объектов после изменения элементов"""
+        self.version.save()
+        self.refbook.save()
+        self.assertRevisionsIncreased()
+        RefbookElement.objects.create(
+            refbook_version=self.version, code="J02", value="test_value J02"
+        )
+        self.assertRevisionsIncreased()
+        stale_refbook = Refbook.objects.get(pk=1)
+        stale_version = RefbookVersion.objects.get(pk=1)
+        RefbookElement.objects.filter(code="J02").get().delete()
+        refbook_revision = Refbook.objects.get(pk=1).revision
+        version_revision = RefbookVersion.objects.get(pk=1).revision
+        stale_version.save()
+        stale_refbook.save()
+        self.refbook.refresh_from_db()
+        self.version.refresh_from_db()
+        self.assertGreater(self.refbook.revision, refbook_revision)
+        self.assertGreater(self.version.revision, version_revision)
+
+
+class ConditionalGetTest(APITestCase):
+    """Тестирование условных запросов списков справочников и элементов"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.refbook_list_url = reverse("refbooks:refbook_list") + "?date=2022-12-12"
+        self.element_list_url = (
+            reverse("refbooks:refbook_element_list", kwargs={"pk": 1}) + "?version=1.0"
+        )
+
+    def test_element_list_not_modified(self):
+        """Тестирование ответа 304 без обращения к таблице элементов"""
+        response = self.client.get(self.element_list_url)
+        etag = response["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(self.element_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_element_list_etag_is_not_reused_after_version_save(self):
+        """Тестирование ETag после повторного сохранения версии справочника"""
+        version = RefbookVersion.objects.get(pk=1)
+        version.save()
+        etags = [self.client.get(self.element_list_url)["ETag"]]
+        RefbookElement.objects.create(
+            refbook_version_id=1, code="J02", value="test_value J02"
+        )
+        etags.append(self.client.get(self.element_list_url)["ETag"])
+        version.save()
+        etags.append(self.client.get(self.element_list_url)["ETag"])
+        self.assertEqual(len(set(etags)), 3)
+
+    def test_element_list_etag_changes_on_element_write(self):
+        """Тестирование изменения ETag при изменении элементов версии справочника"""
+        etag = self.client.get(self.element_list_url)["ETag"]
+        RefbookElement.objects.create(
+            refbook_version_id=1, code="J02", value="test_value J02"
+        )
+        response = self.client.get(self.element_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["elements"]), 3)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_element_list_etag_depends_on_representation(self):
+        """Тестирование различия ETag для разных представлений списка элементов"""
+        etags = {
+            self.client.get(self.element_list_url)["ETag"],
+            self.client.get(self.element_list_url + "&format=ndjson")["ETag"],
+            self.client.get(self.element_list_url + "&limit=1")["ETag"],
+            self.client.get(self.element_list_url.replace("1.0", "2.0"))["ETag"],
+        }
+        self.assertEqual(len(etags), 4)
+
+    def test_refbook_list_not_modified(self):
+        """Тестирование ответа 304 для списка справочников"""
+        etag = self.client.get(self.refbook_list_url)["ETag"]
+        response = self.client.get(self.refbook_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_refbook_list_etag_changes_on_version_write(self):
+        """Тестирование изменения ETag списка справочников при добавлении версии"""
+        etag = self.client.get(self.refbook_list_url)["ETag"]
+        RefbookVersion.objects.create(
+            refbook_id=2, version="0.1", start_date="2022-01-01"
+        )
+        response = self.client.get(self.refbook_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["refbooks"]), 2)
@@ -0,0 +1,238 @@
+import io
+import os
+import tempfile
+from io import StringIO
+
+from app_refbooks.importers import detect_format, import_elements
+from app_refbooks.lookup import element_index
+from app_refbooks.models import RefbookVersion, RefbookElement
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+
+
+class ImportElementsTest(APITestCase):
+    """Тестирование потоковой загрузки элементов версии справочника"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        element_index.clear()
+        self.version = RefbookVersion.objects.get(refbook__code="MS1", version="1.0")
+
+    def codes(self):
+        return set(
+            RefbookElement.objects.filter(refbook_version=self.version).values_list(
+                "code", flat=True
+            )
+        )
+
+    def test_detect_format(self):
+        """Тестирование определения формата файла по расширению"""
+        self.assertEqual(detect_format("elements.csv"), "csv")
+        self.assertEqual(detect_format("elements.NDJSON"), "ndjson")
+        self.assertEqual(detect_format("elements.jsonl"), "ndjson")
+        self.assertEqual(detect_format("elements.txt"), "csv")
+
+    def test_csv_rows_are_validated(self):
+        """Тестирование загрузки CSV с отклонением некорректных строк"""
+        content = (
+            "code,value\n"
+            "J02,test_value J02\n"
+            "J00,test_value J00\n"
+            "J03\n"
+            ",test_value\n"
+            "J04,\n"
+            "J02,test_value J02\n"
+            "J05,test_value J05\n"
+        )
+        result = import_elements(
+            self.version, io.BytesIO(content.encode()), batch_size=1
+        )
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.rejected, 5)
+        self.assertEqual([error["line"] for error in result.errors], [3, 4, 5, 6, 7])
+        self.assertEqual(self.codes(), {"J00", "J01", "J02", "J05"})
+
+    def test_ndjson_rows_are_validated(self):
+        """Тестирование загрузки NDJSON с отклонением некорректных строк"""
+        content = (
+            '{"code": "J02", "value": "test_value J02"}\n'
+            '["J03", "test_value J03"]\n'
+            "{not json}\n"
+            '{"value": "test_value"}\n'
+            '"J04"\n'
+        )
+        result = import_elements(
+            self.version, io.BytesIO(content.encode()), fmt="ndjson"
+        )
+        self.assertEqual(result.created, 2)
+        self.assertEqual([error["line"] for error in result.errors], [3, 4, 5])
+        self.assertEqual(self.codes(), {"J00", "J01", "J02", "J03"})
+
+    def test_replace_removes_existing_elements(self):
+        """Тестирование замены имеющихся элементов версии"""
+        result = import_elements(
+            self.version, io.BytesIO(b"J00,new value\n"), replace=True
+        )
+        self.assertEqual(result.created, 1)
+        self.assertEqual(
+            list(
+                RefbookElement.objects.filter(refbook_version=self.version).values_list(
+                    "code", "value"
+                )
+            ),
+            [("J00", "new value")],
+        )
+
+    def test_import_invalidates_caches_and_revision(self):
+        """Тестирование сброса индекса элементов и увеличения ревизии версии"""
+        self.assertFalse(element_index.contains(self.version.pk, "J02", "v"))
+        revision = self.version.revision
+        import_elements(self.version, io.BytesIO(b"J02,v\n"))
+        self.assertTrue(element_index.contains(self.version.pk, "J02", "v"))
+        self.version.refresh_from_db()
+        self.assertEqual(self.version.revision, revision + 1)
+
+    def test_import_is_atomic(self):
+        """Тестирование отката загрузки при ошибке чтения файла"""
+        with self.assertRaises(UnicodeDecodeError):
+            import_elements(
+                self.version, io.BytesIO(b"J02,v\nJ03,\xff\n"), batch_size=1
+            )
+        self.assertEqual(self.codes(), {"J00", "J01"})
+
+
+class ImportRefbookVersionCommandTest(APITestCase):
+    """Тестирование команды загрузки элементов версии справочника"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "elements.ndjson")
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write('{"code": "Z01", "value": "test_value Z01"}\n')
+
+    def test_command_creates_version(self):
+        """Тестирование создания версии и загрузки её элементов"""
+        stdout = StringIO()
+        call_command(
+            "import_refbook_version",
+            "MS1",
+            "5.0",
+            self.path,
+            "--start-date=2024-01-01",
+            stdout=stdout,
+        )
+        version = RefbookVersion.objects.get(refbook__code="MS1", version="5.0")
+        self.assertEqual(
+            list(version.refbook_elements.values_list("code", flat=True)), ["Z01"]
+        )
+        self.assertIn("Загружено элементов: 1", stdout.getvalue())
+
+    def test_failed_command_does_not_create_version(self):
+        """Тестирование отсутствия созданной версии после ошибки загрузки"""
+        with open(self.path, "wb") as file:
+            file.write(b'{"code": "Z01", "value": "\xff"}\n')
+        with self.assertRaises(CommandError):
+            call_command(
+                "import_refbook_version",
+                "MS1",
+                "5.0",
+                self.path,
+                "--start-date=2024-01-01",
+                stdout=StringIO(),
+            )
+        self.assertFalse(
+            RefbookVersion.objects.filter(refbook__code="MS1", version="5.0").exists()
+        )
+
+    def test_command_requires_existing_version_or_start_date(self):
+        """Тестирование ошибки при отсутствии версии и даты её начала"""
+        with self.assertRaises(CommandError):
+            call_command("import_refbook_version", "1", "5.0", self.path)
+
+
+class RefbookElementImportAPIViewTest(APITestCase):
+    """Тестирование загрузки элементов версии справочника через API"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("refbooks:refbook_element_import", kwargs={"pk": 1})
+        self.admin = User.objects.create_superuser("admin", password="admin")
+
+    def upload(self, **data):
+        file = SimpleUploadedFile("elements.csv", b"J02,test_value J02\nJ00,x\n")
+        return self.client.post(self.url, {"file": file, **data}, format="multipart")
+
+    def test_import_requires_admin(self):
+        """Тестирование запрета загрузки без прав администратора"""
+        response = self.upload(version="1.0")
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_import_reports_result(self):
+        """Тестирование отчёта о загрузке элементов"""
+        self.client.force_authenticate(self.admin)
+        response = self.upload(version="1.0")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["rejected"], 1)
+        self.assertEqual(response.data["errors"][0]["line"], 2)
+
+    def test_import_of_missing_version(self):
+        """Тестирование загрузки в отсутствующую версию"""
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.upload(version="9.0").status_code, 404)
+        response = self.upload(version="9.0", start_date="2030-01-01")
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(
+            RefbookVersion.objects.filter(refbook_id=1, version="9.0").exists()
+        )
+
+    def test_failed_import_does_not_create_version(self):
+        """Тестирование отсутствия созданной версии после ошибки загрузки"""
+        self.client.force_authenticate(self.admin)
+        today = timezone.now().date().isoformat()
+        file = SimpleUploadedFile("elements.csv", b"J02,v\nJ03,\xff\n")
+        response = self.client.post(
+            self.url,
+            {"file": file, "version": "99", "start_date": today},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(
+            RefbookVersion.objects.filter(refbook_id=1, version="99").exists()
+        )
+        check_url = reverse("refbooks:refbook_element_check", kwargs={"pk": 1})
+        response = self.client.get(check_url, {"code": "J02", "value": "v"})
+        self.assertNotEqual(response["X-Refbook-Version"], "99")
+
+    def test_admin_import_view(self):
+        """Тестирование загрузки элементов в административной панели"""
+        self.client.force_login(self.admin)
+        url = reverse("admin:app_refbooks_refbookversion_import", args=(1,))
+        self.assertEqual(self.client.get(url).status_code, 200)
+        file = SimpleUploadedFile("elements.csv", b"J02,test_value J02\n")
+        response = self.client.post(url, {"file": file})
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(RefbookElement.objects.filter(code="J02").exists())
@@ -0,0 +1,254 @@
+from app_refbooks.lookup import element_index
+from app_refbooks.models import Refbook, RefbookVersion, RefbookElement
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+
+class ElementIndexTest(APITestCase):
+    """Тестирование индекса элементов версий справочников"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        element_index.clear()
+        self.version = RefbookVersion.objects.get(refbook__code="MS1", version="3.0")
+
+    def test_contains_is_correct(self):
+        """Тестирование проверки наличия элемента в версии справочника"""
+        cases = {
+            ("C002", "test_value C002"): True,
+            ("C002", "test_value C001"): False,
+            ("J00", "test_value J00"): False,
+            (None, "test_value C002"): False,
+            ("C002", None): False,
+        }
+        for (code, value), expected in cases.items():
+            with self.subTest(code=code, value=value):
+                self.assertEqual(
+                    element_index.contains(self.version.pk, code, value), expected
+                )
+
+    def test_index_is_loaded_once(self):
+        """Тестирование однократной загрузки элементов версии справочника"""
+        with self.assertNumQueries(1):
+            element_index.contains(self.version.pk, "C001", "test_value C001")
+            element_index.contains(self.version.pk, "C002", "test_value C002")
+
+    def test_index_is_rebuilt_on_element_write(self):
+        """Тестирование перестроения индекса при изменении элементов версии справочника"""
+        self.assertFalse(element_index.contains(self.version.pk, "C003", "value"))
+        element = RefbookElement.objects.create(
+            refbook_version=self.version, code="C003", value="value"
+        )
+        self.assertTrue(element_index.contains(self.version.pk, "C003", "value"))
+        element.value = "new value"
+        element.save()
+        self.assertFalse(element_index.contains(self.version.pk, "C003", "value"))
+        self.assertTrue(element_index.contains(self.version.pk, "C003", "new value"))
+        element.delete()
+        self.assertFalse(element_index.contains(self.version.pk, "C003", "new value"))
+
+    @override_settings(REFBOOKS_ELEMENT_INDEX_MAX_ELEMENTS=3)
+    def test_least_recently_used_versions_are_evicted(self):
+        """Тестирование вытеснения давно не использовавшихся версий при превышении лимита"""
+        first, second, third = RefbookVersion.objects.filter(
+            refbook__code="MS1", version__in=["1.0", "2.0", "3.0"]
+        ).order_by("start_date")
+        element_index.get(first.pk)
+        self.assertEqual(len(element_index), 2)
+        element_index.get(second.pk)
+        self.assertEqual(len(element_index), 3)
+        element_index.get(third.pk)
+        self.assertEqual(len(element_index), 2)
+        with self.assertNumQueries(0):
+            element_index.get(third.pk)
+        with self.assertNumQueries(1):
+            element_index.get(first.pk)
+
+    @override_settings(REFBOOKS_ELEMENT_INDEX_MAX_ELEMENTS=1)
+    def test_versions_that_do_not_fit_are_checked_by_query(self):
+        """Тестирование проверки элементов версии, не помещающейся в индекс, запросом к БД"""
+        self.assertIsNone(element_index.get(self.version.pk))
+        self.assertEqual(len(element_index), 0)
+        with self.assertNumQueries(1):
+            self.assertTrue(
+                element_index.contains(self.version.pk, "C002", "test_value C002")
+            )
+        with self.assertNumQueries(1):
+            self.assertFalse(
+                element_index.contains(self.version.pk, "C002", "test_value C001")
+            )
+        url = reverse("refbooks:refbook_element_batch_check", kwargs={"pk": 1})
+        response = self.client.post(
+            url,
+            {
+                "version": "3.0",
+                "elements": [["C001", "test_value C001"], ["C002", "x"]],
+            },
+            format="json",
+        )
+        self.assertEqual(response.json(), {"results": [True, False]})
+
+
+class RefbookElementCheckIndexTest(APITestCase):
+    """Тестирование валидации элемента справочника через индекс элементов"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.refbook = Refbook.objects.get(code="ICD-10")
+        self.url = reverse(
+            "refbooks:refbook_element_check", kwargs={"pk": self.refbook.pk}
+        )
+
+    def test_version_is_constrained_by_refbook(self):
+        """Тестирование поиска элемента только в версиях заданного справочника"""
+        response = self.client.get(
+            self.url, {"code": "J00", "value": "test_value J00", "version": "1.0"}
+        )
+        self.assertEqual(response.json(), {"result": False})
+        response = self.client.get(
+            self.url, {"code": "B00", "value": "test_value B00", "version": "1.0"}
+        )
+        self.assertEqual(response.json(), {"result": True})
+
+    def test_unknown_version_is_not_valid(self):
+        """Тестирование валидации элемента в отсутствующей версии справочника"""
+        response = self.client.get(
+            self.url, {"code": "B00", "value": "test_value B00", "version": "9.0"}
+        )
+        self.assertEqual(response.json(), {"result": False})
+
+    def test_repeated_check_does_not_query_database(self):
+        """Тестирование отсутствия запросов к БД при повторной валидации элемента"""
+        params = {"code": "B00", "value": "test_value B00", "version": "1.0"}
+        self.client.get(self.url, params)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.json(), {"result": True})
+
+
+class RefbookElementLookupAPIViewTest(APITestCase):
+    """Тестирование представления для проверки элементов нескольких справочников"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        element_index.clear()
+        self.url = reverse("refbooks:refbook_element_lookup")
+        self.items = [
+            {
+                "refbook": "MS1",
+                "code": "J00",
+                "value": "test_value J00",
+                "version": "1.0",
+            },
+            {
+                "refbook": 1,
+                "code": "C001",
+                "value": "test_value C001",
+                "version": "2.0",
+            },
+            {
+                "refbook": "ICD-10",
+                "code": "B00",
+                "value": "test_value B00",
+                "date": "2023-03-01",
+            },
+            {"refbook": 2, "code": "B00", "value": "other value", "version": "1.0"},
+            {
+                "refbook": "MS1",
+                "code": "A00",
+                "value": "test_value A00",
+                "version": "2.0",
+            },
+        ]
+
+    def test_elements_of_different_refbooks_are_checked(self):
+        """Тестирование проверки элементов справочников, заданных кодом и идентификатором"""
+        response = self.client.post(self.url, {"items": self.items}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {"result": True, "version": "1.0"},
+                {"result": True, "version": "2.0"},
+                {"result": True, "version": "1.0"},
+                {"result": False, "version": "1.0"},
+                {"result": True, "version": "2.0"},
+            ],
+        )
+
+    def test_elements_passed_as_array_are_checked(self):
+        """Тестирование проверки элементов, переданных массивом"""
+        response = self.client.post(self.url, self.items[:1], format="json")
+        self.assertEqual(
+            response.json(), {"results": [{"result": True, "version": "1.0"}]}
+        )
+
+    def test_current_version_is_used_by_default(self):
+        """Тестирование проверки элемента в текущей версии справочника"""
+        item = {"refbook": "ICD-10", "code": "D01", "value": "test_value D01"}
+        response = self.client.post(self.url, [item], format="json")
+        self.assertEqual(
+            response.json()["results"], [{"result": True, "version": "3.0"}]
+        )
+
+    def test_unknown_refbook_and_version_are_not_valid(self):
+        """Тестирование проверки элементов несуществующих справочника и версии"""
+        items = [
+            {"refbook": "UNKNOWN", "code": "J00", "value": "test_value J00"},
+            {"refbook": 100, "code": "J00", "value": "test_value J00"},
+            {
+                "refbook": "MS1",
+                "code": "J00",
+                "value": "test_value J00",
+                "version": "9.0",
+            },
+        ]
+        response = self.client.post(self.url, items, format="json")
+        self.assertEqual(
+            response.json()["results"], [{"result": False, "version": None}] * 3
+        )
+
+    def test_invalid_items_are_rejected(self):
+        """Тестирование отклонения некорректных элементов запроса"""
+        cases = [
+            [{"refbook": "MS1", "code": "J00"}],
+            [{"refbook": True, "code": "J00", "value": "test_value J00"}],
+            [
+                {
+                    "refbook": "MS1",
+                    "code": "J00",
+                    "value": "test_value J00",
+                    "version": "1.0",
+                    "date": "2023-01-01",
+                }
+            ],
+        ]
+        for items in cases:
+            with self.subTest(items=items):
+                response = self.client.post(self.url, items, format="json")
+                self.assertEqual(response.status_code, 400)
+
+    def test_number_of_queries_does_not_depend_on_elements(self):
+        """Тестирование числа запросов к БД, не зависящего от количества элементов"""
+        self.client.post(self.url, self.items, format="json")
+        element_index.clear()
+        with self.assertNumQueries(4):
+            self.client.post(self.url, self.items * 50, format="json")
@@ -0,0 +1,126 @@
+import asyncio
+import re
+
+from app_refbooks.cache import response_cache
+from app_refbooks.lookup import element_index
+from app_refbooks.metrics import Histogram, metrics_registry
+from app_refbooks.versions import version_resolver
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+SERVER_TIMING = re.compile(
+    r'db;dur=(?P<db>[\d.]+);desc="(?P<queries>\d+) queries", '
+    r"serialize;dur=(?P<serialize>[\d.]+), total;dur=(?P<total>[\d.]+)"
+)
+
+
+class HistogramTest(SimpleTestCase):
+    """Тестирование гистограммы показателей"""
+
+    def test_render_is_cumulative(self):
+        """Тестирование выдачи накопленных значений корзин в формате Prometheus"""
+        histogram = Histogram("test_seconds", "Test.", (0.1, 1))
+        for value in (0.05, 0.5, 0.5, 5):
+            histogram.observe("view", value)
+        self.assertEqual(
+            histogram.render(),
+            "# HELP test_seconds Test.\n"
+            "# TYPE test_seconds histogram\n"
+            'test_seconds_bucket{view="view",le="0.1"} 1\n'
+            'test_seconds_bucket{view="view",le="1"} 3\n'
+            'test_seconds_bucket{view="view",le="+Inf"} 4\n'
+            'test_seconds_sum{view="view"} 6.050000\n'
+            'test_seconds_count{view="view"} 4\n',
+        )
+
+
+class PerformanceMiddlewareTest(APITestCase):
+    """Тестирование замера обработки запросов к представлениям приложения"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        metrics_registry.clear()
+        self.url = reverse("refbooks:refbook_list")
+
+    def get_server_timing(self, response):
+        match = SERVER_TIMING.fullmatch(response["Server-Timing"])
+        self.assertIsNotNone(match, response["Server-Timing"])
+        return match
+
+    def test_server_timing_header(self):
+        """Тестирование заголовка Server-Timing с показателями запроса"""
+        response = self.client.get(self.url)
+        timing = self.get_server_timing(response)
+        self.assertGreater(int(timing["queries"]), 0)
+        self.assertGreater(float(timing["serialize"]), 0)
+        self.assertGreaterEqual(float(timing["total"]), float(timing["db"]))
+
+    def test_other_applications_are_not_measured(self):
+        """Тестирование отсутствия замера запросов к другим приложениям"""
+        response = self.client.get(reverse("admin:login"))
+        self.assertNotIn("Server-Timing", response)
+
+    def test_metrics_are_exported(self):
+        """Тестирование выдачи гистограмм в текстовом формате Prometheus"""
+        self.client.get(self.url)
+        self.client.get(self.url)
+        response = self.client.get(reverse("refbooks:metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        content = response.content.decode()
+        for name in (
+            "refbooks_request_duration_seconds",
+            "refbooks_db_duration_seconds",
+            "refbooks_db_queries",
+            "refbooks_serialization_duration_seconds",
+        ):
+            with self.subTest(name=name):
+                self.assertIn(f'{name}_count{{view="refbook_list"}} 2', content)
+
+    @override_settings(REFBOOKS_SLOW_REQUEST_MS=0)
+    def test_slow_requests_are_logged_with_sql(self):
+        """Тестирование записи медленных запросов в лог вместе с SQL"""
+        with self.assertLogs("app_refbooks.performance", "WARNING") as logs:
+            self.client.get(self.url)
+        self.assertIn("/refbooks/", logs.output[0])
+        self.assertIn("SELECT", logs.output[0])
+
+    async def test_async_views_are_measured(self):
+        """Тестирование замера запросов к асинхронным представлениям"""
+        response = await self.async_client.get(
+            reverse("refbooks:async_refbook_element_list", kwargs={"pk": 1})
+        )
+        timing = self.get_server_timing(response)
+        self.assertGreater(int(timing["queries"]), 0)
+
+    async def test_concurrent_async_requests_are_measured_separately(self):
+        """Тестирование раздельного учёта запросов к БД одновременных запросов"""
+        urls = [
+            reverse("refbooks:async_refbook_list"),
+            reverse("refbooks:async_refbook_element_list", kwargs={"pk": 1}),
+        ]
+
+        def clear_caches():
+            version_resolver.clear()
+            element_index.clear()
+            response_cache.clear()
+
+        expected = []
+        for url in urls:
+            clear_caches()
+            response = await self.async_client.get(url)
+            expected.append(self.get_server_timing(response)["queries"])
+        self.assertNotEqual(expected[0], expected[1])
+        clear_caches()
+        responses = await asyncio.gather(*(self.async_client.get(url) for url in urls))
+        self.assertEqual(
+            [self.get_server_timing(response)["queries"] for response in responses],
+            expected,
+        )
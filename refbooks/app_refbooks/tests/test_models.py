@@ -17,6 +17,7 @@ class RefbookModelTest(APITestCase):
             "code": "код справочника",
             "name": "наименование справочника",
             "description": "описание справочника",
+            "revision": "ревизия справочника",
         }
         for field, expected_value in field_verboses.items():
             with self.subTest(field=field):
@@ -84,6 +85,8 @@ class RefbookVersionModelTest(APITestCase):
             "refbook": "справочник",
             "version": "версия справочника",
             "start_date": "дата начала действия версии",
+            "base_version": "базовая версия",
+            "revision": "ревизия версии справочника",
         }
         for field, expected_value in field_verboses.items():
             with self.subTest(field=field):
@@ -138,6 +141,7 @@ class RefbookElementModelTest(APITestCase):
             "refbook_version": "версия справочника",
             "code": "код элемента",
             "value": "значение элемента",
+            "removed": "элемент удалён",
         }
         for field, expected_value in field_verboses.items():
             with self.subTest(field=field):
@@ -0,0 +1,107 @@
+from app_refbooks.models import Refbook
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+
+class RefbookListPaginationTest(APITestCase):
+    """Тестирование постраничной выдачи списка справочников"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("refbooks:refbook_list")
+
+    def test_pages_are_correct(self):
+        """Тестирование выдачи справочников по страницам"""
+        first_page = self.client.get(self.url, {"limit": 1}).json()
+        self.assertEqual(
+            first_page["refbooks"], [{"id": 1, "code": "MS1", "name": "Справочник MS1"}]
+        )
+        self.assertIsNotNone(first_page["next"])
+        second_page = self.client.get(
+            self.url, {"limit": 1, "cursor": first_page["next"]}
+        ).json()
+        self.assertEqual(
+            second_page,
+            {
+                "refbooks": [{"id": 2, "code": "ICD-10", "name": "Справочник ICD-10"}],
+                "next": None,
+            },
+        )
+
+    def test_unpaginated_response_is_unchanged(self):
+        """Тестирование сохранения формата ответа без постраничной выдачи"""
+        response = self.client.get(self.url).json()
+        self.assertNotIn("next", response)
+        self.assertEqual(len(response["refbooks"]), 2)
+
+    def test_invalid_limit_is_rejected(self):
+        """Тестирование возврата ошибки при некорректном размере страницы"""
+        for limit in ("0", "-1", "abc", "100000"):
+            with self.subTest(limit=limit):
+                response = self.client.get(self.url, {"limit": limit})
+                self.assertEqual(response.status_code, 400)
+
+    def test_invalid_cursor_is_rejected(self):
+        """Тестирование возврата ошибки при некорректном курсоре"""
+        for cursor in ("invalid", "WyJhYmMiXQ=="):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.url, {"limit": 1, "cursor": cursor})
+                self.assertEqual(response.status_code, 404)
+
+
+class RefbookElementListPaginationTest(APITestCase):
+    """Тестирование постраничной выдачи элементов версии справочника"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.refbook = Refbook.objects.first()
+        self.url = reverse(
+            "refbooks:refbook_element_list", kwargs={"pk": self.refbook.pk}
+        )
+
+    def test_pages_cover_all_elements_in_code_order(self):
+        """Тестирование выдачи всех элементов версии по страницам в порядке кодов"""
+        codes = []
+        params = {"version": "2.0", "limit": 2}
+        while True:
+            page = self.client.get(self.url, params).json()
+            codes.extend(element["code"] for element in page["elements"])
+            if page["next"] is None:
+                break
+            params["cursor"] = page["next"]
+        self.assertEqual(codes, ["A00", "A01", "C001"])
+
+    def test_page_query_count_does_not_depend_on_page(self):
+        """Тестирование выборки каждой страницы одним запросом к таблице элементов"""
+        page = self.client.get(self.url, {"version": "2.0", "limit": 1}).json()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(
+                self.url, {"version": "2.0", "limit": 1, "cursor": page["next"]}
+            )
+        element_queries = [
+            query
+            for query in queries.captured_queries
+            if '"app_refbooks_refbookelement"' in query["sql"]
+        ]
+        self.assertEqual(len(element_queries), 1)
+
+    @override_settings(REFBOOKS_PAGE_MAX_LIMIT=2)
+    def test_cursor_without_limit_uses_max_limit(self):
+        """Тестирование использования максимального размера страницы при отсутствии limit"""
+        page = self.client.get(self.url, {"version": "2.0", "cursor": ""}).json()
+        self.assertEqual(len(page["elements"]), 2)
+        self.assertIsNotNone(page["next"])
@@ -0,0 +1,89 @@
+import re
+from unittest import skipUnless
+
+from app_refbooks.cache import get_shared_cache, response_cache
+from app_refbooks.lookup import element_index
+from app_refbooks.models import RefbookVersion
+from app_refbooks.versions import version_resolver
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+FULL_SCAN = re.compile(r"\bSCAN (?:TABLE )?(\w+)\b(?! USING)")
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite specific")
+class QueryPlanTest(APITestCase):
+    """
+    Тестирование использования индексов запросами представлений:
+    ни один запрос не должен полностью сканировать таблицы версий и элементов
+    """
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    full_scan_allowed = {"app_refbooks_refbook"}
+
+    def setUp(self):
+        self.client = APIClient()
+        response_cache.clear()
+        get_shared_cache().clear()
+        element_index.clear()
+        version_resolver.timelines()
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            return "\n".join(row[-1] for row in cursor.fetchall())
+
+    def assertQueriesUseIndexes(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(queries.captured_queries)
+        for query in queries.captured_queries:
+            plan = self.explain(query["sql"])
+            with self.subTest(sql=query["sql"], plan=plan):
+                scanned = set(FULL_SCAN.findall(plan)) - self.full_scan_allowed
+                self.assertEqual(scanned, set())
+
+    def test_refbook_list_queries_use_indexes(self):
+        """Тестирование запросов списка справочников"""
+        url = reverse("refbooks:refbook_list")
+        self.assertQueriesUseIndexes(url)
+        self.assertQueriesUseIndexes(url, date="2022-12-12")
+        self.assertQueriesUseIndexes(url, limit=1, cursor="WzFd")
+
+    def test_element_list_queries_use_indexes(self):
+        """Тестирование запросов списка элементов версии справочника"""
+        url = reverse("refbooks:refbook_element_list", kwargs={"pk": 1})
+        self.assertQueriesUseIndexes(url, version="2.0")
+        self.assertQueriesUseIndexes(url, version="2.0", limit=1, cursor="WyJBMDAiXQ==")
+
+    def test_delta_version_queries_use_indexes(self):
+        """Тестирование запросов элементов производной версии справочника"""
+        RefbookVersion.objects.create(
+            refbook_id=1, version="3.1", start_date="2023-07-01", base_version_id=3
+        )
+        version_resolver.timelines()
+        url = reverse("refbooks:refbook_element_list", kwargs={"pk": 1})
+        self.assertQueriesUseIndexes(url, version="3.1")
+        self.assertQueriesUseIndexes(url, version="3.1", limit=1, cursor="WyJDMDAxIl0=")
+
+    def test_element_check_queries_use_indexes(self):
+        """Тестирование запросов валидации элемента версии справочника"""
+        url = reverse("refbooks:refbook_element_check", kwargs={"pk": 1})
+        self.assertQueriesUseIndexes(
+            url, code="C001", value="test_value C001", version="2.0"
+        )
+
+    def test_element_index_uses_covering_index(self):
+        """Тестирование загрузки индекса элементов по покрывающему индексу"""
+        with CaptureQueriesContext(connection) as queries:
+            element_index.get(2)
+        (query,) = queries.captured_queries
+        self.assertIn("USING COVERING INDEX", self.explain(query["sql"]))
@@ -0,0 +1,197 @@
+import io
+import os
+import tempfile
+
+from app_refbooks.cache import get_shared_cache, response_cache
+from app_refbooks.lookup import element_index
+from app_refbooks.models import Refbook, RefbookElement
+from app_refbooks.routers import (
+    LEAST_LOADED,
+    ReplicaRouter,
+    ReplicaSelector,
+    read_database,
+)
+from app_refbooks.versions import version_resolver
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+REPLICAS = ("replica_a", "replica_b")
+
+
+class ReplicaSelectorTest(SimpleTestCase):
+    """Тестирование выбора реплики БД для чтения"""
+
+    def test_round_robin(self):
+        """Тестирование выбора реплик по очереди"""
+        selector = ReplicaSelector()
+        selected = [selector.select(list(REPLICAS)) for _ in range(4)]
+        self.assertEqual(selected, ["replica_a", "replica_b"] * 2)
+
+    @override_settings(REFBOOKS_REPLICA_STRATEGY=LEAST_LOADED)
+    def test_least_loaded(self):
+        """Тестирование выбора наименее загруженной реплики"""
+        selector = ReplicaSelector()
+        with selector.acquire("replica_a"), selector.acquire("replica_a"):
+            with selector.acquire("replica_b"):
+                selected = {selector.select(list(REPLICAS)) for _ in range(4)}
+        self.assertEqual(selected, {"replica_b"})
+        self.assertEqual(selector.in_flight("replica_a"), 0)
+
+
+class ReplicaRouterTest(SimpleTestCase):
+    """Тестирование маршрутизатора БД"""
+
+    def test_reads_follow_context_and_writes_go_to_primary(self):
+        """Тестирование направления чтений на реплику только в контексте представления"""
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Refbook))
+        token = read_database.set("replica_a")
+        try:
+            self.assertEqual(router.db_for_read(Refbook), "replica_a")
+            self.assertEqual(router.db_for_write(Refbook), "default")
+        finally:
+            read_database.reset(token)
+
+
+class ReplicaRoutingTest(TestCase):
+    """
+    Тестирование чтения API справочников из реплик БД. Репликами служат
+    отдельные файлы SQLite с теми же данными, в которых изменены
+    наименования справочников
+    """
+
+    databases = "__all__"
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        for alias in REPLICAS:
+            databases = {
+                "default": connections.settings["default"],
+                alias: {
+                    "ENGINE": "django.db.backends.sqlite3",
+                    "NAME": os.path.join(cls.directory.name, f"{alias}.sqlite3"),
+                },
+            }
+            connections.settings[alias] = connections.configure_settings(databases)[
+                alias
+            ]
+            call_command("migrate", database=alias, verbosity=0, interactive=False)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for alias in REPLICAS:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+        cls.directory.cleanup()
+
+    @classmethod
+    def setUpTestData(cls):
+        for alias in REPLICAS:
+            Refbook.objects.using(alias).filter(pk=1).update(name=alias)
+        cls.admin = User.objects.create_superuser("admin", password="admin")
+
+    def setUp(self):
+        self.client = APIClient()
+        version_resolver.clear()
+        element_index.clear()
+        response_cache.clear()
+        get_shared_cache().clear()
+        self.url = reverse("refbooks:refbook_list")
+
+    def get_refbook_name(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()["refbooks"][0]["name"]
+
+    def test_reads_use_primary_without_replicas(self):
+        """Тестирование чтения из основной БД, если реплики не настроены"""
+        with override_settings(REFBOOKS_READ_REPLICAS=[]):
+            self.assertEqual(
+                self.get_refbook_name(), Refbook.objects.using("default").get(pk=1).name
+            )
+
+    @override_settings(REFBOOKS_READ_REPLICAS=list(REPLICAS))
+    def test_reads_are_distributed_between_replicas(self):
+        """Тестирование распределения чтений между репликами"""
+        names = {self.get_refbook_name() for _ in range(4)}
+        self.assertEqual(names, set(REPLICAS))
+
+    @override_settings(REFBOOKS_READ_REPLICAS=["replica_a"])
+    def test_element_reads_use_replica(self):
+        """Тестирование выдачи элементов из реплики"""
+        RefbookElement.objects.using("replica_a").create(
+            refbook_version_id=1, code="R00", value="replica value"
+        )
+        list_url = reverse("refbooks:refbook_element_list", kwargs={"pk": 1})
+        response = self.client.get(list_url, {"version": "1.0", "format": "ndjson"})
+        content = b"".join(response.streaming_content).decode("utf-8")
+        self.assertIn("R00", content)
+
+    @override_settings(
+        REFBOOKS_READ_REPLICAS=["replica_a"], REFBOOKS_RESPONSE_CACHE_ENABLED=True
+    )
+    def test_caches_are_filled_from_primary(self):
+        """
+        Тестирование заполнения кэшей по основной БД: элемент, загруженный
+        сотрудником и ещё не попавший на отстающую реплику, сразу виден
+        в проверке и в кэшируемом списке элементов
+        """
+        self.client.force_login(self.admin)
+        url = reverse("refbooks:refbook_element_import", kwargs={"pk": 1})
+        upload = io.BytesIO(b"N00,new value\n")
+        upload.name = "elements.csv"
+        response = self.client.post(
+            url, {"file": upload, "version": "1.0"}, format="multipart"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.client.logout()
+        check_url = reverse("refbooks:refbook_element_check", kwargs={"pk": 1})
+        list_url = reverse("refbooks:refbook_element_list", kwargs={"pk": 1})
+        for _ in range(2):
+            response = self.client.get(
+                check_url, {"code": "N00", "value": "new value", "version": "1.0"}
+            )
+            self.assertEqual(response.json(), {"result": True})
+            response = self.client.get(list_url, {"version": "1.0"})
+            codes = [element["code"] for element in response.json()["elements"]]
+            self.assertIn("N00", codes)
+        self.assertFalse(
+            RefbookElement.objects.using("replica_a").filter(code="N00").exists()
+        )
+
+    @override_settings(REFBOOKS_READ_REPLICAS=["replica_a"])
+    def test_writes_go_to_primary_and_session_reads_its_writes(self):
+        """Тестирование записи в основную БД и чтения своих изменений сессией сотрудника"""
+        self.client.force_login(self.admin)
+        self.assertEqual(self.get_refbook_name(), "replica_a")
+        url = reverse("refbooks:refbook_element_import", kwargs={"pk": 1})
+        upload = io.BytesIO(b"N00,new value\n")
+        upload.name = "elements.csv"
+        response = self.client.post(
+            url, {"file": upload, "version": "1.0"}, format="multipart"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(
+            RefbookElement.objects.using("default").filter(code="N00").exists()
+        )
+        self.assertFalse(
+            RefbookElement.objects.using("replica_a").filter(code="N00").exists()
+        )
+        self.assertEqual(
+            self.get_refbook_name(), Refbook.objects.using("default").get(pk=1).name
+        )
+        self.client.logout()
+        self.assertEqual(self.get_refbook_name(), "replica_a")
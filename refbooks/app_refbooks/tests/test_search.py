@@ -0,0 +1,158 @@
+import time
+
+from app_refbooks.models import RefbookElement
+from app_refbooks.search import ElementSearchTable, search_index
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+
+class ElementSearchTableTest(SimpleTestCase):
+    """Тестирование поисковой таблицы элементов версии справочника"""
+
+    def setUp(self):
+        self.table = ElementSearchTable(
+            [
+                ("J01", "Острый синусит"),
+                ("J00", "Острый назофарингит (насморк)"),
+                ("A00", "Холера"),
+                ("j0x", "синусит хронический"),
+                ("SIN", "Другое"),
+            ]
+        )
+
+    def codes(self, elements):
+        return [element["code"] for element in elements]
+
+    def test_prefix_search_is_case_insensitive_and_ordered(self):
+        """Тестирование поиска по началу кода без учёта регистра"""
+        self.assertEqual(
+            self.codes(self.table.search("j0", "prefix", 10)), ["J00", "J01", "j0x"]
+        )
+        self.assertEqual(self.codes(self.table.search("J01", "prefix", 10)), ["J01"])
+        self.assertEqual(self.table.search("B", "prefix", 10), [])
+
+    def test_prefix_search_is_limited(self):
+        """Тестирование ограничения количества результатов поиска"""
+        self.assertEqual(
+            self.codes(self.table.search("J", "prefix", 2)), ["J00", "J01"]
+        )
+
+    def test_contains_search_is_ranked(self):
+        """Тестирование ранжирования результатов поиска по вхождению"""
+        self.assertEqual(
+            self.codes(self.table.search("СИН", "contains", 10)), ["j0x", "J01"]
+        )
+        table = ElementSearchTable(
+            [
+                ("AB1", "xx"),
+                ("XAB", "yy"),
+                ("Z1", "ab start"),
+                ("Z2", "has ab inside"),
+                ("AB0", "zz"),
+            ]
+        )
+        self.assertEqual(
+            self.codes(table.search("ab", "contains", 10)),
+            ["AB0", "AB1", "Z1", "XAB", "Z2"],
+        )
+        self.assertEqual(
+            self.table.search("насморк", "contains", 10),
+            [{"code": "J00", "value": "Острый назофарингит (насморк)"}],
+        )
+
+    def test_contains_search_does_not_cross_elements(self):
+        """Тестирование отсутствия совпадений на границах элементов"""
+        self.assertEqual(self.table.search("холера\nj", "contains", 10), [])
+        self.assertEqual(self.table.search("a00\tх", "contains", 10), [])
+
+    def test_search_latency(self):
+        """Тестирование времени поиска по версии масштаба МКБ-10"""
+        table = ElementSearchTable(
+            (f"X{number:05d}", f"Значение элемента номер {number}")
+            for number in range(70000)
+        )
+        started = time.perf_counter()
+        table.search("X012", "prefix", 20)
+        table.search("номер 6999", "contains", 20)
+        self.assertLess(time.perf_counter() - started, 0.05)
+
+
+class RefbookElementSearchAPIViewTest(APITestCase):
+    """Тестирование представления для поиска элементов версии справочника"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        search_index.clear()
+        self.url = reverse("refbooks:refbook_element_search", kwargs={"pk": 1})
+
+    def test_prefix_search_in_version(self):
+        """Тестирование поиска по началу кода в заданной версии справочника"""
+        response = self.client.get(self.url, {"q": "a0", "version": "2.0"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Refbook-Version"], "2.0")
+        self.assertEqual(
+            response.json(),
+            {
+                "elements": [
+                    {"code": "A00", "value": "test_value A00"},
+                    {"code": "A01", "value": "test_value A01"},
+                ]
+            },
+        )
+
+    def test_contains_search_by_date(self):
+        """Тестирование поиска по вхождению в версии, действовавшей на дату"""
+        response = self.client.get(
+            self.url, {"q": "VALUE C00", "mode": "contains", "date": "2023-07-01"}
+        )
+        self.assertEqual(response["X-Refbook-Version"], "3.0")
+        self.assertEqual(
+            [element["code"] for element in response.json()["elements"]],
+            ["C001", "C002"],
+        )
+
+    @override_settings(REFBOOKS_SEARCH_INDEX_MAX_ELEMENTS=1)
+    def test_versions_that_do_not_fit_are_searched_in_database(self):
+        """Тестирование поиска запросом к БД по версии, не помещающейся в индекс"""
+        response = self.client.get(self.url, {"q": "a0", "version": "2.0"})
+        self.assertEqual(
+            [element["code"] for element in response.json()["elements"]],
+            ["A00", "A01"],
+        )
+        response = self.client.get(
+            self.url, {"q": "value C00", "mode": "contains", "version": "3.0"}
+        )
+        self.assertEqual(
+            [element["code"] for element in response.json()["elements"]],
+            ["C001", "C002"],
+        )
+        self.assertEqual(len(search_index), 0)
+
+    def test_unknown_version_returns_empty_list(self):
+        """Тестирование поиска в несуществующей версии справочника"""
+        response = self.client.get(self.url, {"q": "A", "version": "9.0"})
+        self.assertEqual(response.json(), {"elements": []})
+
+    def test_invalid_parameters_are_rejected(self):
+        """Тестирование отклонения некорректных параметров поиска"""
+        cases = [{}, {"q": "A", "mode": "fuzzy"}, {"q": "A", "limit": 0}]
+        for params in cases:
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_search_index_is_rebuilt_on_element_write(self):
+        """Тестирование обновления поисковой таблицы при изменении элементов"""
+        params = {"q": "J", "version": "1.0"}
+        self.assertEqual(len(self.client.get(self.url, params).json()["elements"]), 2)
+        RefbookElement.objects.create(
+            refbook_version_id=1, code="J02", value="test_value J02"
+        )
+        self.assertEqual(len(self.client.get(self.url, params).json()["elements"]), 3)
@@ -0,0 +1,106 @@
+import os
+import tempfile
+from io import StringIO
+
+from app_refbooks.cache import get_shared_cache, response_cache
+from app_refbooks.lookup import element_index
+from app_refbooks.models import RefbookElement
+from app_refbooks.snapshots import Snapshot, build_snapshot, snapshot_store
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+
+class SnapshotTest(APITestCase):
+    """Тестирование снимков версий справочников"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings = override_settings(REFBOOKS_SNAPSHOT_DIR=self.directory)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(snapshot_store.clear)
+        snapshot_store.clear()
+        element_index.clear()
+        response_cache.clear()
+        get_shared_cache().clear()
+        self.client = APIClient()
+
+    def open_snapshot(self, version_id):
+        snapshot = Snapshot(build_snapshot(version_id))
+        self.addCleanup(snapshot.close)
+        return snapshot
+
+    def test_binary_search(self):
+        """Тестирование бинарного поиска элементов в снимке"""
+        RefbookElement.objects.create(
+            refbook_version_id=2, code="Б01", value="значение"
+        )
+        snapshot = self.open_snapshot(2)
+        self.assertEqual(len(snapshot), 4)
+        self.assertEqual(
+            [snapshot.code(index) for index in range(len(snapshot))],
+            ["A00", "A01", "C001", "Б01"],
+        )
+        self.assertEqual(snapshot.get("C001"), "test_value C001")
+        self.assertEqual(snapshot.get("Б01"), "значение")
+        self.assertIsNone(snapshot.get("B00"))
+        self.assertEqual(snapshot.find("ZZZ"), -1)
+        self.assertTrue(snapshot.contains("A01", "test_value A01"))
+        self.assertFalse(snapshot.contains("A01", "test_value A00"))
+        self.assertFalse(snapshot.contains(None, "test_value A00"))
+
+    def test_empty_snapshot(self):
+        """Тестирование снимка версии без элементов"""
+        snapshot = self.open_snapshot(6)
+        self.assertEqual(len(snapshot), 0)
+        self.assertIsNone(snapshot.get("A00"))
+
+    def test_element_list_is_served_from_snapshot(self):
+        """Тестирование выдачи списка элементов из файла снимка"""
+        url = reverse("refbooks:refbook_element_list", kwargs={"pk": 1})
+        expected = self.client.get(url, {"version": "2.0"})
+        build_snapshot(2)
+        response = self.client.get(url, {"version": "2.0"})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response["ETag"], expected["ETag"])
+        self.assertEqual(b"".join(response.streaming_content), expected.content)
+
+    def test_check_uses_snapshot(self):
+        """Тестирование валидации элемента по снимку без обращения к таблице элементов"""
+        build_snapshot(2)
+        url = reverse("refbooks:refbook_element_check", kwargs={"pk": 1})
+        params = {"version": "2.0", "code": "A00", "value": "test_value A00"}
+        self.assertEqual(self.client.get(url, params).json(), {"result": True})
+        with self.assertNumQueries(0):
+            response = self.client.get(url, params)
+        self.assertEqual(response.json(), {"result": True})
+
+    def test_stale_snapshot_is_not_used(self):
+        """Тестирование отказа от снимка после изменения элементов версии"""
+        build_snapshot(2)
+        self.assertIsNotNone(snapshot_store.get(2))
+        RefbookElement.objects.create(refbook_version_id=2, code="A02", value="v")
+        self.assertIsNone(snapshot_store.get(2))
+        url = reverse("refbooks:refbook_element_check", kwargs={"pk": 1})
+        params = {"version": "2.0", "code": "A02", "value": "v"}
+        self.assertEqual(self.client.get(url, params).json(), {"result": True})
+
+    def test_build_command(self):
+        """Тестирование команды сборки снимков"""
+        stdout = StringIO()
+        call_command("build_refbook_snapshots", "--refbook=ICD-10", stdout=stdout)
+        self.assertIn("Собрано снимков: 3", stdout.getvalue())
+        self.assertEqual(len(os.listdir(self.directory)), 6)
+        call_command("build_refbook_snapshots", "--refbook=ICD-10", stdout=stdout)
+        self.assertEqual(len(os.listdir(self.directory)), 6)
@@ -3,6 +3,12 @@ from app_refbooks.views import (
     RefbookListAPIView,
     RefbookElementListAPIView,
     RefbookElementCheckAPIView,
+    RefbookElementBatchCheckAPIView,
+    RefbookElementImportAPIView,
+    RefbookElementLookupAPIView,
+    RefbookElementSearchAPIView,
+    RefbookVersionDiffAPIView,
+    MetricsView,
 )
 from django.urls import reverse, resolve
 from rest_framework.test import APIClient, APITestCase
@@ -86,3 +92,141 @@ class RefbookElementCheckPageTest(APITestCase):
         view = resolve(self.url)
         desired_view = RefbookElementCheckAPIView.as_view().__name__
         self.assertEqual(view.func.__name__, desired_view)
+
+
+class RefbookElementBatchCheckPageTest(APITestCase):
+    """Тестирование URL пакетной валидации элементов справочника"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.refbook = Refbook.objects.first()
+        cls.url = reverse(
+            "refbooks:refbook_element_batch_check", kwargs={"pk": cls.refbook.pk}
+        )
+
+    def test_page_uses_the_correct_url(self):
+        """Тестирование используемого URL"""
+        refbook_pk = self.refbook.pk
+        self.assertURLEqual(self.url, f"/refbooks/{refbook_pk}/check_elements")
+
+    def test_url_uses_the_desired_view(self):
+        """Тестирование использования ожидаемого представления по данному URL"""
+        view = resolve(self.url)
+        desired_view = RefbookElementBatchCheckAPIView.as_view().__name__
+        self.assertEqual(view.func.__name__, desired_view)
+
+
+class RefbookElementImportPageTest(APITestCase):
+    """Тестирование URL загрузки элементов версии справочника"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.refbook = Refbook.objects.first()
+        cls.url = reverse(
+            "refbooks:refbook_element_import", kwargs={"pk": cls.refbook.pk}
+        )
+
+    def test_page_uses_the_correct_url(self):
+        """Тестирование используемого URL"""
+        refbook_pk = self.refbook.pk
+        self.assertURLEqual(self.url, f"/refbooks/{refbook_pk}/elements/import")
+
+    def test_url_uses_the_desired_view(self):
+        """Тестирование использования ожидаемого представления по данному URL"""
+        view = resolve(self.url)
+        desired_view = RefbookElementImportAPIView.as_view().__name__
+        self.assertEqual(view.func.__name__, desired_view)
+
+
+class RefbookVersionDiffPageTest(APITestCase):
+    """Тестирование URL отличий версий справочника"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.refbook = Refbook.objects.first()
+        cls.url = reverse(
+            "refbooks:refbook_version_diff", kwargs={"pk": cls.refbook.pk}
+        )
+
+    def test_page_uses_the_correct_url(self):
+        """Тестирование используемого URL"""
+        refbook_pk = self.refbook.pk
+        self.assertURLEqual(self.url, f"/refbooks/{refbook_pk}/diff")
+
+    def test_url_uses_the_desired_view(self):
+        """Тестирование использования ожидаемого представления по данному URL"""
+        view = resolve(self.url)
+        desired_view = RefbookVersionDiffAPIView.as_view().__name__
+        self.assertEqual(view.func.__name__, desired_view)
+
+
+class RefbookElementLookupPageTest(APITestCase):
+    """Тестирование URL проверки элементов нескольких справочников"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.url = reverse("refbooks:refbook_element_lookup")
+
+    def test_page_uses_the_correct_url(self):
+        """Тестирование используемого URL"""
+        self.assertURLEqual(self.url, "/refbooks/lookup")
+
+    def test_url_uses_the_desired_view(self):
+        """Тестирование использования ожидаемого представления по данному URL"""
+        view = resolve(self.url)
+        desired_view = RefbookElementLookupAPIView.as_view().__name__
+        self.assertEqual(view.func.__name__, desired_view)
+
+
+class RefbookElementSearchPageTest(APITestCase):
+    """Тестирование URL поиска элементов версии справочника"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.url = reverse("refbooks:refbook_element_search", kwargs={"pk": 1})
+
+    def test_page_uses_the_correct_url(self):
+        """Тестирование используемого URL"""
+        self.assertURLEqual(self.url, "/refbooks/1/elements/search")
+
+    def test_url_uses_the_desired_view(self):
+        """Тестирование использования ожидаемого представления по данному URL"""
+        view = resolve(self.url)
+        desired_view = RefbookElementSearchAPIView.as_view().__name__
+        self.assertEqual(view.func.__name__, desired_view)
+
+
+class MetricsPageTest(APITestCase):
+    """Тестирование URL показателей обработки запросов"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.url = reverse("refbooks:metrics")
+
+    def test_page_uses_the_correct_url(self):
+        """Тестирование используемого URL"""
+        self.assertURLEqual(self.url, "/metrics")
+
+    def test_url_uses_the_desired_view(self):
+        """Тестирование использования ожидаемого представления по данному URL"""
+        view = resolve(self.url)
+        desired_view = MetricsView.as_view().__name__
+        self.assertEqual(view.func.__name__, desired_view)
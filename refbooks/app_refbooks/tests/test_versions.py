@@ -0,0 +1,80 @@
+from datetime import date, datetime
+from unittest import mock
+
+from app_refbooks.models import Refbook, RefbookVersion
+from app_refbooks.utils import get_current_version
+from app_refbooks.versions import version_resolver
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+
+class VersionResolverTest(APITestCase):
+    """Тестирование кэша версий справочников"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+    ]
+
+    def setUp(self):
+        version_resolver.clear()
+        self.refbook = Refbook.objects.get(code="MS1")
+
+    def test_current_version_is_correct(self):
+        """Тестирование получения текущей версии справочника"""
+        expected = (
+            RefbookVersion.objects.filter(
+                refbook=self.refbook, start_date__lte=timezone.now().date()
+            )
+            .order_by("start_date")
+            .last()
+        )
+        self.assertEqual(get_current_version(refbook_id=self.refbook.pk), expected)
+        self.assertEqual(get_current_version(refbook_id=self.refbook), expected)
+
+    def test_version_at_date_is_correct(self):
+        """Тестирование получения версии справочника, действующей на указанную дату"""
+        cases = {
+            date(2022, 5, 6): None,
+            date(2022, 5, 7): "1.0",
+            date(2023, 1, 11): "1.0",
+            date(2023, 1, 12): "2.0",
+            date(2023, 7, 1): "3.0",
+        }
+        for on_date, expected in cases.items():
+            with self.subTest(on_date=on_date):
+                version = version_resolver.get_version_at(self.refbook.pk, on_date)
+                self.assertEqual(version and version.version, expected)
+
+    def test_resolution_is_cached(self):
+        """Тестирование отсутствия запросов к БД при повторном получении текущей версии"""
+        get_current_version(refbook_id=self.refbook.pk)
+        with self.assertNumQueries(0):
+            for refbook in (self.refbook.pk, 2, 100):
+                get_current_version(refbook_id=refbook)
+
+    def test_cache_is_invalidated_on_version_write(self):
+        """Тестирование сброса кэша при создании и удалении версии справочника"""
+        get_current_version(refbook_id=self.refbook.pk)
+        new_version = RefbookVersion.objects.create(
+            refbook=self.refbook, version="5.0", start_date="2024-01-01"
+        )
+        self.assertEqual(get_current_version(refbook_id=self.refbook.pk), new_version)
+        new_version.delete()
+        self.assertEqual(get_current_version(refbook_id=self.refbook.pk).version, "4.0")
+
+    def test_future_version_becomes_current_at_midnight(self):
+        """Тестирование перехода версии с будущей датой начала действия в текущую"""
+        RefbookVersion.objects.create(
+            refbook=self.refbook, version="5.0", start_date="2030-01-01"
+        )
+        get_current_version(refbook_id=self.refbook.pk)
+        with mock.patch("app_refbooks.versions.timezone.now") as now:
+            now.return_value = datetime(2029, 12, 31, 23, 59, tzinfo=timezone.utc)
+            self.assertEqual(
+                get_current_version(refbook_id=self.refbook.pk).version, "4.0"
+            )
+            now.return_value = datetime(2030, 1, 1, 0, 0, tzinfo=timezone.utc)
+            self.assertEqual(
+                get_current_version(refbook_id=self.refbook.pk).version, "5.0"
+            )
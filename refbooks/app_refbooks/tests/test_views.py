@@ -2,6 +2,7 @@ import json
 from datetime import datetime
 
 from app_refbooks.models import Refbook, RefbookVersion, RefbookElement
+from django.test import override_settings
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework.test import APIClient, APITestCase
@@ -106,6 +107,64 @@ class RefbookElementListAPIViewTest(APITestCase):
         )
 
 
+class RefbookElementListStreamingTest(APITestCase):
+    """Тестирование потоковой выдачи элементов версии справочника в формате NDJSON"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.refbook = Refbook.objects.first()
+        self.url = reverse(
+            "refbooks:refbook_element_list", kwargs={"pk": self.refbook.pk}
+        )
+        self.expected = [
+            {"code": "A00", "value": "test_value A00"},
+            {"code": "A01", "value": "test_value A01"},
+            {"code": "C001", "value": "test_value C001"},
+        ]
+
+    def parse(self, response):
+        content = b"".join(response.streaming_content).decode("utf-8")
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_stream_by_format_param_is_correct(self):
+        """Тестирование потоковой выдачи элементов при указании формата в параметрах запроса"""
+        response = self.client.get(self.url, {"version": "2.0", "format": "ndjson"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(self.parse(response), self.expected)
+
+    def test_stream_by_accept_header_is_correct(self):
+        """Тестирование потоковой выдачи элементов при указании формата в заголовке Accept"""
+        response = self.client.get(
+            self.url + "?version=2.0", HTTP_ACCEPT="application/x-ndjson"
+        )
+        self.assertTrue(response.streaming)
+        self.assertEqual(self.parse(response), self.expected)
+
+    @override_settings(REFBOOKS_STREAM_CHUNK_SIZE=2)
+    def test_stream_is_chunked(self):
+        """Тестирование разбиения потока элементов на части"""
+        response = self.client.get(self.url, {"version": "2.0", "format": "ndjson"})
+        chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 2)
+        content = b"".join(chunks).decode("utf-8")
+        self.assertEqual(
+            [json.loads(line) for line in content.splitlines()], self.expected
+        )
+
+    def test_stream_of_unknown_version_is_empty(self):
+        """Тестирование потоковой выдачи элементов отсутствующей версии справочника"""
+        response = self.client.get(self.url, {"version": "9.0", "format": "ndjson"})
+        self.assertEqual(self.parse(response), [])
+
+
 class RefbookElementCheckAPIViewTest(APITestCase):
     """Тестирование представления для валидации элемента версии справочника"""
 
@@ -139,3 +198,195 @@ class RefbookElementCheckAPIViewTest(APITestCase):
         url_with_version = self.url + f"&version=1.0"
         response_with_version = self.client.get(url_with_version)
         self.assertEqual(json.loads(response_with_version.content), {"result": False})
+
+
+class RefbookElementBatchCheckAPIViewTest(APITestCase):
+    """Тестирование представления для пакетной валидации элементов версии справочника"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.refbook = Refbook.objects.first()
+        self.url = reverse(
+            "refbooks:refbook_element_batch_check", kwargs={"pk": self.refbook.pk}
+        )
+        self.elements = [
+            {"code": "C001", "value": "test_value C001"},
+            {"code": "J00", "value": "test_value J00"},
+            ["A00", "test_value A00"],
+            {"code": "C001", "value": "other value"},
+        ]
+
+    def test_validate_elements_of_concrete_version_is_correct(self):
+        """Тестирование пакетной валидации элементов в конкретно заданной версии справочника"""
+        response = self.client.post(
+            self.url, {"version": "2.0", "elements": self.elements}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            json.loads(response.content), {"results": [True, False, True, False]}
+        )
+
+    def test_validate_elements_passed_as_array_is_correct(self):
+        """Тестирование пакетной валидации элементов, переданных массивом, с версией в параметрах запроса"""
+        response = self.client.post(
+            self.url + "?version=1.0", self.elements, format="json"
+        )
+        self.assertEqual(
+            json.loads(response.content), {"results": [False, True, False, False]}
+        )
+
+    def test_validate_elements_passed_as_ndjson_is_correct(self):
+        """Тестирование пакетной валидации элементов, переданных в формате NDJSON"""
+        body = "\n".join(json.dumps(element) for element in self.elements)
+        response = self.client.post(
+            self.url + "?version=2.0",
+            body,
+            content_type="application/x-ndjson",
+        )
+        self.assertEqual(
+            json.loads(response.content), {"results": [True, False, True, False]}
+        )
+
+    def test_validate_elements_of_unknown_version_is_correct(self):
+        """Тестирование пакетной валидации элементов в отсутствующей версии справочника"""
+        response = self.client.post(
+            self.url, {"version": "9.0", "elements": self.elements}, format="json"
+        )
+        self.assertEqual(json.loads(response.content), {"results": [False] * 4})
+
+    def test_invalid_elements_are_rejected(self):
+        """Тестирование возврата ошибки при некорректных элементах"""
+        response = self.client.post(
+            self.url, {"elements": [{"code": "C001"}, ["A00"]]}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(REFBOOKS_CHECK_BATCH_MAX_SIZE=3)
+    def test_batch_size_is_limited(self):
+        """Тестирование ограничения количества элементов в запросе"""
+        response = self.client.post(
+            self.url, {"elements": self.elements}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(REFBOOKS_FAST_RENDERING=True)
+class RefbookListFastRenderingTest(RefbookListAPIViewTest):
+    """Тестирование представления для отображения списка справочников при быстром формировании ответа"""
+
+
+@override_settings(REFBOOKS_FAST_RENDERING=True)
+class RefbookElementListFastRenderingTest(RefbookElementListAPIViewTest):
+    """Тестирование представления для отображения элементов версии справочника при быстром формировании ответа"""
+
+
+@override_settings(REFBOOKS_RESPONSE_CACHE_ENABLED=False)
+class FastRenderingEquivalenceTest(APITestCase):
+    """Тестирование побайтового совпадения ответов при быстром и обычном формировании"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        RefbookElement.objects.create(
+            refbook_version=RefbookVersion.objects.get(pk=1),
+            code="J02",
+            value='кавычки " \\ / \t \u2028 \u2029 \x7f \U0001f600',
+        )
+        refbook_url = reverse("refbooks:refbook_element_list", kwargs={"pk": 1})
+        self.urls = [
+            reverse("refbooks:refbook_list"),
+            reverse("refbooks:refbook_list") + "?date=2022-12-12",
+            reverse("refbooks:refbook_list") + "?limit=1",
+            refbook_url,
+            refbook_url + "?version=1.0",
+            refbook_url + "?version=1.0&limit=2",
+            refbook_url + "?version=9.0",
+        ]
+
+    def test_responses_are_byte_identical(self):
+        """Тестирование совпадения ответов представлений списков"""
+        for url in self.urls:
+            with self.subTest(url=url):
+                expected = self.client.get(url)
+                with override_settings(REFBOOKS_FAST_RENDERING=True):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, expected.status_code)
+                self.assertEqual(response.content, expected.content)
+
+
+class VersionDateTest(APITestCase):
+    """Тестирование выбора версии справочника по дате"""
+
+    fixtures = [
+        "005_refbooks.json",
+        "010_refbook_versions.json",
+        "015_refbook_elements.json",
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.element_list_url = reverse(
+            "refbooks:refbook_element_list", kwargs={"pk": 1}
+        )
+        self.check_url = reverse("refbooks:refbook_element_check", kwargs={"pk": 1})
+
+    def test_elements_of_version_at_date(self):
+        """Тестирование получения элементов версии, действующей на дату"""
+        cases = {
+            "2022-05-07": ("1.0", ["J00", "J01"]),
+            "2023-01-11": ("1.0", ["J00", "J01"]),
+            "2023-03-01": ("2.0", ["A00", "A01", "C001"]),
+            "2023-06-06": ("3.0", ["C001", "C002"]),
+        }
+        for date, (version, codes) in cases.items():
+            with self.subTest(date=date):
+                response = self.client.get(self.element_list_url, {"date": date})
+                self.assertEqual(response["X-Refbook-Version"], version)
+                self.assertEqual(
+                    sorted(element["code"] for element in response.data["elements"]),
+                    codes,
+                )
+
+    def test_elements_before_first_version(self):
+        """Тестирование запроса на дату раньше первой версии справочника"""
+        response = self.client.get(self.element_list_url, {"date": "2000-01-01"})
+        self.assertEqual(response.data, {"elements": []})
+        self.assertNotIn("X-Refbook-Version", response)
+
+    def test_check_element_at_date(self):
+        """Тестирование валидации элемента в версии, действующей на дату"""
+        params = {"code": "J00", "value": "test_value J00"}
+        response = self.client.get(self.check_url, {**params, "date": "2022-12-31"})
+        self.assertEqual(response.data, {"result": True})
+        self.assertEqual(response["X-Refbook-Version"], "1.0")
+        response = self.client.get(self.check_url, {**params, "date": "2023-01-12"})
+        self.assertEqual(response.data, {"result": False})
+        self.assertEqual(response["X-Refbook-Version"], "2.0")
+
+    def test_version_header_for_explicit_version(self):
+        """Тестирование заголовка версии при явном указании версии"""
+        response = self.client.get(self.element_list_url, {"version": "2.0"})
+        self.assertEqual(response["X-Refbook-Version"], "2.0")
+
+    def test_invalid_date_parameters(self):
+        """Тестирование ошибок при некорректной дате или указании версии вместе с датой"""
+        cases = (
+            {"date": "2023-13-01"},
+            {"date": "yesterday"},
+            {"date": "2023-01-01", "version": "1.0"},
+        )
+        for params in cases:
+            with self.subTest(params=params):
+                for url in (self.element_list_url, self.check_url):
+                    self.assertEqual(self.client.get(url, params).status_code, 400)
@@ -0,0 +1,207 @@
+import importlib
+import json
+import sys
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from app_refbooks.lookup import element_index
+from app_refbooks.search import search_index
+from app_refbooks.snapshots import build_snapshot, snapshot_store
+from app_refbooks.versions import version_resolver
+from app_refbooks.warmup import warm_up, warm_up_on_startup, warm_version
+from django.apps import apps
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+FIXTURES = [
+    "005_refbooks.json",
+    "010_refbook_versions.json",
+    "015_refbook_elements.json",
+]
+
+
+def clear_caches():
+    version_resolver.clear()
+    element_index.clear()
+    search_index.clear()
+    snapshot_store.clear()
+
+
+def fail_on_ms1(version, search=False):
+    if version.refbook.code == "MS1":
+        raise OSError("cache is unavailable")
+    return warm_version(version, search=search)
+
+
+class WarmUpTest(TestCase):
+    """Тестирование прогрева кэшей текущих версий справочников"""
+
+    fixtures = FIXTURES
+
+    def setUp(self):
+        clear_caches()
+        self.addCleanup(clear_caches)
+
+    def test_current_versions_are_loaded(self):
+        """Тестирование загрузки элементов текущих версий в индекс"""
+        report = warm_up(workers=1)
+        self.assertEqual(
+            [
+                (item["refbook"], item["version"], item["source"], item["elements"])
+                for item in report["versions"]
+            ],
+            [("MS1", "4.0", "index", 0), ("ICD-10", "3.0", "index", 1)],
+        )
+        self.assertEqual(report["skipped"], [])
+        self.assertEqual(report["errors"], [])
+        self.assertEqual(report["index_elements"], 1)
+        self.assertIn("memory_bytes", report)
+        self.assertEqual(element_index.peek(7), {"D01": "test_value D01"})
+        self.assertIsNone(search_index.peek(7))
+        with self.assertNumQueries(0):
+            self.assertTrue(element_index.contains(7, "D01", "test_value D01"))
+
+    def test_refbooks_and_search_index(self):
+        """Тестирование прогрева выбранных справочников вместе с индексом поиска"""
+        report = warm_up(workers=1, search=True, refbook_codes=["ICD-10"])
+        self.assertEqual([item["refbook"] for item in report["versions"]], ["ICD-10"])
+        self.assertIsNotNone(search_index.peek(7))
+        self.assertIsNone(element_index.peek(6))
+
+    def test_budget(self):
+        """Тестирование пропуска версий, не загруженных за отведённое время"""
+        report = warm_up(workers=1, budget=0)
+        self.assertEqual(report["versions"], [])
+        self.assertEqual(
+            report["skipped"],
+            [
+                {"refbook": "MS1", "version": "4.0"},
+                {"refbook": "ICD-10", "version": "3.0"},
+            ],
+        )
+        self.assertEqual(len(element_index), 0)
+
+    def test_snapshots_are_not_duplicated_in_index(self):
+        """Тестирование прогрева версии из снимка без заполнения индекса элементов"""
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(REFBOOKS_SNAPSHOT_DIR=directory):
+                build_snapshot(7)
+                report = warm_up(workers=1, refbook_codes=["ICD-10"])
+                snapshot_store.clear()
+        self.assertEqual(report["versions"][0]["source"], "snapshot")
+        self.assertEqual(report["versions"][0]["elements"], 1)
+        self.assertIsNone(element_index.peek(7))
+
+    def test_errors_do_not_stop_warm_up(self):
+        """Тестирование продолжения прогрева после ошибки загрузки версии"""
+        with mock.patch(
+            "app_refbooks.warmup.warm_version", side_effect=fail_on_ms1
+        ), self.assertLogs("app_refbooks.warmup", "WARNING"):
+            report = warm_up(workers=1)
+        self.assertEqual([item["refbook"] for item in report["versions"]], ["ICD-10"])
+        self.assertEqual(
+            report["errors"],
+            [{"refbook": "MS1", "version": "4.0", "error": "cache is unavailable"}],
+        )
+
+    @override_settings(REFBOOKS_WARMUP_ON_STARTUP=True)
+    def test_startup_is_not_stopped_by_errors(self):
+        """Тестирование запуска процесса при ошибке прогрева кэшей"""
+        with mock.patch(
+            "app_refbooks.warmup.warm_up", side_effect=RuntimeError("no cache")
+        ), mock.patch("app_refbooks.warmup.connection"):
+            with self.assertLogs("app_refbooks.warmup", "WARNING") as logs:
+                self.assertIsNone(warm_up_on_startup())
+        self.assertIn("no cache", logs.output[0])
+
+    def test_startup_warm_up_is_disabled_by_default(self):
+        """Тестирование отсутствия прогрева при запуске без настройки"""
+        self.assertIsNone(warm_up_on_startup())
+        self.assertEqual(len(element_index), 0)
+
+
+class ServerStartupWarmUpTest(SimpleTestCase):
+    """Тестирование запуска прогрева кэшей сервером приложения"""
+
+    def test_server_modules_warm_up(self):
+        """Тестирование прогрева при загрузке модулей WSGI и ASGI"""
+        for name in ("refbooks.wsgi", "refbooks.asgi"):
+            with self.subTest(module=name), mock.patch(
+                "app_refbooks.warmup.warm_up_on_startup"
+            ) as warm:
+                sys.modules.pop(name, None)
+                importlib.import_module(name)
+            warm.assert_called_once_with()
+
+    def test_app_ready_does_not_warm_up(self):
+        """Тестирование отсутствия прогрева при инициализации приложения"""
+        with mock.patch("app_refbooks.warmup.warm_up_on_startup") as warm:
+            apps.get_app_config("app_refbooks").ready()
+        warm.assert_not_called()
+
+
+class WarmRefbooksCommandTest(TestCase):
+    """Тестирование команды прогрева кэшей"""
+
+    fixtures = FIXTURES
+
+    def setUp(self):
+        clear_caches()
+        self.addCleanup(clear_caches)
+
+    def test_report(self):
+        """Тестирование вывода отчёта о прогреве"""
+        out = StringIO()
+        call_command("warm_refbooks", "--workers", "1", stdout=out)
+        self.assertIn("ICD-10 3.0: 1 элементов (index)", out.getvalue())
+        self.assertIn("Прогрето версий: 2", out.getvalue())
+
+    def test_json_report(self):
+        """Тестирование вывода отчёта о прогреве в формате JSON"""
+        out = StringIO()
+        call_command(
+            "warm_refbooks", "--workers", "1", "--refbook", "MS1", "--json", stdout=out
+        )
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["versions"][0]["version"], "4.0")
+
+    def test_invalid_options(self):
+        """Тестирование проверки параметров команды"""
+        with self.assertRaises(CommandError):
+            call_command("warm_refbooks", "--workers", "0")
+        with self.assertRaises(CommandError):
+            call_command("warm_refbooks", "--budget", "0")
+
+
+class ParallelWarmUpTest(TransactionTestCase):
+    """Тестирование прогрева кэшей в нескольких потоках"""
+
+    fixtures = FIXTURES
+
+    def setUp(self):
+        clear_caches()
+        self.addCleanup(clear_caches)
+
+    def test_versions_are_loaded_in_threads(self):
+        """Тестирование загрузки версий потоками со своими соединениями с БД"""
+        report = warm_up(workers=2)
+        self.assertEqual(len(report["versions"]), 2)
+        self.assertEqual(element_index.peek(7), {"D01": "test_value D01"})
+
+    def test_errors_do_not_stop_warm_up_in_threads(self):
+        """Тестирование продолжения прогрева в потоках после ошибки загрузки версии"""
+        with mock.patch(
+            "app_refbooks.warmup.warm_version", side_effect=fail_on_ms1
+        ), self.assertLogs("app_refbooks.warmup", "WARNING"):
+            report = warm_up(workers=2)
+        self.assertEqual([item["refbook"] for item in report["versions"]], ["ICD-10"])
+        self.assertEqual(report["errors"][0]["error"], "cache is unavailable")
+
+    @override_settings(REFBOOKS_WARMUP_ON_STARTUP=True)
+    def test_startup_warm_up(self):
+        """Тестирование прогрева при запуске процесса с записью результата в лог"""
+        with self.assertLogs("app_refbooks.warmup", "INFO") as logs:
+            report = warm_up_on_startup()
+        self.assertEqual(len(report["versions"]), 2)
+        self.assertIn("версий 2", logs.output[0])
@@ -1,9 +1,18 @@
 from django.urls import path
 
 from .views import (
+    AsyncRefbookListView,
+    AsyncRefbookElementListView,
+    AsyncRefbookElementCheckView,
+    MetricsView,
     RefbookListAPIView,
     RefbookElementListAPIView,
     RefbookElementCheckAPIView,
+    RefbookElementBatchCheckAPIView,
+    RefbookElementImportAPIView,
+    RefbookElementLookupAPIView,
+    RefbookElementSearchAPIView,
+    RefbookVersionDiffAPIView,
 )
 
 app_name = "refbooks"
@@ -20,4 +29,45 @@ urlpatterns = [
         RefbookElementCheckAPIView.as_view(),
         name="refbook_element_check",
     ),
+    path(
+        "refbooks/<int:pk>/check_elements",
+        RefbookElementBatchCheckAPIView.as_view(),
+        name="refbook_element_batch_check",
+    ),
+    path(
+        "refbooks/lookup",
+        RefbookElementLookupAPIView.as_view(),
+        name="refbook_element_lookup",
+    ),
+    path(
+        "refbooks/<int:pk>/elements/search",
+        RefbookElementSearchAPIView.as_view(),
+        name="refbook_element_search",
+    ),
+    path(
+        "refbooks/<int:pk>/elements/import",
+        RefbookElementImportAPIView.as_view(),
+        name="refbook_element_import",
+    ),
+    path(
+        "refbooks/<int:pk>/diff",
+        RefbookVersionDiffAPIView.as_view(),
+        name="refbook_version_diff",
+    ),
+    path(
+        "async/refbooks/",
+        AsyncRefbookListView.as_view(),
+        name="async_refbook_list",
+    ),
+    path(
+        "async/refbooks/<int:pk>/elements",
+        AsyncRefbookElementListView.as_view(),
+        name="async_refbook_element_list",
+    ),
+    path(
+        "async/refbooks/<int:pk>/check_element",
+        AsyncRefbookElementCheckView.as_view(),
+        name="async_refbook_element_check",
+    ),
+    path("metrics", MetricsView.as_view(), name="metrics"),
 ]
@@ -1,16 +1,71 @@
-from datetime import datetime
-
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 
-from .models import RefbookVersion
+from .models import Refbook, RefbookVersion
+from .versions import version_resolver
 
 
 def get_current_version(refbook_id):
     """Функция для получения текущей версии справочника"""
-    date_now = datetime.now(tz=timezone.utc)
-    current_version = (
-        RefbookVersion.objects.filter(refbook_id=refbook_id, start_date__lte=date_now)
-        .order_by("start_date")
-        .last()
+    return version_resolver.get_current_version(refbook_id)
+
+
+def parse_version_date(value):
+    """
+    Функция разбора даты в формате ГГГГ-ММ-ДД из параметра запроса.
+    Возвращает None для пустого значения, при некорректной дате
+    выбрасывает ValueError
+    """
+    if not value:
+        return None
+    date = parse_date(value)
+    if date is None:
+        raise ValueError(f"Некорректная дата: {value}")
+    return date
+
+
+def get_version(refbook_id, version_title=None, date=None):
+    """
+    Функция для получения версии справочника по её наименованию или
+    действующей на указанную дату, при отсутствии наименования и даты
+    возвращается текущая версия справочника
+    """
+    if version_title:
+        return version_resolver.get_version(refbook_id, version_title)
+    if date:
+        return version_resolver.get_version_at(refbook_id, date)
+    return get_current_version(refbook_id)
+
+
+async def aget_version(refbook_id, version_title=None, date=None):
+    """
+    Асинхронная функция для получения версии справочника по её наименованию
+    или действующей на дату (при их отсутствии - текущей версии) одним
+    запросом к БД
+    """
+    versions = RefbookVersion.objects.filter(refbook_id=refbook_id)
+    if version_title:
+        return await versions.filter(version=version_title).afirst()
+    return await (
+        versions.filter(start_date__lte=date or timezone.now().date())
+        .order_by("-start_date")
+        .afirst()
     )
-    return current_version
+
+
+def get_refbooks(date=None):
+    """
+    Функция для получения справочников, при указании даты - только тех
+    справочников, в которых есть версии с датой начала действия не позже неё
+    """
+    queryset = Refbook.objects.all()
+    if date:
+        queryset = queryset.filter(
+            Exists(
+                RefbookVersion.objects.filter(
+                    refbook=OuterRef("pk"), start_date__lte=date
+                )
+            )
+        )
+    return queryset
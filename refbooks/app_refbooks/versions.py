@@ -0,0 +1,202 @@
+import threading
+from bisect import bisect_right
+from collections import defaultdict
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Case, Exists, IntegerField, OuterRef, Value, When
+from django.utils import timezone
+
+from .cache import VERSIONS_SCOPE, elements_scope, get_generations
+from .models import RefbookVersion, RefbookElement
+
+
+class VersionTimeline:
+    """Отсортированная по дате начала действия последовательность версий справочника"""
+
+    def __init__(self, versions):
+        self.versions = sorted(versions, key=lambda version: version.start_date)
+        self.start_dates = [version.start_date for version in self.versions]
+        self.by_title = {version.version: version for version in self.versions}
+
+    def at(self, date):
+        """Метод получения версии, действующей на указанную дату"""
+        index = bisect_right(self.start_dates, date)
+        if index:
+            return self.versions[index - 1]
+        return None
+
+
+class VersionResolver:
+    """
+    Кэш версий справочников в памяти процесса.
+
+    При первом обращении одним запросом загружает версии всех справочников и
+    строит для каждого справочника временную шкалу версий. Поиск версии,
+    действующей на дату, выполняется бинарным поиском по шкале, поэтому
+    переход будущей версии в текущую в полночь UTC не требует сброса кэша.
+    Кэш сбрасывается сигналами при изменении версий справочников, а в других
+    процессах - при смене поколения версий в общем кэше.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timelines = None
+        self._versions = None
+        self._shared_generation = None
+        self._generation = 0
+
+    def clear(self):
+        """Метод сброса кэша"""
+        with self._lock:
+            self._timelines = None
+            self._versions = None
+            self._shared_generation = None
+            self._generation += 1
+
+    def _load(self):
+        versions = defaultdict(list)
+        for version in RefbookVersion.objects.using(DEFAULT_DB_ALIAS).order_by(
+            "start_date"
+        ):
+            versions[version.refbook_id].append(version)
+        return {
+            refbook_id: VersionTimeline(refbook_versions)
+            for refbook_id, refbook_versions in versions.items()
+        }
+
+    def _state(self):
+        (shared_generation,) = get_generations(VERSIONS_SCOPE)
+        with self._lock:
+            timelines = self._timelines
+            if timelines is not None and shared_generation == self._shared_generation:
+                return timelines, self._versions
+            generation = self._generation
+        timelines = self._load()
+        versions = {
+            version.pk: version
+            for timeline in timelines.values()
+            for version in timeline.versions
+        }
+        with self._lock:
+            if generation == self._generation:
+                self._timelines = timelines
+                self._versions = versions
+                self._shared_generation = shared_generation
+        return timelines, versions
+
+    def timelines(self):
+        """Метод получения временных шкал версий всех справочников"""
+        return self._state()[0]
+
+    def chain(self, version_id):
+        """
+        Метод получения цепочки идентификаторов версий, от которых зависит
+        состав элементов версии справочника: сама версия, её базовая версия,
+        базовая версия базовой версии и т.д.
+        """
+        version_id = getattr(version_id, "pk", version_id)
+        versions = self._state()[1]
+        chain = [version_id]
+        version = versions.get(version_id)
+        while version is not None and version.base_version_id is not None:
+            if version.base_version_id in chain:
+                break
+            chain.append(version.base_version_id)
+            version = versions.get(version.base_version_id)
+        return chain
+
+    def timeline(self, refbook_id):
+        """Метод получения временной шкалы версий справочника"""
+        refbook_id = getattr(refbook_id, "pk", refbook_id)
+        try:
+            refbook_id = int(refbook_id)
+        except (TypeError, ValueError):
+            return None
+        return self.timelines().get(refbook_id)
+
+    def get_version_at(self, refbook_id, date):
+        """Метод получения версии справочника, действующей на указанную дату"""
+        timeline = self.timeline(refbook_id)
+        if timeline is None:
+            return None
+        return timeline.at(date)
+
+    def get_current_version(self, refbook_id):
+        """Метод получения текущей версии справочника"""
+        return self.get_version_at(refbook_id, timezone.now().date())
+
+    def get_version(self, refbook_id, title):
+        """Метод получения версии справочника по её наименованию"""
+        timeline = self.timeline(refbook_id)
+        if timeline is None:
+            return None
+        return timeline.by_title.get(title)
+
+
+version_resolver = VersionResolver()
+
+
+def elements_scopes(version_id):
+    """
+    Функция получения областей инвалидации, от которых зависит состав
+    элементов версии справочника: элементов самой версии и её базовых версий
+    """
+    return tuple(elements_scope(pk) for pk in version_resolver.chain(version_id))
+
+
+def effective_elements(version_id, chain=None):
+    """
+    Функция получения QuerySet действующих элементов версии справочника.
+
+    Версия без базовой версии хранит все свои элементы, отметки об удалении
+    в ней (например, оставшиеся после отвязки от базовой версии) не
+    учитываются. Производная версия хранит только добавленные и изменённые
+    элементы, а также отметки об удалении элементов (removed=True).
+    Действующим считается элемент ближайшей к версии строки цепочки с данным
+    кодом, если это не отметка об удалении. Выборка выполняется одним
+    запросом по индексу (refbook_version, code), поэтому к ней применимы
+    пагинация и потоковая выдача. Цепочку базовых версий можно передать явно
+    (см. aget_chain)
+    """
+    if chain is None:
+        chain = version_resolver.chain(version_id)
+    if len(chain) == 1:
+        return RefbookElement.objects.filter(
+            refbook_version_id=version_id, removed=False
+        )
+    depth = Case(
+        *[
+            When(refbook_version_id=pk, then=Value(index))
+            for index, pk in enumerate(chain)
+        ],
+        output_field=IntegerField(),
+    )
+    shadowing = (
+        RefbookElement.objects.filter(
+            refbook_version_id__in=chain, code=OuterRef("code")
+        )
+        .annotate(depth=depth)
+        .filter(depth__lt=OuterRef("depth"))
+    )
+    return (
+        RefbookElement.objects.filter(refbook_version_id__in=chain, removed=False)
+        .annotate(depth=depth)
+        .exclude(Exists(shadowing))
+    )
+
+
+async def aget_chain(version):
+    """
+    Асинхронная функция получения цепочки идентификаторов базовых версий
+    версии справочника запросами к БД, без кэша версий процесса
+    """
+    chain = [version.pk]
+    base_version_id = version.base_version_id
+    while base_version_id is not None and base_version_id not in chain:
+        chain.append(base_version_id)
+        base_version_id = await (
+            RefbookVersion.objects.filter(pk=base_version_id)
+            .values_list("base_version_id", flat=True)
+            .afirst()
+        )
+    return chain
@@ -1,10 +1,143 @@
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.http import condition
 from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework import status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Refbook, RefbookElement
-from .serializers import RefbookListSerializer, ElementListSerializer
-from .utils import get_current_version
+from .cache import VERSIONS_SCOPE, response_cache
+from .diffs import DIFF_FIELDS, iter_version_diff
+from .etags import element_list_etag, refbook_list_etag, representation
+from .importers import detect_format, import_version_elements
+from .lookup import element_index, get_elements_by_codes, lookup_elements
+from .metrics import metrics_registry
+from .models import Refbook, RefbookVersion, RefbookElement
+from .pagination import KeysetPagination
+from .parsers import NDJSONParser
+from .renderers import (
+    FastJSONRenderer,
+    NDJSONRenderer,
+    aiter_ndjson,
+    fast_rendering_enabled,
+    iter_ndjson,
+)
+from .serializers import (
+    RefbookSerializer,
+    RefbookElementSerializer,
+    RefbookListSerializer,
+    ElementListSerializer,
+    ElementCheckBatchSerializer,
+    ElementImportSerializer,
+    ElementLookupSerializer,
+    ElementSearchSerializer,
+)
+from .routers import use_primary, use_read_replica
+from .search import search_index
+from .snapshots import snapshot_store
+from .utils import aget_version, get_refbooks, get_version, parse_version_date
+from .versions import aget_chain, effective_elements, elements_scopes
+
+PAGINATION_PARAMETERS = [
+    OpenApiParameter(
+        name="limit",
+        location=OpenApiParameter.QUERY,
+        description="page size",
+        required=False,
+        type=int,
+    ),
+    OpenApiParameter(
+        name="cursor",
+        location=OpenApiParameter.QUERY,
+        description="next page cursor",
+        required=False,
+    ),
+]
+
+VERSION_DATE_PARAMETER = OpenApiParameter(
+    name="date",
+    location=OpenApiParameter.QUERY,
+    description="date of the effective version",
+    required=False,
+)
+
+VERSION_HEADER = "X-Refbook-Version"
+
+
+def parse_version_params(params):
+    """
+    Функция разбора параметров выбора версии справочника: наименования
+    версии (version) или даты, на которую версия действует (date)
+    """
+    version_title = params.get("version")
+    try:
+        date = parse_version_date(params.get("date"))
+    except ValueError:
+        raise ValidationError({"date": ["Ожидается дата в формате ГГГГ-ММ-ДД."]})
+    if version_title and date:
+        raise ValidationError({"date": ["Укажите либо версию, либо дату."]})
+    return version_title, date
+
+
+def get_requested_version(params, pk):
+    """
+    Функция получения запрошенной версии справочника: по наименованию
+    (параметр version), действующей на дату (параметр date) или текущей
+    """
+    version_title, date = parse_version_params(params)
+    return get_version(refbook_id=pk, version_title=version_title, date=date)
+
+
+def with_version_header(response, version):
+    """
+    Функция добавления в ответ заголовка с наименованием версии справочника,
+    по которой сформирован ответ
+    """
+    if version is not None:
+        response[VERSION_HEADER] = version.version
+    return response
+
+
+class ReadReplicaMixin:
+    """
+    Примесь для представлений, только читающих данные: чтения из БД при
+    обработке запроса направляются на реплику БД (см. REFBOOKS_READ_REPLICAS)
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with use_read_replica(request):
+            return super().dispatch(request, *args, **kwargs)
+
+
+class CachedResponseMixin:
+    """
+    Примесь для кэширования отрендеренных JSON-ответов представления
+    в двухуровневом кэше ответов
+    """
+
+    def cached_response(self, request, key, scopes, build_response):
+        """
+        Метод получения ответа из кэша, при его отсутствии ответ формируется
+        функцией build_response по основной БД и сохраняется в кэш после
+        рендеринга
+        """
+        if request.accepted_renderer.format != FastJSONRenderer.format:
+            return build_response()
+        key = (self.__class__.__name__, key, representation(request))
+        response = response_cache.get(key, scopes)
+        if response is None and response_cache.enabled:
+            with use_primary():
+                response = response_cache.set(key, scopes, build_response())
+        elif response is None:
+            response = build_response()
+        return response
 
 
 @extend_schema(
@@ -16,19 +149,46 @@ from .utils import get_current_version
             description="constraint date",
             required=False,
         ),
+        *PAGINATION_PARAMETERS,
     ],
 )
-class RefbookListAPIView(APIView):
-    """Представление для получения списка справочников"""
+@method_decorator(condition(etag_func=refbook_list_etag), name="get")
+class RefbookListAPIView(ReadReplicaMixin, CachedResponseMixin, APIView):
+    """
+    Представление для получения списка справочников. Поддерживает условные
+    запросы (If-None-Match) по ETag, вычисляемому из ревизий справочников
+    """
+
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer)
 
     def get(self, request):
-        queryset = Refbook.objects.all()
-        date = request.query_params.get("date")
-        if date:
-            queryset = queryset.filter(
-                refbook_versions__start_date__lte=date
-            ).distinct()
-        return Response(RefbookListSerializer({"refbooks": queryset}).data)
+        return self.cached_response(
+            request,
+            key=None,
+            scopes=(VERSIONS_SCOPE,),
+            build_response=lambda: self.build_response(request),
+        )
+
+    def build_response(self, request):
+        """Метод формирования ответа со списком справочников"""
+        queryset = get_refbooks(date=request.query_params.get("date"))
+        if fast_rendering_enabled():
+            queryset = queryset.values(*RefbookSerializer.Meta.fields)
+        paginator = KeysetPagination(key_field="id")
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            return Response(paginator.get_paginated_data(self.get_data(page)))
+        return Response(self.get_data(queryset))
+
+    def get_data(self, refbooks):
+        """
+        Метод формирования данных ответа. При включённой настройке
+        REFBOOKS_FAST_RENDERING справочники выбираются из БД словарями
+        и попадают в ответ без сериалайзера
+        """
+        if fast_rendering_enabled():
+            return {"refbooks": list(refbooks)}
+        return RefbookListSerializer({"refbooks": refbooks}).data
 
 
 @extend_schema(
@@ -40,19 +200,99 @@ class RefbookListAPIView(APIView):
             description="concrete version",
             required=False,
         ),
+        VERSION_DATE_PARAMETER,
+        *PAGINATION_PARAMETERS,
     ],
 )
-class RefbookElementListAPIView(APIView):
-    """Представление для получения списка элементов версии справочника"""
+@method_decorator(condition(etag_func=element_list_etag), name="get")
+class RefbookElementListAPIView(ReadReplicaMixin, CachedResponseMixin, APIView):
+    """
+    Представление для получения списка элементов версии справочника.
+    При запросе в формате NDJSON (?format=ndjson или Accept: application/x-ndjson)
+    элементы отдаются потоком, по одному элементу в строке. Поддерживает
+    условные запросы (If-None-Match) по ETag, вычисляемому из ревизии версии.
+    При наличии снимка версии полный список элементов отдаётся из его файла.
+    Наименование версии, элементы которой выданы, возвращается в заголовке
+    X-Refbook-Version
+    """
+
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer, NDJSONRenderer)
 
     def get(self, request, pk):
-        version_title = request.query_params.get("version")
-        if not version_title:
-            version_title = get_current_version(refbook_id=pk).version
-        queryset = RefbookElement.objects.filter(
-            refbook_version__refbook_id=pk, refbook_version__version=version_title
+        version = get_requested_version(request.query_params, pk)
+        return with_version_header(self.list_elements(request, pk, version), version)
+
+    def list_elements(self, request, pk, version):
+        """Метод формирования ответа со списком элементов версии справочника"""
+        if version:
+            queryset = effective_elements(version.pk)
+        else:
+            queryset = RefbookElement.objects.none()
+        if request.accepted_renderer.format == NDJSONRenderer.format:
+            return self.stream(queryset)
+        if not version:
+            return self.build_response(request, queryset)
+        response = self.snapshot_response(request, version)
+        if response is not None:
+            return response
+        return self.cached_response(
+            request,
+            key=(pk, version.pk),
+            scopes=elements_scopes(version.pk),
+            build_response=lambda: self.build_response(request, queryset),
+        )
+
+    def build_response(self, request, queryset):
+        """Метод формирования ответа со списком элементов версии справочника"""
+        if fast_rendering_enabled():
+            queryset = queryset.values(*RefbookElementSerializer.Meta.fields)
+        paginator = KeysetPagination(key_field="code")
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            return Response(paginator.get_paginated_data(self.get_data(page)))
+        return Response(self.get_data(queryset))
+
+    def get_data(self, elements):
+        """
+        Метод формирования данных ответа. При включённой настройке
+        REFBOOKS_FAST_RENDERING элементы выбираются из БД словарями
+        и попадают в ответ без сериалайзера
+        """
+        if fast_rendering_enabled():
+            return {"elements": list(elements)}
+        return ElementListSerializer({"elements": elements}).data
+
+    def snapshot_response(self, request, version):
+        """
+        Метод выдачи полного JSON-списка элементов из файла снимка версии
+        справочника. Файл отдаётся без чтения в память (sendfile, если его
+        поддерживает сервер приложений)
+        """
+        if request.accepted_renderer.format != FastJSONRenderer.format:
+            return None
+        if KeysetPagination(key_field="code").is_requested(request):
+            return None
+        snapshot = snapshot_store.get(version.pk)
+        if snapshot is None:
+            return None
+        try:
+            file = open(snapshot.json_path, "rb")
+        except OSError:
+            return None
+        return FileResponse(file, content_type="application/json")
+
+    def stream(self, queryset):
+        """Метод потоковой выдачи элементов версии справочника в формате NDJSON"""
+        chunk_size = getattr(settings, "REFBOOKS_STREAM_CHUNK_SIZE", 2000)
+        rows = (
+            queryset.using(queryset.db)
+            .values_list("code", "value")
+            .iterator(chunk_size=chunk_size)
+        )
+        return StreamingHttpResponse(
+            iter_ndjson(rows, ("code", "value"), chunk_size),
+            content_type=NDJSONRenderer.media_type,
         )
-        return Response(ElementListSerializer({"elements": queryset}).data)
 
 
 @extend_schema(
@@ -76,22 +316,347 @@ class RefbookElementListAPIView(APIView):
             description="element version",
             required=False,
         ),
+        VERSION_DATE_PARAMETER,
     ],
 )
-class RefbookElementCheckAPIView(APIView):
-    """Представление для валидации элемента версии справочника"""
+class RefbookElementCheckAPIView(ReadReplicaMixin, APIView):
+    """
+    Представление для валидации элемента версии справочника. Наименование
+    версии, в которой выполнена проверка, возвращается в заголовке
+    X-Refbook-Version
+    """
 
     def get(self, request, pk):
         element_code = request.query_params.get("code")
         element_value = request.query_params.get("value")
-        version_title = request.query_params.get("version")
-        if not version_title:
-            version_title = get_current_version(refbook_id=pk).version
-        check_element = RefbookElement.objects.filter(
-            refbook_version__version=version_title,
-            code=element_code,
-            value=element_value,
+        version = get_requested_version(request.query_params, pk)
+        if not version:
+            return Response({"result": False})
+        snapshot = snapshot_store.get(version.pk)
+        if snapshot is not None:
+            result = snapshot.contains(element_code, element_value)
+        else:
+            result = element_index.contains(version.pk, element_code, element_value)
+        return with_version_header(Response({"result": result}), version)
+
+
+@extend_schema(
+    summary="Поиск элементов версии справочника",
+    parameters=[
+        OpenApiParameter(
+            name="q",
+            location=OpenApiParameter.QUERY,
+            description="search query",
+            required=True,
+        ),
+        OpenApiParameter(
+            name="mode",
+            location=OpenApiParameter.QUERY,
+            description="prefix (code prefix) or contains (code or value substring)",
+            required=False,
+            enum=["prefix", "contains"],
+        ),
+        OpenApiParameter(
+            name="limit",
+            location=OpenApiParameter.QUERY,
+            description="maximum number of results",
+            required=False,
+            type=int,
+        ),
+        OpenApiParameter(
+            name="version",
+            location=OpenApiParameter.QUERY,
+            description="elements version",
+            required=False,
+        ),
+        VERSION_DATE_PARAMETER,
+    ],
+)
+class RefbookElementSearchAPIView(ReadReplicaMixin, APIView):
+    """
+    Представление для поиска элементов версии справочника без учёта
+    регистра: по началу кода (mode=prefix) или по вхождению строки в код
+    или значение (mode=contains). Поиск выполняется по таблице элементов
+    версии в памяти процесса, результаты ограничены параметром limit
+    """
+
+    def get(self, request, pk):
+        serializer = ElementSearchSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        version = get_requested_version(request.query_params, pk)
+        if not version:
+            return Response({"elements": []})
+        params = serializer.validated_data
+        elements = search_index.search(
+            version.pk, params["q"], params["mode"], params["limit"]
+        )
+        return with_version_header(Response({"elements": elements}), version)
+
+
+@extend_schema(
+    summary="Пакетная валидация элементов версии справочника",
+    request=ElementCheckBatchSerializer,
+    parameters=[
+        OpenApiParameter(
+            name="version",
+            location=OpenApiParameter.QUERY,
+            description="elements version",
+            required=False,
+        ),
+    ],
+)
+class RefbookElementBatchCheckAPIView(ReadReplicaMixin, APIView):
+    """Представление для пакетной валидации элементов версии справочника"""
+
+    parser_classes = (JSONParser, NDJSONParser)
+
+    def post(self, request, pk):
+        data = request.data
+        if isinstance(data, list):
+            data = {"elements": data}
+        serializer = ElementCheckBatchSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        version_title = serializer.validated_data.get(
+            "version", request.query_params.get("version")
+        )
+        pairs = serializer.validated_data["elements"]
+        version = get_version(refbook_id=pk, version_title=version_title)
+        if not version:
+            return Response({"results": [False] * len(pairs)})
+        elements = snapshot_store.get(version.pk)
+        if elements is None:
+            elements = element_index.get(version.pk)
+        if elements is None:
+            elements = get_elements_by_codes(version.pk, {code for code, _ in pairs})
+        return Response(
+            {"results": [elements.get(code) == value for code, value in pairs]}
+        )
+
+
+@extend_schema(
+    summary="Проверка элементов нескольких справочников",
+    request=ElementLookupSerializer,
+)
+class RefbookElementLookupAPIView(ReadReplicaMixin, APIView):
+    """
+    Представление для проверки элементов нескольких справочников одним
+    запросом. Каждый элемент указывает справочник (идентификатор или код),
+    код и значение элемента и, опционально, версию или дату. Результаты
+    возвращаются в порядке элементов вместе с наименованием версии,
+    в которой выполнена проверка
+    """
+
+    parser_classes = (JSONParser, NDJSONParser)
+
+    def post(self, request):
+        data = request.data
+        if isinstance(data, list):
+            data = {"items": data}
+        serializer = ElementLookupSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            {"results": lookup_elements(serializer.validated_data["items"])}
+        )
+
+
+@extend_schema(
+    summary="Получение отличий элементов двух версий справочника",
+    parameters=[
+        OpenApiParameter(
+            name="from",
+            location=OpenApiParameter.QUERY,
+            description="previous version",
+            required=True,
+        ),
+        OpenApiParameter(
+            name="to",
+            location=OpenApiParameter.QUERY,
+            description="next version",
+            required=True,
+        ),
+    ],
+)
+class RefbookVersionDiffAPIView(APIView):
+    """
+    Представление для получения отличий элементов двух версий справочника.
+    Отличия отдаются потоком в формате NDJSON, по одному изменению в строке
+    """
+
+    renderer_classes = (FastJSONRenderer, NDJSONRenderer)
+
+    def get(self, request, pk):
+        versions = {}
+        for param in ("from", "to"):
+            title = request.query_params.get(param)
+            if not title:
+                raise ValidationError({param: ["Обязательный параметр."]})
+            versions[param] = get_version(refbook_id=pk, version_title=title)
+            if versions[param] is None:
+                raise NotFound(f"Версия {title} не найдена.")
+        chunk_size = getattr(settings, "REFBOOKS_STREAM_CHUNK_SIZE", 2000)
+        changes = iter_version_diff(
+            versions["from"].pk, versions["to"].pk, chunk_size=chunk_size
+        )
+        return StreamingHttpResponse(
+            iter_ndjson(changes, DIFF_FIELDS, chunk_size),
+            content_type=NDJSONRenderer.media_type,
+        )
+
+
+@extend_schema(
+    summary="Загрузка элементов версии справочника из файла",
+    request={"multipart/form-data": ElementImportSerializer},
+)
+class RefbookElementImportAPIView(APIView):
+    """
+    Представление для потоковой загрузки элементов версии справочника из
+    файла CSV или NDJSON. Доступно только администраторам
+    """
+
+    parser_classes = (MultiPartParser,)
+    permission_classes = (IsAdminUser,)
+
+    def post(self, request, pk):
+        refbook = get_object_or_404(Refbook, pk=pk)
+        serializer = ElementImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        base_version = None
+        if "base_version" in data:
+            base_version = RefbookVersion.objects.filter(
+                refbook=refbook, version=data["base_version"]
+            ).first()
+            if base_version is None:
+                raise ValidationError({"base_version": ["Базовая версия не найдена."]})
+        upload = data["file"]
+        try:
+            version, result = import_version_elements(
+                refbook.pk,
+                data["version"],
+                upload.file,
+                start_date=data.get("start_date"),
+                base_version=base_version,
+                fmt=data.get("format") or detect_format(upload.name),
+                replace=data["replace"],
+            )
+        except UnicodeDecodeError:
+            raise ValidationError({"file": ["Файл должен быть в кодировке UTF-8."]})
+        if version is None:
+            raise NotFound(
+                f"Версия {data['version']} не найдена, для её создания укажите start_date."
+            )
+        return Response(result.as_dict(), status=status.HTTP_201_CREATED)
+
+
+def json_response(data, status=200):
+    """
+    Функция формирования JSON-ответа асинхронного представления, побайтово
+    совпадающего с ответом соответствующего представления DRF
+    """
+    return HttpResponse(
+        FastJSONRenderer().render(data),
+        content_type=FastJSONRenderer.media_type,
+        status=status,
+    )
+
+
+async def aget_requested_version(params, pk):
+    """
+    Асинхронная функция получения запрошенной версии справочника
+    (см. get_requested_version)
+    """
+    version_title, date = parse_version_params(params)
+    return await aget_version(pk, version_title, date)
+
+
+class AsyncRefbookListView(View):
+    """
+    Асинхронное представление для получения списка справочников. Запросы
+    к БД выполняются асинхронным ORM, ответ совпадает с ответом
+    RefbookListAPIView без постраничной выдачи
+    """
+
+    async def get(self, request):
+        queryset = get_refbooks(date=request.GET.get("date"))
+        refbooks = [
+            refbook
+            async for refbook in queryset.order_by("id").values(
+                *RefbookSerializer.Meta.fields
+            )
+        ]
+        return json_response({"refbooks": refbooks})
+
+
+class AsyncRefbookElementListView(View):
+    """
+    Асинхронное представление для получения списка элементов версии
+    справочника. При запросе в формате NDJSON (?format=ndjson или
+    Accept: application/x-ndjson) элементы отдаются асинхронным потоком
+    """
+
+    async def get(self, request, pk):
+        try:
+            version = await aget_requested_version(request.GET, pk)
+        except ValidationError as error:
+            return json_response(error.detail, status=400)
+        if version is None:
+            queryset = RefbookElement.objects.none()
+        else:
+            queryset = effective_elements(version.pk, await aget_chain(version))
+        # aiterator() в Django 4.2 не поддерживает values_list(), поэтому
+        # элементы выбираются словарями
+        elements = queryset.values(*RefbookElementSerializer.Meta.fields)
+        if self.wants_ndjson(request):
+            chunk_size = getattr(settings, "REFBOOKS_STREAM_CHUNK_SIZE", 2000)
+            rows = (
+                tuple(element.values())
+                async for element in elements.aiterator(chunk_size=chunk_size)
+            )
+            response = StreamingHttpResponse(
+                aiter_ndjson(rows, RefbookElementSerializer.Meta.fields, chunk_size),
+                content_type=NDJSONRenderer.media_type,
+            )
+            return with_version_header(response, version)
+        elements = [element async for element in elements]
+        return with_version_header(json_response({"elements": elements}), version)
+
+    def wants_ndjson(self, request):
+        """Метод проверки запроса элементов в формате NDJSON"""
+        if request.GET.get("format") == NDJSONRenderer.format:
+            return True
+        return NDJSONRenderer.media_type in request.headers.get("Accept", "")
+
+
+class AsyncRefbookElementCheckView(View):
+    """
+    Асинхронное представление для валидации элемента версии справочника:
+    версия и элемент проверяются двумя индексными запросами асинхронного ORM
+    """
+
+    async def get(self, request, pk):
+        code = request.GET.get("code")
+        value = request.GET.get("value")
+        try:
+            version = await aget_requested_version(request.GET, pk)
+        except ValidationError as error:
+            return json_response(error.detail, status=400)
+        if version is None:
+            return json_response({"result": False})
+        result = False
+        if code is not None and value is not None:
+            queryset = effective_elements(version.pk, await aget_chain(version))
+            result = await queryset.filter(code=code, value=value).aexists()
+        return with_version_header(json_response({"result": result}), version)
+
+
+class MetricsView(View):
+    """
+    Представление для выдачи гистограмм показателей обработки запросов
+    процесса в текстовом формате Prometheus
+    """
+
+    def get(self, request):
+        return HttpResponse(
+            metrics_registry.render(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
         )
-        if check_element:
-            return Response({"result": True})
-        return Response({"result": False})
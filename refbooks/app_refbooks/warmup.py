@@ -0,0 +1,199 @@
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .lookup import element_index
+from .models import Refbook
+from .search import search_index
+from .snapshots import snapshot_store
+from .versions import version_resolver
+
+logger = logging.getLogger("app_refbooks.warmup")
+
+
+def get_warmup_workers():
+    """Функция получения количества потоков прогрева кэшей"""
+    return getattr(settings, "REFBOOKS_WARMUP_WORKERS", 4)
+
+
+def get_warmup_budget():
+    """Функция получения ограничения времени прогрева кэшей в секундах"""
+    return getattr(settings, "REFBOOKS_WARMUP_BUDGET_SECONDS", 30)
+
+
+def get_memory_usage():
+    """
+    Функция получения объёма резидентной памяти процесса в байтах.
+    Если объём получить не удалось (не Linux), возвращается None
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def get_current_versions(refbook_codes=None):
+    """
+    Функция получения текущих версий справочников по кэшу версий.
+    Возвращает список пар (код справочника, версия)
+    """
+    refbooks = Refbook.objects.order_by("pk")
+    if refbook_codes:
+        refbooks = refbooks.filter(code__in=refbook_codes)
+    today = timezone.now().date()
+    versions = []
+    for refbook_id, code in refbooks.values_list("pk", "code"):
+        version = version_resolver.get_version_at(refbook_id, today)
+        if version is not None:
+            versions.append((code, version))
+    return versions
+
+
+def warm_version(version, search=False):
+    """
+    Функция загрузки элементов версии справочника в кэши процесса. Если
+    для версии собран снимок, элементы читаются из него и индекс элементов
+    не заполняется. Возвращает источник элементов и их количество (None для
+    версии, не помещающейся в индекс: её элементы проверяются запросами к БД)
+    """
+    elements = snapshot_store.get(version.pk)
+    source = "snapshot"
+    if elements is None:
+        elements = element_index.get(version.pk)
+        source = "index"
+    if search:
+        search_index.get(version.pk)
+    if elements is None:
+        return "database", None
+    return source, len(elements)
+
+
+def warm_up(workers=None, budget=None, search=False, refbook_codes=None):
+    """
+    Функция прогрева кэшей процесса: кэша версий и индекса элементов
+    текущих версий справочников (и, при search=True, индекса поиска).
+
+    Версии загружаются в workers потоках, каждый со своим соединением с БД.
+    Загрузка версий, не начатая за budget секунд, пропускается (начатая
+    загрузка не прерывается, но в отчёте не учитывается). Ошибка загрузки
+    версии (БД, общего кэша, файла снимка) записывается в лог и не прерывает
+    прогрев. Возвращает отчёт: загруженные, пропущенные и не загруженные из-за
+    ошибок версии, общее время и прирост резидентной памяти процесса
+    """
+    workers = get_warmup_workers() if workers is None else workers
+    budget = get_warmup_budget() if budget is None else budget
+    started = time.perf_counter()
+    deadline = started + budget
+    memory_before = get_memory_usage()
+    versions = get_current_versions(refbook_codes)
+
+    def warm(item):
+        code, version = item
+        if time.perf_counter() >= deadline:
+            return None
+        version_started = time.perf_counter()
+        source, count = warm_version(version, search=search)
+        return {
+            "refbook": code,
+            "version": version.version,
+            "source": source,
+            "elements": count,
+            "seconds": round(time.perf_counter() - version_started, 3),
+        }
+
+    def warm_in_thread(item):
+        try:
+            return warm(item)
+        finally:
+            connection.close()
+
+    outcomes = []
+    if workers <= 1:
+        for item in versions:
+            try:
+                outcomes.append((item, warm(item), None))
+            except Exception as error:
+                outcomes.append((item, None, error))
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = [executor.submit(warm_in_thread, item) for item in versions]
+            wait(futures, timeout=max(deadline - time.perf_counter(), 0))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        for item, future in zip(versions, futures):
+            if not future.done() or future.cancelled():
+                outcomes.append((item, None, None))
+            elif future.exception() is not None:
+                outcomes.append((item, None, future.exception()))
+            else:
+                outcomes.append((item, future.result(), None))
+
+    report = {"versions": [], "skipped": [], "errors": []}
+    for (code, version), result, error in outcomes:
+        if error is not None:
+            logger.warning(
+                "Версия %s справочника %s не прогрета",
+                version.version,
+                code,
+                exc_info=error,
+            )
+            report["errors"].append(
+                {"refbook": code, "version": version.version, "error": str(error)}
+            )
+        elif result is None:
+            report["skipped"].append({"refbook": code, "version": version.version})
+        else:
+            report["versions"].append(result)
+    memory_after = get_memory_usage()
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    report["memory_bytes"] = (
+        None
+        if memory_before is None or memory_after is None
+        else memory_after - memory_before
+    )
+    report["index_elements"] = len(element_index)
+    return report
+
+
+def warm_up_on_startup():
+    """
+    Функция прогрева кэшей при запуске процесса приложения, если он включён
+    настройкой REFBOOKS_WARMUP_ON_STARTUP. Прогрев выполняется до начала
+    обслуживания запросов, его результат записывается в лог
+    app_refbooks.warmup. Прогрев необязателен, поэтому его ошибки (например,
+    БД до применения миграций или недоступного общего кэша) записываются
+    в лог и не прерывают запуск
+    """
+    if not getattr(settings, "REFBOOKS_WARMUP_ON_STARTUP", False):
+        return None
+    try:
+        report = warm_up(search=getattr(settings, "REFBOOKS_WARMUP_SEARCH", False))
+    except Exception:
+        logger.warning("Прогрев кэшей справочников не выполнен", exc_info=True)
+        return None
+    finally:
+        connection.close()
+    logger.info(
+        "Прогрев кэшей справочников: версий %d, пропущено %d, ошибок %d, "
+        "%.3f с, память процесса %s",
+        len(report["versions"]),
+        len(report["skipped"]),
+        len(report["errors"]),
+        report["seconds"],
+        format_memory(report["memory_bytes"]),
+    )
+    return report
+
+
+def format_memory(value):
+    """Функция форматирования объёма памяти в мегабайтах"""
+    if value is None:
+        return "н/д"
+    return f"{value / 2 ** 20:+.1f} МБ"
@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'refbooks.settings')
 
 application = get_asgi_application()
+
+# Прогрев кэшей справочников при запуске сервера приложения (при gunicorn
+# --preload - один раз в главном процессе), а не в AppConfig.ready(), который
+# выполняется и для команд manage.py (migrate, test, shell)
+from app_refbooks.warmup import warm_up_on_startup  # noqa: E402
+
+warm_up_on_startup()
@@ -45,11 +45,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'app_refbooks.middleware.PerformanceMiddleware',
+    'app_refbooks.middleware.SharedGenerationsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'app_refbooks.middleware.ReplicaStickinessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -77,13 +80,118 @@ WSGI_APPLICATION = 'refbooks.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Бэкенд БД задаётся переменной окружения DATABASE_ENGINE: sqlite (по умолчанию)
+# или postgresql (требуется пакет psycopg). Соединения переиспользуются между
+# запросами в течение DATABASE_CONN_MAX_AGE секунд и проверяются перед
+# переиспользованием. Встроенного пула соединений в Django 4.2 нет, при большом
+# числе процессов приложения соединения с PostgreSQL следует пропускать через
+# PgBouncer, в режиме пула транзакций - с DATABASE_DISABLE_SERVER_SIDE_CURSORS='True'
+
+DATABASE_ENGINE = os.getenv('DATABASE_ENGINE', 'sqlite')
+
+if DATABASE_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DATABASE_NAME') or 'refbooks',
+            'USER': os.getenv('DATABASE_USER', ''),
+            'PASSWORD': os.getenv('DATABASE_PASSWORD', ''),
+            'HOST': os.getenv('DATABASE_HOST', ''),
+            'PORT': os.getenv('DATABASE_PORT', ''),
+            'CONN_MAX_AGE': int(os.getenv('DATABASE_CONN_MAX_AGE', '600')),
+            'CONN_HEALTH_CHECKS': True,
+            'DISABLE_SERVER_SIDE_CURSORS': (
+                os.getenv('DATABASE_DISABLE_SERVER_SIDE_CURSORS') == 'True'
+            ),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DATABASE_NAME') or BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': int(os.getenv('DATABASE_CONN_MAX_AGE', '0')),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+
+# Реплики основной БД для чтения задаются переменной окружения DATABASE_REPLICAS
+# через запятую: хосты для PostgreSQL или пути к файлам для SQLite. Чтения
+# API справочников распределяются между репликами (REFBOOKS_REPLICA_STRATEGY:
+# round_robin или least_loaded), записи и административная панель используют
+# основную БД. После изменения данных сотрудником чтения его сессии в течение
+# REFBOOKS_REPLICA_STICKY_SECONDS выполняются из основной БД
+
+REFBOOKS_READ_REPLICAS = []
+
+for number, replica in enumerate(
+    filter(None, map(str.strip, os.getenv('DATABASE_REPLICAS', '').split(','))), 1
+):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST' if DATABASE_ENGINE == 'postgresql' else 'NAME': replica,
+        'TEST': {'MIRROR': 'default'},
     }
+    REFBOOKS_READ_REPLICAS.append(alias)
+
+REFBOOKS_REPLICA_STRATEGY = os.getenv('REFBOOKS_REPLICA_STRATEGY', 'round_robin')
+
+REFBOOKS_REPLICA_STICKY_SECONDS = int(os.getenv('REFBOOKS_REPLICA_STICKY_SECONDS', '10'))
+
+DATABASE_ROUTERS = ['app_refbooks.routers.ReplicaRouter']
+
+# Запросы к API справочников дольше REFBOOKS_SLOW_REQUEST_MS миллисекунд записываются
+# в лог app_refbooks.performance вместе с SQL самых медленных запросов к БД
+
+REFBOOKS_SLOW_REQUEST_MS = int(os.getenv('REFBOOKS_SLOW_REQUEST_MS', '500'))
+
+# Режим SQLite для развёртывания на одном узле (WAL, synchronous=NORMAL, mmap_size,
+# busy_timeout), применяется к каждому новому соединению, см. app_refbooks/database.py
+
+REFBOOKS_SQLITE_TUNED = os.getenv('DATABASE_SQLITE_TUNED') == 'True'
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Кэш refbooks должен быть общим для всех процессов приложения (файловый кэш,
+# Redis), через него процессы узнают об изменении справочников
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'refbooks': {
+        'BACKEND': os.getenv(
+            'REFBOOKS_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('REFBOOKS_CACHE_LOCATION', 'refbooks'),
+    },
 }
 
+REFBOOKS_CACHE_ALIAS = 'refbooks'
+
+# Количество процессов приложения (переменная WEB_CONCURRENCY, её же читает
+# gunicorn). Если процессов несколько, кэш refbooks не может быть кэшем
+# в памяти процесса: проверка app_refbooks.E001 сообщит об ошибке настройки
+
+REFBOOKS_PROCESSES = int(os.getenv('WEB_CONCURRENCY', '1'))
+
+REFBOOKS_RESPONSE_CACHE_ENABLED = os.getenv('REFBOOKS_RESPONSE_CACHE_ENABLED') == 'True'
+
+# Каталог снимков версий справочников (собираются командой build_refbook_snapshots),
+# если не задан, снимки не используются
+
+REFBOOKS_SNAPSHOT_DIR = os.getenv('REFBOOKS_SNAPSHOT_DIR') or None
+
+# Прогрев кэша версий и индекса элементов текущих версий справочников при запуске
+# процесса приложения (до обслуживания запросов): количество потоков загрузки,
+# ограничение времени в секундах и загрузка индекса поиска элементов
+
+REFBOOKS_WARMUP_ON_STARTUP = os.getenv('REFBOOKS_WARMUP_ON_STARTUP') == 'True'
+REFBOOKS_WARMUP_WORKERS = int(os.getenv('REFBOOKS_WARMUP_WORKERS', '4'))
+REFBOOKS_WARMUP_BUDGET_SECONDS = float(os.getenv('REFBOOKS_WARMUP_BUDGET_SECONDS', '30'))
+REFBOOKS_WARMUP_SEARCH = os.getenv('REFBOOKS_WARMUP_SEARCH') == 'True'
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 